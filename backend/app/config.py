@@ -7,6 +7,9 @@ load_dotenv()
 
 class Settings(BaseModel):
 	database_url: str = os.getenv("DATABASE_URL", "sqlite:///./jobs.db")
+	# What this process does besides serving the API: "all" (default), "api-only", or any
+	# comma-separated mix of "scraper" (runs scrapes and alert delivery) and "scheduler"
+	app_role: str = os.getenv("APP_ROLE", "all")
 	cors_allow_origins: list[str] = (
 		os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:3000, http://127.0.0.1:3000")
 		.replace(" ", "")
@@ -16,6 +19,61 @@ class Settings(BaseModel):
 	# Selenium
 	selenium_headless: bool = os.getenv("SELENIUM_HEADLESS", "true").lower() == "true"
 	chrome_driver_path: str | None = os.getenv("CHROME_DRIVER_PATH")
+	# Chrome sessions per process, across every headless/proxy/stealth profile
+	driver_pool_size: int = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+	driver_pool_warm: int = int(os.getenv("DRIVER_POOL_WARM", "0"))
+	driver_max_page_loads: int = int(os.getenv("DRIVER_MAX_PAGE_LOADS", "200"))
+	driver_lease_timeout: float = float(os.getenv("DRIVER_LEASE_TIMEOUT", "300"))
+
+	# Fetch backend: "selenium" drives Chrome, "http" fetches the public guest pages directly
+	scrape_backend: str = os.getenv("SCRAPE_BACKEND", "selenium").lower()
+	linkedin_base_url: str = os.getenv("LINKEDIN_BASE_URL", "https://www.linkedin.com")
+	http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "15"))
+	http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+	# Scrapes submitted through the API run in the background, this many at a time
+	scrape_max_concurrency: int = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "2"))
+	# Each process renews a lease on the runs it owns; a run whose lease lapses (its
+	# process died) is marked failed by any other scraper process
+	scrape_run_lease_seconds: float = float(os.getenv("SCRAPE_RUN_LEASE_SECONDS", "60"))
+
+	# Politeness: every page load in the process is paced per host (AIMD, requests/second)
+	# and against one global budget; rates drop on 429s, auth walls and empty pages
+	politeness_enabled: bool = os.getenv("POLITENESS_ENABLED", "true").lower() == "true"
+	politeness_global_rate: float = float(os.getenv("POLITENESS_GLOBAL_RATE", "2"))
+	politeness_global_burst: float = float(os.getenv("POLITENESS_GLOBAL_BURST", "4"))
+	politeness_initial_rate: float = float(os.getenv("POLITENESS_INITIAL_RATE", "0.5"))
+	politeness_min_rate: float = float(os.getenv("POLITENESS_MIN_RATE", "0.05"))
+	politeness_max_rate: float = float(os.getenv("POLITENESS_MAX_RATE", "2"))
+	politeness_increase: float = float(os.getenv("POLITENESS_INCREASE", "0.05"))
+	politeness_decrease: float = float(os.getenv("POLITENESS_DECREASE", "0.5"))
+	# Pause for a host after a 429 without Retry-After or an auth wall
+	politeness_cooldown: float = float(os.getenv("POLITENESS_COOLDOWN", "60"))
+	# Longest wait for lazy-loaded results after each scroll
+	scroll_timeout: float = float(os.getenv("SCROLL_TIMEOUT", "2"))
+
+	# On-disk cache of job detail pages (HTML plus parsed fields) per canonical job URL;
+	# entries older than the TTL are revalidated with ETag/Last-Modified where possible
+	page_cache_enabled: bool = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+	page_cache_dir: str = os.getenv("PAGE_CACHE_DIR", ".cache/pages")
+	page_cache_max_bytes: int = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+	page_cache_ttl: float = float(os.getenv("PAGE_CACHE_TTL", "21600"))
+
+	# Near-duplicate detection: new jobs whose title/company/description MinHash similarity
+	# to a stored posting reaches near_dup_threshold join its cluster and are not alerted
+	near_dup_enabled: bool = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+	near_dup_threshold: float = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+
+	# Responses of /api/jobs, /api/alerts and /api/suggest/* are cached per normalized query
+	# and data version (bumped by ingest) and carry ETags; clients revalidate for 304s.
+	# With response_cache_redis_url set (needs the redis package) processes share one cache
+	response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+	response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+	response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+	response_cache_control: str = os.getenv("RESPONSE_CACHE_CONTROL", "no-cache")
+	response_cache_redis_url: str | None = os.getenv("RESPONSE_CACHE_REDIS_URL")
+
+	# Autocomplete index: full rebuild interval to pick up rows ingested by other processes
+	suggest_index_refresh_seconds: int = int(os.getenv("SUGGEST_INDEX_REFRESH_SECONDS", "600"))
 
 	# Alerting
 	email_enabled: bool = os.getenv("EMAIL_ENABLED", "false").lower() == "true"
@@ -25,13 +83,68 @@ class Settings(BaseModel):
 	sender_email: str | None = os.getenv("SENDER_EMAIL")
 	sender_password: str | None = os.getenv("SENDER_PASSWORD")
 	receiver_email: str | None = os.getenv("RECEIVER_EMAIL")
+	# Fold up to email_digest_size new jobs into one message instead of one email each
+	email_digest: bool = os.getenv("EMAIL_DIGEST", "false").lower() == "true"
+	email_digest_size: int = int(os.getenv("EMAIL_DIGEST_SIZE", "25"))
 
 	telegram_enabled: bool = os.getenv("TELEGRAM_ENABLED", "false").lower() == "true"
 	telegram_bot_token: str | None = os.getenv("TELEGRAM_BOT_TOKEN")
 	telegram_chat_id: str | None = os.getenv("TELEGRAM_CHAT_ID")
+	telegram_api_base: str = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+	# Bot API flood limits: about one message per second per chat, 30 per second overall
+	telegram_chat_rate: float = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+	telegram_global_rate: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+	telegram_max_retries: int = int(os.getenv("TELEGRAM_MAX_RETRIES", "5"))
+	# New jobs folded into one Telegram message
+	telegram_group_size: int = int(os.getenv("TELEGRAM_GROUP_SIZE", "10"))
 
-	# Scheduler
+	# Alert outbox: new jobs are queued at ingest and delivered by a background worker
+	outbox_poll_interval: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+	outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+	outbox_max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+	outbox_backoff_base: float = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+	outbox_backoff_max: float = float(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+	# A claimed batch not finished within this many seconds is picked up again
+	outbox_lease_seconds: int = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+	# Channels delivered concurrently by one worker
+	outbox_concurrency: int = int(os.getenv("OUTBOX_CONCURRENCY", "2"))
+
+	# Scheduler: saved searches run on their own schedules; with none saved yet, one
+	# search for schedule_keywords/schedule_location on schedule_cron is created
 	schedule_cron: str = os.getenv("SCHEDULE_CRON", "0 8 * * *")
+	schedule_keywords: str = os.getenv("SCHEDULE_KEYWORDS", "Software Engineer")
+	schedule_location: str = os.getenv("SCHEDULE_LOCATION", "Remote")
+	# How often the scheduler picks up saved searches changed by other processes
+	saved_search_sync_seconds: int = int(os.getenv("SAVED_SEARCH_SYNC_SECONDS", "60"))
+	# Only the process holding the scheduler lease (a row in leader_leases) runs saved
+	# searches; a dead leader is replaced once its lease expires
+	scheduler_leader_election: bool = os.getenv("SCHEDULER_LEADER_ELECTION", "true").lower() == "true"
+	scheduler_lease_seconds: float = float(os.getenv("SCHEDULER_LEASE_SECONDS", "30"))
+	scheduler_lease_renew_seconds: float = float(os.getenv("SCHEDULER_LEASE_RENEW_SECONDS", "10"))
+	# Stop paginating scheduled scrapes once a page is mostly already-stored jobs
+	incremental_scrape: bool = os.getenv("INCREMENTAL_SCRAPE", "true").lower() == "true"
+	incremental_known_ratio: float = float(os.getenv("INCREMENTAL_KNOWN_RATIO", "0.8"))
+
+	def roles(self) -> set[str]:
+		roles = {r.strip().lower() for r in self.app_role.split(",") if r.strip()}
+		if "all" in roles:
+			return {"api", "scraper", "scheduler"}
+		if "api-only" in roles:
+			roles.discard("api-only")
+		return roles | {"api"}
+
+	def has_role(self, role: str) -> bool:
+		return role in self.roles()
+
+	def email_configured(self) -> bool:
+		return bool(self.email_enabled and self.sender_email and self.sender_password and self.receiver_email)
+
+	def telegram_configured(self) -> bool:
+		return bool(self.telegram_enabled and self.telegram_bot_token and self.telegram_chat_id)
+
+	def alert_channels(self) -> list[str]:
+		"""Channels that new jobs are queued for."""
+		return [name for name, ok in (("email", self.email_configured()), ("telegram", self.telegram_configured())) if ok]
 
 
 settings = Settings()
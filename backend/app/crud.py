@@ -1,12 +1,25 @@
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+import base64
+import hashlib
+import json
+import zlib
 from sqlalchemy.orm import Session
-from sqlalchemy import select, asc, desc, func
-from datetime import date
+from sqlalchemy import select, insert, update, asc, desc, func, and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, timedelta
 
-from . import models
+from . import fulltext, metrics, models, near_duplicates
+from .identity import canonical_job_url, job_key
+from .config import settings
+from .suggest_index import suggestions
 from .schemas import JobCreate, JobFilter
 
 
+# order_by values that sort keyword searches by full-text relevance
+RANK_ORDERS = ("rank", "relevance")
+
+
 def _order_clause(model, order_by: Optional[str]):
 	if not order_by:
 		return desc(model.created_at)
@@ -16,10 +29,12 @@ def _order_clause(model, order_by: Optional[str]):
 	return direction(column) if column is not None else desc(model.created_at)
 
 
+@metrics.timed_query
 def create_job_if_not_exists(db: Session, job: JobCreate) -> models.Job | None:
-	# unique by job_link
+	# unique by posting, whatever tracking params the link carries
+	key = job_key(job.job_link)
 	existing = db.execute(
-		select(models.Job).where(models.Job.job_link == job.job_link)
+		select(models.Job.id).where(models.Job.dedup_key == key)
 	).scalar_one_or_none()
 	if existing:
 		return None
@@ -28,24 +43,196 @@ def create_job_if_not_exists(db: Session, job: JobCreate) -> models.Job | None:
 		company=job.company,
 		location=job.location,
 		posted_date=job.posted_date,
-		job_link=job.job_link,
+		job_link=canonical_job_url(job.job_link),
+		dedup_key=key,
 		experience_level=job.experience_level,
 		job_type=job.job_type,
 		keywords=job.keywords,
 	)
 	db.add(new_job)
+	bump_data_version(db, DATA_JOBS)
 	db.commit()
 	db.refresh(new_job)
 	return new_job
 
 
-def list_jobs(db: Session, filters: JobFilter):
-	stmt = select(models.Job)
-	if filters.keyword:
-		like = f"%{filters.keyword}%"
-		stmt = stmt.where(
-			(models.Job.title.ilike(like)) | (models.Job.keywords.ilike(like))
+# Rows per multi-row INSERT; keeps SQLite well under its bound-parameter limit
+INGEST_CHUNK_SIZE = 500
+
+
+def job_from_record(record: Mapping[str, Any], keywords: str | None = None) -> JobCreate | None:
+	"""Build a JobCreate from a scraped record, or None if it has no usable link."""
+	posted_date = record.get("posted_date")
+	if isinstance(posted_date, str):
+		try:
+			posted_date = date.fromisoformat(posted_date)  # yyyy-mm-dd
+		except ValueError:
+			posted_date = None
+	elif not isinstance(posted_date, date):
+		posted_date = None
+	try:
+		return JobCreate(
+			title=record.get("title") or "",
+			company=record.get("company") or None,
+			location=record.get("location") or None,
+			posted_date=posted_date,
+			job_link=record.get("job_link") or "",
+			experience_level=record.get("experience_level") or record.get("employment_type") or None,
+			job_type=record.get("job_type") or None,
+			keywords=record.get("keywords") or keywords,
+			description=record.get("description_text") or None,
 		)
+	except ValueError:
+		return None
+
+
+def _job_row(job: JobCreate, key: int, created_at: datetime) -> dict:
+	return {
+		"title": job.title,
+		"company": job.company,
+		"location": job.location,
+		"posted_date": job.posted_date,
+		"job_link": canonical_job_url(job.job_link),
+		"dedup_key": key,
+		"experience_level": job.experience_level,
+		"job_type": job.job_type,
+		"keywords": job.keywords,
+		"created_at": created_at,
+	}
+
+
+def _insert_job_chunk(db: Session, chunk: Sequence[tuple[int, JobCreate]]) -> list[models.Job]:
+	keys = [key for key, _ in chunk]
+	existing = set(
+		db.execute(select(models.Job.dedup_key).where(models.Job.dedup_key.in_(keys))).scalars()
+	)
+	now = datetime.utcnow()
+	rows = [_job_row(j, key, now) for key, j in chunk if key not in existing]
+	if not rows:
+		return []
+
+	dialect = db.get_bind().dialect.name
+	if dialect == "postgresql":
+		stmt = postgresql.insert(models.Job)
+	elif dialect == "sqlite":
+		stmt = sqlite.insert(models.Job)
+	else:
+		# No portable ON CONFLICT; rows were already filtered against the table above
+		new_jobs = [models.Job(**row) for row in rows]
+		db.add_all(new_jobs)
+		db.flush()
+		return new_jobs
+	stmt = (
+		stmt.values(rows)
+		.on_conflict_do_nothing(index_elements=[models.Job.dedup_key])
+		.returning(models.Job)
+	)
+	return list(db.scalars(stmt))
+
+
+@metrics.stage("ingest")
+@metrics.timed_query
+def bulk_create_jobs(
+	db: Session,
+	jobs: Iterable[JobCreate],
+	chunk_size: int = INGEST_CHUNK_SIZE,
+	alert_channels: Sequence[str] | None = None,
+) -> list[models.Job]:
+	"""Insert jobs whose posting is not stored yet and return only the created rows.
+
+	Postings are identified by ``identity.job_key`` of their link, so the same job
+	under different tracking URLs is stored (and alerted) once. Input is deduplicated
+	in memory, existing keys are resolved with one query per chunk and the remainder
+	goes in as a single INSERT ... ON CONFLICT DO NOTHING, so a
+	full scrape costs a handful of statements and one commit. Created jobs are then
+	clustered with near_duplicates, and alerts for those that are not near-duplicates
+	of a stored posting are queued in the outbox within the same transaction
+	(``alert_channels`` defaults to every configured channel).
+	"""
+	created: list[models.Job] = []
+	seen: set[int] = set()
+	descriptions: dict[int, str] = {}
+	chunk: list[tuple[int, JobCreate]] = []
+	for job in jobs:
+		if job is None or not job.job_link:
+			continue
+		key = job_key(job.job_link)
+		if key in seen:
+			continue
+		seen.add(key)
+		if job.description:
+			descriptions[key] = job.description
+		chunk.append((key, job))
+		if len(chunk) >= chunk_size:
+			created.extend(_insert_job_chunk(db, chunk))
+			chunk = []
+	if chunk:
+		created.extend(_insert_job_chunk(db, chunk))
+	alerted = created
+	if settings.near_dup_enabled and created:
+		near_duplicates.assign_clusters(db, created, {j.id: descriptions.get(j.dedup_key) for j in created})
+		alerted = [j for j in created if not near_duplicates.is_duplicate(j)]
+	enqueue_alerts(db, alerted, settings.alert_channels() if alert_channels is None else alert_channels)
+	if created:
+		bump_data_version(db, DATA_JOBS)
+	# Keep returned rows loaded; expiring them would cost a SELECT per job on first access
+	expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+	try:
+		db.commit()
+	finally:
+		db.expire_on_commit = expire_on_commit
+	suggestions.add_jobs(created)
+	return created
+
+
+@metrics.timed_query
+def known_job_links(db: Session, links: Iterable[str]) -> set[str]:
+	"""Subset of ``links`` whose posting is already stored, via the dedup key index."""
+	return set(job_ids_by_link(db, links))
+
+
+def _search_key(keywords: str, location: str) -> tuple[str, str]:
+	return (keywords or "").strip().lower(), (location or "").strip().lower()
+
+
+@metrics.timed_query
+def get_watermark(db: Session, keywords: str, location: str) -> models.ScrapeWatermark | None:
+	kw, loc = _search_key(keywords, location)
+	return db.execute(
+		select(models.ScrapeWatermark)
+		.where(models.ScrapeWatermark.keywords == kw)
+		.where(models.ScrapeWatermark.location == loc)
+	).scalar_one_or_none()
+
+
+@metrics.timed_query
+def update_watermark(db: Session, keywords: str, location: str, newest_posted_date: date | None, found: int) -> models.ScrapeWatermark:
+	mark = get_watermark(db, keywords, location)
+	if mark is None:
+		kw, loc = _search_key(keywords, location)
+		mark = models.ScrapeWatermark(keywords=kw, location=loc)
+		db.add(mark)
+	if newest_posted_date and (mark.newest_posted_date is None or newest_posted_date > mark.newest_posted_date):
+		mark.newest_posted_date = newest_posted_date
+	mark.last_found = found
+	mark.last_run_at = datetime.utcnow()
+	db.commit()
+	return mark
+
+
+def _filter_jobs(db: Session, stmt, filters: JobFilter):
+	"""Apply JobFilter to a jobs query; returns (stmt, rank column or None)."""
+	rank = None
+	if filters.keyword:
+		fts = fulltext.match_subquery(db, filters.keyword)
+		if fts is not None:
+			stmt = stmt.join(fts, fts.c.job_id == models.Job.id)
+			rank = fts.c.rank
+		else:
+			like = f"%{filters.keyword}%"
+			stmt = stmt.where(
+				(models.Job.title.ilike(like)) | (models.Job.keywords.ilike(like))
+			)
 	if filters.company:
 		stmt = stmt.where(models.Job.company == filters.company)
 	if filters.location:
@@ -54,124 +241,663 @@ def list_jobs(db: Session, filters: JobFilter):
 		stmt = stmt.where(models.Job.posted_date >= filters.date_from)
 	if filters.date_to:
 		stmt = stmt.where(models.Job.posted_date <= filters.date_to)
-	stmt = stmt.order_by(_order_clause(models.Job, filters.order_by)).offset(filters.offset).limit(filters.limit)
+	return stmt, rank
+
+
+# Columns that /api/jobs can page through with a cursor; each has a (column, id) index
+KEYSET_COLUMNS = ("created_at", "posted_date", "title", "company", "location", "id")
+
+
+class InvalidCursor(ValueError):
+	pass
+
+
+def _encode_cursor(order: str, value: Any, row_id: int) -> str:
+	if isinstance(value, (date, datetime)):
+		value = value.isoformat()
+	raw = json.dumps({"o": order, "v": value, "i": row_id}, separators=(",", ":"))
+	return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, order: str, column) -> tuple[Any, int]:
+	try:
+		data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+		if data["o"] != order:
+			raise InvalidCursor("cursor was issued for a different order_by")
+		value, row_id = data["v"], int(data["i"])
+		if value is not None:
+			python_type = column.type.python_type
+			if python_type is datetime:
+				value = datetime.fromisoformat(value)
+			elif python_type is date:
+				value = date.fromisoformat(value)
+		return value, row_id
+	except InvalidCursor:
+		raise
+	except Exception:
+		raise InvalidCursor("malformed cursor")
+
+
+def _keyset_sort(model, order_by: Optional[str]):
+	"""(order key, column, descending) for keyset paging, or None if order_by needs OFFSET."""
+	order_by = order_by or "-created_at"
+	field = order_by.lstrip("+-")
+	if field not in KEYSET_COLUMNS:
+		return None
+	descending = order_by.startswith("-")
+	return ("-" if descending else "") + field, getattr(model, field), descending
+
+
+def _keyset_page(db: Session, stmt, model, order_by: Optional[str], limit: int, offset: int, cursor: Optional[str]):
+	"""Run a paged query ordered by (sort column, id); returns (rows, next_cursor).
+
+	Nulls sort last in both directions. A cursor page is read as consecutive seeks on
+	the (column, id) index: the rest of the cursor's value by id, the values after it,
+	then the null rows by id, so it costs the same at any depth in either direction.
+	Orders outside KEYSET_COLUMNS fall back to OFFSET and return no cursor.
+	"""
+	spec = _keyset_sort(model, order_by)
+	if spec is None:
+		if cursor:
+			raise InvalidCursor("cursor paging is not supported for this order_by")
+		stmt = stmt.order_by(_order_clause(model, order_by)).offset(offset).limit(limit)
+		return db.execute(stmt).scalars().all(), None
+	order, column, descending = spec
+	direction = desc if descending else asc
+	after = (lambda c, v: c < v) if descending else (lambda c, v: c > v)
+	if not cursor and offset:
+		# OFFSET has to walk the skipped rows anyway; one query in the final order
+		ordered = [direction(model.id)] if column is model.id else [direction(column).nulls_last(), direction(model.id)]
+		rows = db.execute(stmt.order_by(*ordered).offset(offset).limit(limit + 1)).scalars().all()
+		return _keyset_result(rows, limit, order, column)
+
+	if column is model.id:
+		seeks = [stmt.where(after(model.id, _decode_cursor(cursor, order, column)[1])) if cursor else stmt]
+	elif not cursor:
+		seeks = [stmt.where(column.is_not(None)) if column.nullable else stmt]
+		if column.nullable:
+			seeks.append(stmt.where(column.is_(None)))
+	else:
+		value, last_id = _decode_cursor(cursor, order, column)
+		if value is None:
+			# The cursor is already past the last non-null value
+			seeks = [stmt.where(column.is_(None), after(model.id, last_id))]
+		else:
+			# Not a (column, id) row-value comparison: SQLite bounds that range by the column
+			# alone and walks every row sharing the cursor's value (a whole ingest batch)
+			seeks = [stmt.where(column == value, after(model.id, last_id)), stmt.where(after(column, value))]
+			if column.nullable:
+				seeks.append(stmt.where(column.is_(None)))
+	rows = []
+	for seek in seeks:
+		rows += db.execute(seek.order_by(direction(column), direction(model.id)).limit(limit + 1 - len(rows))).scalars().all()
+		if len(rows) > limit:
+			break
+	return _keyset_result(rows, limit, order, column)
+
+
+def _keyset_result(rows, limit: int, order: str, column):
+	if len(rows) <= limit:
+		return rows, None
+	rows = rows[:limit]
+	last = rows[-1]
+	return rows, _encode_cursor(order, getattr(last, column.key), last.id)
+
+
+@metrics.timed_query
+def list_jobs_page(db: Session, filters: JobFilter):
+	"""Jobs matching ``filters`` plus an opaque cursor for the next page (None on the last)."""
+	stmt, _ = _filter_jobs(db, select(models.Job), filters)
+	if filters.order_by in RANK_ORDERS:
+		if filters.cursor:
+			raise InvalidCursor("cursor paging is not supported for relevance order")
+		return list_jobs(db, filters), None
+	return _keyset_page(db, stmt, models.Job, filters.order_by, filters.limit, filters.offset, filters.cursor)
+
+
+def _ordered_jobs(db: Session, stmt, filters: JobFilter):
+	stmt, rank = _filter_jobs(db, stmt, filters)
+	if filters.order_by in RANK_ORDERS:
+		# Most relevant first when searching; newest first otherwise
+		order = [asc(rank), desc(models.Job.created_at)] if rank is not None else [desc(models.Job.created_at)]
+	else:
+		order = [_order_clause(models.Job, filters.order_by)]
+	# id breaks ties so streamed exports have a stable order
+	return stmt.order_by(*order, models.Job.id)
+
+
+@metrics.timed_query
+def list_jobs(db: Session, filters: JobFilter):
+	stmt = _ordered_jobs(db, select(models.Job), filters).offset(filters.offset).limit(filters.limit)
 	rows = db.execute(stmt).scalars().all()
 	return rows
 
 
+EXPORT_CHUNK_SIZE = 1000
+
+
+def stream_jobs(
+	db: Session, filters: JobFilter, limit: int | None = None, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list[Mapping[str, Any]]]:
+	"""Yield chunks of job rows (column mappings) matching ``filters``.
+
+	Rows come off a server-side cursor ``chunk_size`` at a time without building
+	ORM objects, so memory stays flat however many rows match. ``limit`` caps the
+	total; None exports everything.
+	"""
+	stmt = _ordered_jobs(db, select(*models.Job.__table__.columns), filters).offset(filters.offset)
+	if limit is not None:
+		stmt = stmt.limit(limit)
+	result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+	for partition in result.mappings().partitions():
+		yield partition
+
+
+@metrics.timed_query
 def count_jobs(db: Session, filters: JobFilter) -> int:
-	stmt = select(func.count(models.Job.id))
-	if filters.keyword:
-		like = f"%{filters.keyword}%"
-		stmt = stmt.where(
-			(models.Job.title.ilike(like)) | (models.Job.keywords.ilike(like))
-		)
-	if filters.company:
-		stmt = stmt.where(models.Job.company == filters.company)
-	if filters.location:
-		stmt = stmt.where(models.Job.location == filters.location)
-	if filters.date_from:
-		stmt = stmt.where(models.Job.posted_date >= filters.date_from)
-	if filters.date_to:
-		stmt = stmt.where(models.Job.posted_date <= filters.date_to)
+	stmt, _ = _filter_jobs(db, select(func.count(models.Job.id)), filters)
 	return db.execute(stmt).scalar_one() or 0
 
 
-def create_alert_log(db: Session, job_id: int, channel: str, status: str, message: str | None = None) -> models.AlertLog:
-	log = models.AlertLog(job_id=job_id, channel=channel, status=status, message=message)
-	db.add(log)
+@metrics.timed_query
+def job_ids_by_link(db: Session, links: Iterable[str]) -> dict[str, int]:
+	"""Stored job id per link, matching links by posting rather than exact text."""
+	by_key: dict[int, list[str]] = {}
+	for link in {l for l in links if l}:
+		by_key.setdefault(job_key(link), []).append(link)
+	keys = list(by_key)
+	ids: dict[str, int] = {}
+	for i in range(0, len(keys), INGEST_CHUNK_SIZE):
+		chunk = keys[i:i + INGEST_CHUNK_SIZE]
+		for key, job_id in db.execute(select(models.Job.dedup_key, models.Job.id).where(models.Job.dedup_key.in_(chunk))):
+			ids.update(dict.fromkeys(by_key[key], job_id))
+	return ids
+
+
+def listing_hash(record: Mapping[str, Any]) -> str:
+	"""Hash of the search-card fields of a scraped record."""
+	parts = [str(record.get(f) or "") for f in ("title", "company", "location", "posted_date")]
+	return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _details_hash(record: Mapping[str, Any]) -> str:
+	parts = [record.get("description_html"), record.get("description_text"), record.get("criteria"), record.get("employment_type")]
+	return hashlib.blake2b(json.dumps(parts, separators=(",", ":")).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _upsert_job_details(db: Session, rows: Sequence[Mapping[str, Any]]) -> None:
+	dialect = db.get_bind().dialect.name
+	if dialect not in ("postgresql", "sqlite"):
+		for row in rows:
+			db.merge(models.JobDetail(**row))
+		return
+	for i in range(0, len(rows), INGEST_CHUNK_SIZE):
+		stmt = (postgresql if dialect == "postgresql" else sqlite).insert(models.JobDetail).values(rows[i:i + INGEST_CHUNK_SIZE])
+		stmt = stmt.on_conflict_do_update(
+			index_elements=[models.JobDetail.job_id],
+			set_={c: stmt.excluded[c] for c in rows[0] if c != "job_id"},
+		)
+		db.execute(stmt)
+
+
+@metrics.timed_query
+def save_job_details(db: Session, records: Iterable[Mapping[str, Any]]) -> int:
+	"""Store the enriched details of scraped records in ``job_details`` and the full-text index.
+
+	Records that were not enriched and jobs whose stored details and card hash the same
+	are skipped; the rest are upserted in one statement per chunk and committed.
+	Returns how many rows were written.
+	"""
+	enriched = {
+		r["job_link"]: r for r in records
+		if r.get("job_link") and (r.get("description_html") or r.get("description_text"))
+	}
+	ids = job_ids_by_link(db, enriched)
+	if not ids:
+		return 0
+	Detail = models.JobDetail
+	stored: dict[int, tuple[str, str, datetime]] = {}
+	job_ids = list(set(ids.values()))
+	for i in range(0, len(job_ids), INGEST_CHUNK_SIZE):
+		chunk = job_ids[i:i + INGEST_CHUNK_SIZE]
+		rows = db.execute(
+			select(Detail.job_id, Detail.content_hash, Detail.listing_hash, Detail.updated_at).where(Detail.job_id.in_(chunk))
+		)
+		stored.update((job_id, (content, listing, updated)) for job_id, content, listing, updated in rows)
+	now = datetime.utcnow()
+	rows: dict[int, dict] = {}
+	for link, record in enriched.items():
+		job_id = ids.get(link)
+		content, listing = _details_hash(record), listing_hash(record)
+		previous = stored.get(job_id)
+		if job_id is None or (previous is not None and previous[:2] == (content, listing)):
+			continue
+		html = record.get("description_html")
+		rows[job_id] = {
+			"job_id": job_id,
+			"description_html_compressed": zlib.compress(html.encode("utf-8")) if html else None,
+			"description_text": record.get("description_text"),
+			"criteria": record.get("criteria") or [],
+			"employment_type": record.get("employment_type"),
+			"listing_hash": listing,
+			"content_hash": content,
+			"fetched_at": now,
+			"updated_at": now if previous is None or previous[0] != content else previous[2],
+		}
+	if not rows:
+		return 0
+	_upsert_job_details(db, list(rows.values()))
+	described = {
+		job_id: row["description_text"] for job_id, row in rows.items()
+		if job_id not in stored or stored[job_id][0] != row["content_hash"]
+	}
+	fulltext.index_descriptions(db, described)
+	if described:
+		# Keyword searches now match the new descriptions
+		bump_data_version(db, DATA_JOBS)
+	db.commit()
+	return len(rows)
+
+
+@metrics.timed_query
+def stored_job_details(db: Session, listings: Iterable[Mapping[str, Any]]) -> dict[str, dict]:
+	"""Stored details of listings whose search card is unchanged since they were enriched, by link."""
+	hashes = {l["job_link"]: listing_hash(l) for l in listings if l.get("job_link")}
+	ids = job_ids_by_link(db, hashes)
+	job_ids = list(set(ids.values()))
+	details: dict[int, models.JobDetail] = {}
+	for i in range(0, len(job_ids), INGEST_CHUNK_SIZE):
+		chunk = job_ids[i:i + INGEST_CHUNK_SIZE]
+		details.update((d.job_id, d) for d in db.scalars(select(models.JobDetail).where(models.JobDetail.job_id.in_(chunk))))
+	found: dict[str, dict] = {}
+	for link, job_id in ids.items():
+		d = details.get(job_id)
+		if d is not None and d.listing_hash == hashes[link]:
+			found[link] = {
+				"description_html": d.description_html,
+				"description_text": d.description_text,
+				"criteria": d.criteria or [],
+				"employment_type": d.employment_type,
+			}
+	return found
+
+
+@metrics.timed_query
+def get_job_details(db: Session, job_id: int) -> models.JobDetail | None:
+	return db.get(models.JobDetail, job_id)
+
+
+# Data versions: bumped in the transaction that changes the data, read by the response cache
+DATA_JOBS = "jobs"
+DATA_ALERTS = "alerts"
+
+
+def bump_data_version(db: Session, name: str) -> None:
+	"""Increment the ``name`` counter; does not commit so it joins the caller's transaction."""
+	now = datetime.utcnow()
+	Version = models.DataVersion
+	dialect = db.get_bind().dialect.name
+	if dialect in ("postgresql", "sqlite"):
+		stmt = (postgresql if dialect == "postgresql" else sqlite).insert(Version).values(name=name, version=1, updated_at=now)
+		db.execute(stmt.on_conflict_do_update(
+			index_elements=[Version.name],
+			set_={"version": Version.version + 1, "updated_at": now},
+		))
+		return
+	updated = db.execute(
+		update(Version).where(Version.name == name).values(version=Version.version + 1, updated_at=now)
+	).rowcount
+	if not updated:
+		db.add(Version(name=name, version=1, updated_at=now))
+		db.flush()
+
+
+@metrics.timed_query
+def data_versions(db: Session) -> dict[str, int]:
+	return dict(db.execute(select(models.DataVersion.name, models.DataVersion.version)).tuples().all())
+
+
+# Alert outbox
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_SENT = "sent"
+OUTBOX_DEAD = "dead"
+
+
+def outbox_key(channel: str, job_id: int) -> str:
+	return f"{channel}:{job_id}"
+
+
+def enqueue_alerts(db: Session, jobs: Sequence[models.Job], channels: Sequence[str]) -> int:
+	"""Queue one outbox row per (job, channel); does not commit so it joins the caller's transaction."""
+	if not jobs or not channels:
+		return 0
+	now = datetime.utcnow()
+	rows = [
+		{
+			"job_id": job.id,
+			"channel": channel,
+			"idempotency_key": outbox_key(channel, job.id),
+			"status": OUTBOX_PENDING,
+			"attempts": 0,
+			"next_attempt_at": now,
+			"created_at": now,
+		}
+		for job in jobs
+		for channel in channels
+	]
+	db.execute(insert(models.AlertOutbox), rows)
+	return len(rows)
+
+
+def _outbox_due(now: datetime):
+	Outbox = models.AlertOutbox
+	return or_(
+		and_(Outbox.status == OUTBOX_PENDING, Outbox.next_attempt_at <= now),
+		# Claimed by a worker that died before finishing
+		and_(Outbox.status == OUTBOX_SENDING, Outbox.locked_until < now),
+	)
+
+
+@metrics.timed_query
+def claim_alert_outbox(db: Session, worker: str, limit: int, lease_seconds: int) -> list[models.AlertOutbox]:
+	"""Claim up to ``limit`` due outbox rows for ``worker`` and return them.
+
+	The claim is a conditional UPDATE, so concurrent workers (threads or processes)
+	never receive the same row while its lease is held.
+	"""
+	Outbox = models.AlertOutbox
+	now = datetime.utcnow()
+	ids = db.execute(select(Outbox.id).where(_outbox_due(now)).order_by(Outbox.id).limit(limit)).scalars().all()
+	if not ids:
+		return []
+	db.execute(
+		update(Outbox)
+		.where(Outbox.id.in_(ids), _outbox_due(now))
+		.values(status=OUTBOX_SENDING, claimed_by=worker, locked_until=now + timedelta(seconds=lease_seconds))
+	)
+	db.commit()
+	stmt = select(Outbox).where(Outbox.id.in_(ids), Outbox.status == OUTBOX_SENDING, Outbox.claimed_by == worker)
+	return db.execute(stmt.order_by(Outbox.id)).scalars().all()
+
+
+@metrics.timed_query
+def finish_alert_outbox(
+	db: Session,
+	worker: str,
+	outcomes: Sequence[Tuple[Mapping[str, Any], Optional[Mapping[str, Any]]]],
+) -> int:
+	"""Apply per-row outbox outcomes and write their alert logs in one commit.
+
+	``outcomes`` are (update, log or None) pairs; each update has the row's ``id`` and
+	the ``locked_until`` of the claim it was delivered under. A row whose lease ran out
+	and was claimed again meanwhile is left to its new holder, and its log is dropped.
+	Returns how many rows were updated.
+	"""
+	Outbox = models.AlertOutbox
+	logs = []
+	finished = 0
+	for values, log in outcomes:
+		values = dict(values)
+		row_id, claimed_until = values.pop("id"), values.pop("locked_until")
+		matched = db.execute(
+			update(Outbox)
+			.where(Outbox.id == row_id, Outbox.claimed_by == worker, Outbox.locked_until == claimed_until)
+			.values(claimed_by=None, locked_until=None, **values)
+			.execution_options(synchronize_session=False)
+		).rowcount
+		if not matched:
+			continue
+		finished += 1
+		if log is not None:
+			logs.append(log)
+	if logs:
+		now = datetime.utcnow()
+		db.execute(insert(models.AlertLog), [{"message": None, **log, "created_at": now} for log in logs])
+		bump_data_version(db, DATA_ALERTS)
+	db.commit()
+	return finished
+
+
+@metrics.timed_query
+def alert_outbox_counts(db: Session) -> dict[str, int]:
+	rows = db.execute(
+		select(models.AlertOutbox.status, func.count()).group_by(models.AlertOutbox.status)
+	).all()
+	counts = {s: 0 for s in (OUTBOX_PENDING, OUTBOX_SENDING, OUTBOX_SENT, OUTBOX_DEAD)}
+	counts.update({status: n for status, n in rows})
+	return counts
+
+
+@metrics.timed_query
+def jobs_by_id(db: Session, ids: Iterable[int]) -> dict[int, models.Job]:
+	ids = list(set(ids))
+	if not ids:
+		return {}
+	return {job.id: job for job in db.execute(select(models.Job).where(models.Job.id.in_(ids))).scalars()}
+
+
+@metrics.timed_query
+def list_alert_logs_page(db: Session, limit: int = 100, offset: int = 0, cursor: str | None = None):
+	return _keyset_page(db, select(models.AlertLog), models.AlertLog, "-created_at", limit, offset, cursor)
+
+
+# Background scrape runs
+@metrics.timed_query
+def create_scrape_run(
+	db: Session,
+	kind: str,
+	keywords: str,
+	location: str,
+	params: dict | None = None,
+	holder: str | None = None,
+	lease_seconds: float | None = None,
+) -> models.ScrapeRun:
+	run = models.ScrapeRun(kind=kind, keywords=keywords, location=location, params=params or {}, status="queued", holder=holder)
+	if lease_seconds is not None:
+		run.lease_expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds)
+	db.add(run)
 	db.commit()
-	db.refresh(log)
-	return log
+	db.refresh(run)
+	return run
+
+
+@metrics.timed_query
+def get_scrape_run(db: Session, run_id: int) -> models.ScrapeRun | None:
+	return db.get(models.ScrapeRun, run_id)
 
 
-def list_alert_logs(db: Session, limit: int = 100, offset: int = 0):
-	stmt = select(models.AlertLog).order_by(desc(models.AlertLog.created_at)).offset(offset).limit(limit)
+@metrics.timed_query
+def list_scrape_runs(db: Session, limit: int = 50, status: str | None = None):
+	stmt = select(models.ScrapeRun)
+	if status:
+		stmt = stmt.where(models.ScrapeRun.status == status)
+	stmt = stmt.order_by(desc(models.ScrapeRun.id)).limit(limit)
 	return db.execute(stmt).scalars().all()
 
 
-# Suggestions / Autocomplete helpers
-def suggest_keywords(db: Session, q: str, limit: int = 10) -> list[str]:
-    like = f"%{q}%" if q else "%"
-    titles = (
-        db.execute(
-            select(models.Job.title)
-            .where(models.Job.title.ilike(like))
-            .group_by(models.Job.title)
-            .order_by(func.count(models.Job.id).desc())
-            .limit(limit)
-        )
-        .scalars()
-        .all()
-    )
-    keywords = (
-        db.execute(
-            select(models.Job.keywords)
-            .where(models.Job.keywords.is_not(None))
-            .where(models.Job.keywords.ilike(like))
-            .group_by(models.Job.keywords)
-            .order_by(func.count(models.Job.id).desc())
-            .limit(limit)
-        )
-        .scalars()
-        .all()
-    )
-    # Tokenize words from popular titles/keywords for prefix matches
-    tokens: list[str] = []
-    prefix = (q or "").strip().lower()
-    def add_token(t: str):
-        t = (t or "").strip()
-        if not t:
-            return
-        for part in t.replace("/", " ").replace("-", " ").split():
-            if prefix and not part.lower().startswith(prefix):
-                continue
-            tokens.append(part)
-    for t in titles:
-        add_token(t)
-    for t in keywords:
-        add_token(t)
-
-    merged: list[str] = []
-    seen = set()
-    for term in [*tokens, *titles, *keywords, "Engineer", "Developer", "Data Scientist", "Product Manager", "Designer", "Analyst"]:
-        if term and term not in seen:
-            merged.append(term)
-            seen.add(term)
-        if len(merged) >= limit:
-            break
-    return merged
-
-
-def suggest_companies(db: Session, q: str, limit: int = 10) -> list[str]:
-    like = f"%{q}%" if q else "%"
-    rows = (
-        db.execute(
-            select(models.Job.company)
-            .where(models.Job.company.is_not(None))
-            .where(models.Job.company.ilike(like))
-            .group_by(models.Job.company)
-            .order_by(func.count(models.Job.id).desc())
-            .limit(limit)
-        )
-        .scalars()
-        .all()
-    )
-    return [r for r in rows if r]
-
-
-def suggest_locations(db: Session, q: str, limit: int = 10) -> list[str]:
-    like = f"%{q}%" if q else "%"
-    rows = (
-        db.execute(
-            select(models.Job.location)
-            .where(models.Job.location.is_not(None))
-            .where(models.Job.location.ilike(like))
-            .group_by(models.Job.location)
-            .order_by(func.count(models.Job.id).desc())
-            .limit(limit)
-        )
-        .scalars()
-        .all()
-    )
-    return [r for r in rows if r]
\ No newline at end of file
+@metrics.timed_query
+def update_scrape_run(db: Session, run_id: int, **fields) -> models.ScrapeRun | None:
+	run = db.get(models.ScrapeRun, run_id)
+	if run is None:
+		return None
+	for k, v in fields.items():
+		setattr(run, k, v)
+	db.commit()
+	return run
+
+
+@metrics.timed_query
+def renew_scrape_runs(db: Session, holder: str, lease_seconds: float) -> int:
+	"""Extend the lease on every queued/running run owned by ``holder``."""
+	Run = models.ScrapeRun
+	renewed = db.execute(
+		update(Run)
+		.where(Run.holder == holder, Run.status.in_(["queued", "running"]))
+		.values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+	).rowcount
+	db.commit()
+	return renewed
+
+
+@metrics.timed_query
+def fail_expired_scrape_runs(db: Session, error: str) -> int:
+	"""Mark queued/running runs whose owner stopped renewing their lease as failed.
+
+	Runs from before leases existed have none and count as expired. Runs of live
+	processes, including other workers of the same deployment, are left alone.
+	"""
+	Run = models.ScrapeRun
+	now = datetime.utcnow()
+	failed = db.execute(
+		update(Run)
+		.where(Run.status.in_(["queued", "running"]), or_(Run.lease_expires_at.is_(None), Run.lease_expires_at < now))
+		.values(status="failed", error=error, finished_at=now)
+	).rowcount
+	db.commit()
+	return failed
+
+
+# Saved searches
+@metrics.timed_query
+def create_saved_search(db: Session, **fields) -> models.SavedSearch:
+	search = models.SavedSearch(**fields)
+	db.add(search)
+	db.commit()
+	db.refresh(search)
+	return search
+
+
+@metrics.timed_query
+def get_saved_search(db: Session, search_id: int) -> models.SavedSearch | None:
+	return db.get(models.SavedSearch, search_id)
+
+
+@metrics.timed_query
+def list_saved_searches(db: Session, enabled: bool | None = None) -> list[models.SavedSearch]:
+	stmt = select(models.SavedSearch)
+	if enabled is not None:
+		stmt = stmt.where(models.SavedSearch.enabled.is_(enabled))
+	stmt = stmt.order_by(desc(models.SavedSearch.priority), models.SavedSearch.id)
+	return list(db.execute(stmt).scalars().all())
+
+
+@metrics.timed_query
+def update_saved_search(db: Session, search_id: int, **fields) -> models.SavedSearch | None:
+	search = db.get(models.SavedSearch, search_id)
+	if search is None:
+		return None
+	for k, v in fields.items():
+		setattr(search, k, v)
+	db.commit()
+	db.refresh(search)
+	return search
+
+
+@metrics.timed_query
+def delete_saved_search(db: Session, search_id: int) -> bool:
+	search = db.get(models.SavedSearch, search_id)
+	if search is None:
+		return False
+	db.delete(search)
+	db.commit()
+	return True
+
+
+def _apply_run_stats(search: models.SavedSearch, run: models.ScrapeRun) -> None:
+	# Only a search still waiting on this run takes its result, so each run is counted once
+	if search.last_status not in ("queued", "running"):
+		return
+	search.last_status = run.status
+	search.last_found = run.found
+	search.last_created = run.created
+	search.last_error = run.error
+	if run.started_at and run.finished_at:
+		search.last_duration_seconds = (run.finished_at - run.started_at).total_seconds()
+	search.run_count = (search.run_count or 0) + 1
+
+
+@metrics.timed_query
+def mark_saved_search_submitted(db: Session, search_id: int, run_id: int) -> None:
+	"""Point a saved search at the run executing it (possibly one shared with other searches)."""
+	search = db.get(models.SavedSearch, search_id)
+	run = db.get(models.ScrapeRun, run_id)
+	if search is None or run is None:
+		return
+	search.last_run_id = run_id
+	search.last_run_at = datetime.utcnow()
+	search.last_status = "queued"
+	if run.status not in ("queued", "running"):
+		# Finished before we got here; record_saved_search_run already passed this search by
+		_apply_run_stats(search, run)
+	db.commit()
+
+
+@metrics.timed_query
+def record_saved_search_run(db: Session, run_id: int) -> int:
+	"""Copy a finished run's outcome onto the saved searches it was run for."""
+	run = db.get(models.ScrapeRun, run_id)
+	ids = (run.params or {}).get("saved_search_ids") if run is not None else None
+	if not ids:
+		return 0
+	searches = db.execute(
+		select(models.SavedSearch).where(models.SavedSearch.id.in_(ids), models.SavedSearch.last_run_id == run_id)
+	).scalars().all()
+	for search in searches:
+		_apply_run_stats(search, run)
+	db.commit()
+	return len(searches)
+
+
+# Leader leases
+@metrics.timed_query
+def acquire_lease(db: Session, name: str, holder: str, ttl_seconds: float) -> bool:
+	"""Take or renew the lease ``name`` for ``holder``; True when ``holder`` owns it afterwards.
+
+	Taking over is a conditional UPDATE on the one lease row, so of several processes
+	racing for an expired lease exactly one wins.
+	"""
+	Lease = models.LeaderLease
+	now = datetime.utcnow()
+	expires = now + timedelta(seconds=ttl_seconds)
+	renewed = db.execute(
+		update(Lease)
+		.where(Lease.name == name, Lease.holder == holder, Lease.expires_at >= now)
+		.values(renewed_at=now, expires_at=expires)
+	).rowcount
+	if not renewed:
+		renewed = db.execute(
+			update(Lease)
+			.where(Lease.name == name, Lease.expires_at < now)
+			.values(holder=holder, acquired_at=now, renewed_at=now, expires_at=expires)
+		).rowcount
+	db.commit()
+	if renewed:
+		return True
+	if db.execute(select(Lease.name).where(Lease.name == name)).first() is not None:
+		return False
+	# First contender ever: create the row; a concurrent creator makes this fail harmlessly
+	try:
+		db.execute(insert(Lease).values(name=name, holder=holder, acquired_at=now, renewed_at=now, expires_at=expires))
+		db.commit()
+		return True
+	except IntegrityError:
+		db.rollback()
+		return False
+
+
+@metrics.timed_query
+def release_lease(db: Session, name: str, holder: str) -> bool:
+	"""Expire ``holder``'s lease now so another process can take over without waiting out the TTL."""
+	released = db.execute(
+		update(models.LeaderLease)
+		.where(models.LeaderLease.name == name, models.LeaderLease.holder == holder)
+		.values(expires_at=datetime.utcnow())
+	).rowcount
+	db.commit()
+	return bool(released)
+
+
+@metrics.timed_query
+def get_lease(db: Session, name: str) -> models.LeaderLease | None:
+	return db.get(models.LeaderLease, name)
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
@@ -16,3 +17,45 @@ def get_db():
 		yield db
 	finally:
 		db.close()
+
+
+def _add_missing_columns() -> None:
+	"""Add nullable columns that models gained after their table was created."""
+	inspector = inspect(engine)
+	existing_tables = set(inspector.get_table_names())
+	for table in Base.metadata.sorted_tables:
+		if table.name not in existing_tables:
+			continue
+		present = {c["name"] for c in inspector.get_columns(table.name)}
+		missing = [c for c in table.columns if c.name not in present and c.nullable]
+		if not missing:
+			continue
+		with engine.begin() as conn:
+			for column in missing:
+				conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"))
+
+
+def init_db() -> None:
+	"""Create missing tables, and columns and indexes added to tables that already existed.
+
+	create_all only creates columns and indexes together with their table, so
+	existing databases would otherwise never get new ones.
+	"""
+	from . import models  # noqa: F401  (register tables on Base.metadata)
+	from .identity import backfill_job_keys
+
+	for attempt in range(3):
+		try:
+			Base.metadata.create_all(bind=engine)
+			_add_missing_columns()
+			# Columns the indexes below rely on must exist on older tables first
+			backfill_job_keys(engine)
+			for table in Base.metadata.sorted_tables:
+				for index in table.indexes:
+					index.create(bind=engine, checkfirst=True)
+			return
+		except DBAPIError:
+			# Several workers starting on a fresh database race between the existence
+			# check and CREATE; the next pass sees what the others created
+			if attempt == 2:
+				raise
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import Mapping, Optional
+
+from sqlalchemy import Float, Integer, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+_installed: set[str] = set()
+# Dialect -> monotonic time this process last looked for an index installed elsewhere
+_checked: dict[str, float] = {}
+RECHECK_SECONDS = 30.0
+
+# Index table per dialect; it is created in the same transaction as the triggers
+_TABLES = {"sqlite": "jobs_fts", "postgresql": "job_search"}
+# Serialises the DDL of workers starting together (arbitrary app-wide advisory lock id)
+_PG_LOCK_ID = 0x6A6F62735F667473 >> 1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_DDL = [
+	"""
+	CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+		title, company, keywords, description,
+		tokenize = 'unicode61 remove_diacritics 2',
+		prefix = '2 3'
+	)
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+		INSERT INTO jobs_fts(rowid, title, company, keywords, description)
+		VALUES (new.id, new.title, coalesce(new.company, ''), coalesce(new.keywords, ''), '');
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+		DELETE FROM jobs_fts WHERE rowid = old.id;
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, keywords ON jobs BEGIN
+		UPDATE jobs_fts
+		SET title = new.title, company = coalesce(new.company, ''), keywords = coalesce(new.keywords, '')
+		WHERE rowid = new.id;
+	END
+	""",
+	"""
+	INSERT INTO jobs_fts(rowid, title, company, keywords, description)
+	SELECT id, title, coalesce(company, ''), coalesce(keywords, ''), ''
+	FROM jobs WHERE id NOT IN (SELECT rowid FROM jobs_fts)
+	""",
+]
+
+_POSTGRES_DDL = [
+	"""
+	CREATE OR REPLACE FUNCTION job_search_document(t text, c text, k text, d text) RETURNS tsvector AS $$
+		SELECT setweight(to_tsvector('simple', coalesce(t, '')), 'A')
+			|| setweight(to_tsvector('simple', coalesce(c, '')), 'B')
+			|| setweight(to_tsvector('simple', coalesce(k, '')), 'B')
+			|| setweight(to_tsvector('simple', coalesce(d, '')), 'C')
+	$$ LANGUAGE sql IMMUTABLE
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS job_search (
+		job_id integer PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+		description text NOT NULL DEFAULT '',
+		document tsvector NOT NULL
+	)
+	""",
+	"CREATE INDEX IF NOT EXISTS ix_job_search_document ON job_search USING GIN (document)",
+	"""
+	CREATE OR REPLACE FUNCTION job_search_sync() RETURNS trigger AS $$
+	BEGIN
+		INSERT INTO job_search(job_id, description, document)
+		VALUES (NEW.id, '', job_search_document(NEW.title, NEW.company, NEW.keywords, ''))
+		ON CONFLICT (job_id) DO UPDATE
+		SET document = job_search_document(NEW.title, NEW.company, NEW.keywords, job_search.description);
+		RETURN NEW;
+	END
+	$$ LANGUAGE plpgsql
+	""",
+	"DROP TRIGGER IF EXISTS jobs_search_sync ON jobs",
+	"""
+	CREATE TRIGGER jobs_search_sync AFTER INSERT OR UPDATE OF title, company, keywords ON jobs
+	FOR EACH ROW EXECUTE FUNCTION job_search_sync()
+	""",
+	"""
+	INSERT INTO job_search(job_id, description, document)
+	SELECT id, '', job_search_document(title, company, keywords, '') FROM jobs
+	ON CONFLICT (job_id) DO NOTHING
+	""",
+]
+
+
+def install(engine: Engine) -> bool:
+	"""Create the job full-text index, its sync triggers and backfill existing jobs.
+
+	SQLite gets an FTS5 table (``jobs_fts``), Postgres a GIN-indexed tsvector table
+	(``job_search``). Triggers keep title/company/keywords in sync with ``jobs``;
+	enriched descriptions are written through ``index_descriptions``. Returns False
+	where neither is available, in which case search falls back to ILIKE. Idempotent,
+	and safe for several processes to run at once: Postgres serialises them on an
+	advisory lock, and a failed attempt (e.g. SQLite busy) is retried.
+	"""
+	dialect = engine.dialect.name
+	ddl = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(dialect)
+	if ddl is None:
+		return False
+	for attempt in range(3):
+		try:
+			with engine.begin() as conn:
+				if dialect == "postgresql":
+					# Concurrent DROP/CREATE TRIGGER on one table would otherwise fail in all but one worker
+					conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _PG_LOCK_ID})
+				for stmt in ddl:
+					conn.execute(text(stmt))
+			break
+		except Exception as e:
+			if attempt == 2:
+				logger.warning("Full-text index unavailable on %s, using ILIKE search: %s", dialect, e)
+				return False
+			time.sleep(0.5 * (attempt + 1))
+	_installed.add(dialect)
+	return True
+
+
+def available(db: Session) -> bool:
+	"""Whether the index can be queried; rechecks every RECHECK_SECONDS while it isn't.
+
+	A process whose own ``install`` failed picks up an index another process installed.
+	"""
+	dialect = db.get_bind().dialect.name
+	if dialect in _installed:
+		return True
+	table = _TABLES.get(dialect)
+	now = time.monotonic()
+	if table is None or now - _checked.get(dialect, float("-inf")) < RECHECK_SECONDS:
+		return False
+	_checked[dialect] = now
+	if not inspect(db.connection()).has_table(table):
+		return False
+	logger.info("Full-text index found on %s; switching from ILIKE search", dialect)
+	_installed.add(dialect)
+	return True
+
+
+def _tokens(query: str) -> list[str]:
+	return _TOKEN_RE.findall(query or "")
+
+
+def match_subquery(db: Session, query: str):
+	"""Subquery of (job_id, rank) for jobs matching every token as a prefix.
+
+	Lower rank is more relevant on both dialects. Returns None when the index is
+	unavailable or the query has no searchable tokens.
+	"""
+	tokens = _tokens(query)
+	if not tokens or not available(db):
+		return None
+	if db.get_bind().dialect.name == "sqlite":
+		expr = " ".join(f'"{t}"*' for t in tokens)
+		stmt = text(
+			"SELECT rowid AS job_id, bm25(jobs_fts, 10.0, 4.0, 4.0, 1.0) AS rank "
+			"FROM jobs_fts WHERE jobs_fts MATCH :q"
+		)
+	else:
+		expr = " & ".join(f"{t}:*" for t in tokens)
+		stmt = text(
+			"SELECT job_id, -ts_rank(document, to_tsquery('simple', :q)) AS rank "
+			"FROM job_search WHERE document @@ to_tsquery('simple', :q)"
+		)
+	return stmt.bindparams(q=expr).columns(job_id=Integer, rank=Float).subquery("fts")
+
+
+def index_descriptions(db: Session, descriptions: Mapping[int, Optional[str]]) -> None:
+	"""Add enriched description text for already-stored jobs to the index."""
+	if not descriptions or not available(db):
+		return
+	params = [{"id": job_id, "d": d or ""} for job_id, d in descriptions.items()]
+	if db.get_bind().dialect.name == "sqlite":
+		db.execute(text("UPDATE jobs_fts SET description = :d WHERE rowid = :id"), params)
+	else:
+		db.execute(
+			text(
+				"UPDATE job_search SET description = :d, "
+				"document = job_search_document(j.title, j.company, j.keywords, :d) "
+				"FROM jobs j WHERE job_search.job_id = :id AND j.id = :id"
+			),
+			params,
+		)
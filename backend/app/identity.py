@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+
+_JOB_ID_RE = re.compile(r"(?:/jobs/view/(?:[^/?#]*-)?|currentJobId=|jobPosting/)(\d{6,})")
+
+# Query parameters LinkedIn and ad links add per impression; they never change the posting
+TRACKING_PARAMS = frozenset({
+	"refid", "trackingid", "trk", "trkinfo", "position", "pagenum", "originalsubdomain",
+	"ebp", "lipi", "lici", "midtoken", "midsig", "utm_source", "utm_medium", "utm_campaign",
+	"utm_term", "utm_content",
+})
+
+
+def extract_job_id(job_url: str) -> Optional[str]:
+	m = _JOB_ID_RE.search(job_url or "")
+	return m.group(1) if m else None
+
+
+def canonical_job_url(job_url: str) -> str:
+	"""One URL per posting: ``/jobs/view/<id>/`` for LinkedIn, otherwise the URL minus tracking params."""
+	job_id = extract_job_id(job_url)
+	if job_id:
+		return f"{LINKEDIN_BASE_URL}/jobs/view/{job_id}/"
+	parts = urlsplit((job_url or "").strip())
+	query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in TRACKING_PARAMS)
+	return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def job_key(job_url: str) -> int:
+	"""Fixed-width dedup key: the LinkedIn job ID itself, or a negative 64-bit hash of the canonical URL.
+
+	The two ranges can't collide since job IDs are positive.
+	"""
+	job_id = extract_job_id(job_url)
+	if job_id:
+		return int(job_id)
+	digest = hashlib.blake2b(canonical_job_url(job_url).encode("utf-8"), digest_size=8).digest()
+	return -(int.from_bytes(digest, "big") >> 1) - 1
+
+
+def _merge(conn: Connection, keep: int, duplicates: List[int]) -> None:
+	params = {"keep": keep, "dups": duplicates}
+	dups = bindparam("dups", expanding=True)
+	conn.execute(text("UPDATE alert_logs SET job_id = :keep WHERE job_id IN :dups").bindparams(dups), params)
+	# Queued alerts for the duplicates would announce the same posting again
+	conn.execute(text("DELETE FROM alert_outbox WHERE job_id IN :dups").bindparams(dups), params)
+	conn.execute(text("DELETE FROM jobs WHERE id IN :dups").bindparams(dups), params)
+
+
+def backfill_job_keys(engine: Engine) -> Dict[str, int]:
+	"""Give pre-existing jobs a dedup key and canonical link, merging postings stored twice.
+
+	Adds the ``dedup_key`` column to tables created before it existed. Of each group of
+	rows with the same key the oldest is kept; alert logs move to it and the others are
+	deleted. Runs in one transaction and is a no-op once every row has a key, so it is
+	safe to call on every startup.
+	"""
+	if "jobs" not in inspect(engine).get_table_names():
+		return {"updated": 0, "merged": 0}
+	columns = {c["name"] for c in inspect(engine).get_columns("jobs")}
+	postgres = engine.dialect.name == "postgresql"
+	with engine.begin() as conn:
+		if "dedup_key" not in columns:
+			conn.execute(text("ALTER TABLE jobs ADD COLUMN dedup_key BIGINT"))
+		elif conn.execute(text("SELECT 1 FROM jobs WHERE dedup_key IS NULL LIMIT 1")).first() is None:
+			return {"updated": 0, "merged": 0}
+		if postgres:
+			# Concurrent workers wait here and then find nothing left to do
+			conn.execute(text("LOCK TABLE jobs IN SHARE ROW EXCLUSIVE MODE"))
+		groups: Dict[int, List[int]] = defaultdict(list)
+		# Rows still without a key -> their link
+		links: Dict[int, str] = {}
+		for job_id, link, key in conn.execute(text("SELECT id, job_link, dedup_key FROM jobs ORDER BY id")):
+			if key is None:
+				key = job_key(link)
+				links[job_id] = link
+			groups[key].append(job_id)
+		merged = 0
+		for ids in groups.values():
+			if len(ids) > 1:
+				_merge(conn, ids[0], ids[1:])
+				merged += len(ids) - 1
+		# After the merge, so no remaining row still holds a link being canonicalized
+		updates = [
+			{"id": ids[0], "key": key, "link": canonical_job_url(links[ids[0]])}
+			for key, ids in groups.items()
+			if ids[0] in links
+		]
+		if updates:
+			conn.execute(text("UPDATE jobs SET dedup_key = :key, job_link = :link WHERE id = :id"), updates)
+		if postgres:
+			conn.execute(text("ALTER TABLE jobs ALTER COLUMN dedup_key SET NOT NULL"))
+			conn.execute(text("ALTER TABLE jobs DROP CONSTRAINT IF EXISTS uq_jobs_job_link"))
+	if merged or updates:
+		logger.info("Backfilled dedup keys for %d jobs, merged %d duplicates", len(updates), merged)
+	return {"updated": len(updates), "merged": merged}
+
+
+if __name__ == "__main__":
+	# One-off run ahead of a deploy: python -m app.identity
+	from .database import engine, init_db
+
+	print(backfill_job_keys(engine))
+	init_db()
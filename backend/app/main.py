@@ -1,14 +1,81 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.staticfiles import StaticFiles
 from .config import settings
-from .database import Base, engine
-from .scheduler import start_scheduler
+from .database import engine, init_db
+from . import fulltext, metrics
+from .suggest_index import suggestions
+
+
+def startup() -> None:
+	# Create tables (simple approach for SQLite). For production, prefer Alembic migrations.
+	init_db()
+	fulltext.install(engine)
+
+	# Autocomplete is served from memory; load it before the first keystroke arrives
+	suggestions.rebuild()
+
+	# Scraping, alert delivery and the scheduler are imported only by the roles that run them
+	if settings.has_role("scraper"):
+		from .services.outbox import start_outbox_worker
+		from .services.scrape_queue import recover_interrupted_runs
+
+		# Scrapes of processes that stopped can't resume; other workers' live runs are kept
+		recover_interrupted_runs()
+
+		# Deliver alerts queued by ingest (scheduled and API scrapes alike)
+		start_outbox_worker()
+
+		# Start browsers ahead of the first scrape so requests don't pay Chrome startup
+		if settings.driver_pool_warm:
+			from .services.driver_pool import get_driver_pool
+
+			get_driver_pool().warm(settings.driver_pool_warm)
+
+	if settings.has_role("scheduler"):
+		from .scheduler import start_scheduler
+
+		start_scheduler()
+
+
+def shutdown() -> None:
+	import sys
 
-app = FastAPI(title="LinkedIn Job Scraper & Alert System", version="1.0.0")
+	# Only tear down what this process actually started
+	if "app.scheduler" in sys.modules:
+		from .scheduler import stop_scheduler
+
+		stop_scheduler()
+	if "app.services.scrape_queue" in sys.modules:
+		from .services.scrape_queue import shutdown_scrape_queue
+
+		shutdown_scrape_queue()
+	if "app.services.outbox" in sys.modules:
+		from .services.outbox import stop_outbox_worker
+
+		stop_outbox_worker()
+	if "app.services.fetchers" in sys.modules:
+		from .services.fetchers import close_http_clients
+
+		close_http_clients()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	startup()
+	try:
+		yield
+	finally:
+		shutdown()
+
+
+app = FastAPI(title="LinkedIn Job Scraper & Alert System", version="1.0.0", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -19,12 +86,6 @@ app.add_middleware(
 	allow_headers=["*"],
 )
 
-# Create tables (simple approach for SQLite). For production, prefer Alembic migrations.
-Base.metadata.create_all(bind=engine)
-
-# Start scheduler
-start_scheduler()
-
 
 @app.get("/api/health")
 async def health():
@@ -36,6 +97,11 @@ async def version():
 	return {"name": app.title, "version": app.version}
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+	return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Error handlers
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -60,7 +126,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 			"error": {
 				"type": "validation_error",
 				"status": 422,
-				"detail": exc.errors(),
+				"detail": jsonable_encoder(exc.errors()),
 				"path": str(request.url.path),
 			},
 		},
@@ -84,10 +150,11 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 
 # Routers will be included after modules are created to avoid circular imports
 try:
-	from .routers import jobs, alerts
+	from .routers import jobs, alerts, saved_searches
 
 	app.include_router(jobs.router, prefix="/api")
 	app.include_router(alerts.router, prefix="/api")
+	app.include_router(saved_searches.router, prefix="/api")
 except Exception:
 	# During first-run scaffolding, routers may not exist yet.
 	pass
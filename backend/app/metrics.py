@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; wide enough for a parse (ms) and a paced page load behind a host cooldown (tens of s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+	parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+	if extra:
+		parts.append(extra)
+	return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+	if math.isinf(value):
+		return "+Inf" if value > 0 else "-Inf"
+	return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+	kind = ""
+
+	def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+		self.name = name
+		self.help = help
+		self.labelnames = tuple(labelnames)
+		self._lock = threading.Lock()
+
+	def _key(self, labels: Dict[str, str]) -> LabelValues:
+		if set(labels) != set(self.labelnames):
+			raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+		return tuple(str(labels[n]) for n in self.labelnames)
+
+	def samples(self) -> Iterable[str]:
+		raise NotImplementedError
+
+	def render(self) -> List[str]:
+		return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(_Metric):
+	kind = "counter"
+
+	def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+		super().__init__(name, help, labelnames)
+		self._values: Dict[LabelValues, float] = {}
+
+	def inc(self, amount: float = 1.0, **labels: str) -> None:
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0.0) + amount
+
+	def value(self, **labels: str) -> float:
+		return self._values.get(self._key(labels), 0.0)
+
+	def samples(self) -> Iterable[str]:
+		with self._lock:
+			items = sorted(self._values.items())
+		for key, value in items:
+			yield f"{self.name}_total{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(_Metric):
+	"""Set directly, or computed at scrape time by ``callback`` returning (label values, value) pairs."""
+
+	kind = "gauge"
+
+	def __init__(
+		self,
+		name: str,
+		help: str,
+		labelnames: Sequence[str] = (),
+		callback: Optional[Callable[[], Iterable[Tuple[LabelValues, float]]]] = None,
+	):
+		super().__init__(name, help, labelnames)
+		self._values: Dict[LabelValues, float] = {}
+		self.callback = callback
+
+	def set(self, value: float, **labels: str) -> None:
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = value
+
+	def samples(self) -> Iterable[str]:
+		with self._lock:
+			values = dict(self._values)
+		if self.callback is not None:
+			try:
+				values.update((tuple(map(str, k)), v) for k, v in self.callback())
+			except Exception:
+				pass
+		for key, value in sorted(values.items()):
+			yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+	kind = "histogram"
+
+	def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+		super().__init__(name, help, labelnames)
+		self.buckets = tuple(sorted(buckets))
+		# label values -> [per-bucket counts..., +Inf count], sum
+		self._counts: Dict[LabelValues, List[int]] = {}
+		self._sums: Dict[LabelValues, float] = {}
+
+	def observe(self, value: float, **labels: str) -> None:
+		key = self._key(labels)
+		i = bisect_left(self.buckets, value)
+		with self._lock:
+			counts = self._counts.get(key)
+			if counts is None:
+				counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+				self._sums[key] = 0.0
+			counts[i] += 1
+			self._sums[key] += value
+
+	@contextmanager
+	def time(self, **labels: str) -> Iterator[None]:
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.observe(time.perf_counter() - start, **labels)
+
+	def count(self, **labels: str) -> int:
+		return sum(self._counts.get(self._key(labels), ()))
+
+	def samples(self) -> Iterable[str]:
+		with self._lock:
+			items = sorted((k, list(c), self._sums[k]) for k, c in self._counts.items())
+		for key, counts, total in items:
+			cumulative = 0
+			for bound, n in zip((*self.buckets, math.inf), counts):
+				cumulative += n
+				le = 'le="%s"' % _number(bound)
+				yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+			yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+			yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+	"""Holds metrics and renders them in the Prometheus text exposition format."""
+
+	def __init__(self):
+		self._metrics: Dict[str, _Metric] = {}
+		self._lock = threading.Lock()
+
+	def register(self, metric: _Metric) -> _Metric:
+		with self._lock:
+			existing = self._metrics.get(metric.name)
+			if existing is not None:
+				return existing
+			self._metrics[metric.name] = metric
+			return metric
+
+	def render(self) -> str:
+		with self._lock:
+			metrics = list(self._metrics.values())
+		lines: List[str] = []
+		for metric in metrics:
+			lines.extend(metric.render())
+		return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+	return REGISTRY.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+	return REGISTRY.register(Gauge(name, help, labelnames, callback))  # type: ignore[return-value]
+
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+	return REGISTRY.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+
+# Scrape pipeline
+SCRAPE_STAGE_SECONDS = histogram(
+	"scrape_stage_seconds",
+	"Time spent per scrape stage (driver_startup, politeness_wait, page_load, scroll_wait, card_extraction, "
+	"detail_extraction, ingest, alert_send)",
+	["stage"],
+)
+SCRAPE_PAGES = counter("scrape_pages", "Search result pages loaded", ["backend"])
+SCRAPE_CARDS = counter("scrape_cards", "Job cards extracted from search pages", ["backend"])
+SCRAPE_DETAILS = counter("scrape_details", "Job detail pages extracted", ["backend"])
+SCRAPE_PAGES_PER_SECOND = gauge("scrape_pages_per_second", "Search pages per second over the last finished scrape", ["backend"])
+SCRAPE_CARDS_PER_SECOND = gauge("scrape_cards_per_second", "Job cards per second over the last finished scrape", ["backend"])
+
+# Politeness
+POLITENESS_OUTCOMES = counter("politeness_outcomes", "Page outcomes fed back to the host rate controller", ["outcome"])
+
+# Ingest
+NEAR_DUPLICATES = counter("near_duplicates", "New jobs joined to the cluster of a similar stored posting")
+
+# Detail page cache
+PAGE_CACHE_HIT = "hit"
+PAGE_CACHE_REVALIDATED = "revalidated"
+PAGE_CACHE_MISS = "miss"
+PAGE_CACHE_REQUESTS = counter(
+	"page_cache_requests", "Detail page cache lookups: hit (fresh), revalidated (304) or miss", ["result"]
+)
+PAGE_CACHE_BYTES_SAVED = counter("page_cache_bytes_saved", "Page bytes served from the cache instead of downloaded")
+
+
+def _page_cache_hit_ratio():
+	hits = PAGE_CACHE_REQUESTS.value(result=PAGE_CACHE_HIT) + PAGE_CACHE_REQUESTS.value(result=PAGE_CACHE_REVALIDATED)
+	total = hits + PAGE_CACHE_REQUESTS.value(result=PAGE_CACHE_MISS)
+	return [((), hits / total)] if total else []
+
+
+PAGE_CACHE_HIT_RATIO = gauge(
+	"page_cache_hit_ratio", "Share of detail page lookups answered without a full download", callback=_page_cache_hit_ratio
+)
+
+# API response cache
+RESPONSE_CACHE_REQUESTS = counter(
+	"response_cache_requests", "Cached read endpoint requests by outcome (hit, miss, not_modified)", ["route", "result"]
+)
+
+# Driver pool
+DRIVER_ACQUIRE_SECONDS = histogram("driver_pool_acquire_seconds", "Time waiting for a browser lease, including startup")
+
+# Database
+DB_QUERY_SECONDS = histogram(
+	"db_query_seconds",
+	"Latency of crud functions",
+	["function"],
+	buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# Alerts
+ALERT_SEND_SECONDS = histogram("alert_send_seconds", "Latency of one alert delivery batch per channel", ["channel"])
+ALERT_DELIVERIES = counter("alert_deliveries", "Alert delivery outcomes per job", ["channel", "status"])
+
+
+def stage(name: str):
+	"""Context manager timing one scrape stage."""
+	return SCRAPE_STAGE_SECONDS.time(stage=name)
+
+
+def timed_query(fn: Callable) -> Callable:
+	"""Record the latency of a crud function under its name."""
+	name = fn.__name__
+
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return fn(*args, **kwargs)
+		finally:
+			DB_QUERY_SECONDS.observe(time.perf_counter() - start, function=name)
+
+	return wrapper
+
+
+class ThroughputTimer:
+	"""Counts pages and cards for one scrape and publishes its rates when finished."""
+
+	def __init__(self, backend: str):
+		self.backend = backend
+		self.pages = 0
+		self.cards = 0
+		self.started = time.perf_counter()
+
+	def page(self, cards: int) -> None:
+		self.pages += 1
+		self.cards += cards
+		SCRAPE_PAGES.inc(backend=self.backend)
+		SCRAPE_CARDS.inc(cards, backend=self.backend)
+
+	def finish(self) -> None:
+		elapsed = time.perf_counter() - self.started
+		if self.pages and elapsed > 0:
+			SCRAPE_PAGES_PER_SECOND.set(self.pages / elapsed, backend=self.backend)
+			SCRAPE_CARDS_PER_SECOND.set(self.cards / elapsed, backend=self.backend)
@@ -1,13 +1,21 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Date, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Boolean, Column, Integer, Float, String, DateTime, Text, Date, ForeignKey, UniqueConstraint, Index, JSON, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
+import zlib
 from .database import Base
 
 
 class Job(Base):
 	__tablename__ = "jobs"
 	__table_args__ = (
-		UniqueConstraint("job_link", name="uq_jobs_job_link"),
+		# One row per posting: identity.job_key of the link (LinkedIn job ID or URL hash)
+		Index("uq_jobs_dedup_key", "dedup_key", unique=True),
+		# (sort column, id) pairs backing keyset pagination in crud._keyset_page
+		Index("ix_jobs_created_at_id", "created_at", "id"),
+		Index("ix_jobs_posted_date_id", "posted_date", "id"),
+		Index("ix_jobs_title_id", "title", "id"),
+		Index("ix_jobs_company_id", "company", "id"),
+		Index("ix_jobs_location_id", "location", "id"),
 	)
 
 	id = Column(Integer, primary_key=True, index=True)
@@ -15,17 +23,65 @@ class Job(Base):
 	company = Column(String(255), nullable=True)
 	location = Column(String(255), nullable=True)
 	posted_date = Column(Date, nullable=True)
+	# Canonical URL (identity.canonical_job_url)
 	job_link = Column(Text, nullable=False)
+	dedup_key = Column(BigInteger, nullable=False)
 	experience_level = Column(String(100), nullable=True)
 	job_type = Column(String(100), nullable=True)
 	keywords = Column(String(255), nullable=True)
 	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	# Near-duplicate cluster (see near_duplicates): id of the first posting of the cluster,
+	# NULL while no other posting resembles this one
+	cluster_id = Column(Integer, nullable=True, index=True)
+	# Packed MinHash signature; NULL until the job has been clustered
+	minhash = deferred(Column(LargeBinary, nullable=True))
 
 	alerts = relationship("AlertLog", back_populates="job", cascade="all, delete-orphan")
+	# Enriched detail page; not loaded with job lists
+	details = relationship("JobDetail", back_populates="job", uselist=False, cascade="all, delete-orphan")
+
+
+class JobDetail(Base):
+	"""Enriched detail page of a job, written in bulk by the advanced scrape."""
+
+	__tablename__ = "job_details"
+
+	job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+	# zlib-compressed; read through description_html
+	description_html_compressed = Column(LargeBinary, nullable=True)
+	description_text = Column(Text, nullable=True)
+	criteria = Column(JSON, nullable=True)
+	employment_type = Column(String(100), nullable=True)
+	# Hash of the search card the details were fetched for; a card with the same hash
+	# on a later scrape is not enriched again
+	listing_hash = Column(String(32), nullable=False)
+	# Hash of the extracted details; unchanged details are not rewritten
+	content_hash = Column(String(32), nullable=False)
+	fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+	job = relationship("Job", back_populates="details")
+
+	@property
+	def description_html(self) -> str | None:
+		data = self.description_html_compressed
+		return zlib.decompress(data).decode("utf-8") if data is not None else None
+
+
+class JobLshBucket(Base):
+	"""One LSH band of a job's MinHash signature; jobs sharing a bucket are near-duplicate candidates."""
+
+	__tablename__ = "job_lsh_buckets"
+
+	bucket = Column(BigInteger, primary_key=True)
+	job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True, index=True)
 
 
 class AlertLog(Base):
 	__tablename__ = "alert_logs"
+	__table_args__ = (
+		Index("ix_alert_logs_created_at_id", "created_at", "id"),
+	)
 
 	id = Column(Integer, primary_key=True, index=True)
 	job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -35,3 +91,125 @@ class AlertLog(Base):
 	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 	job = relationship("Job", back_populates="alerts")
+
+
+class ScrapeWatermark(Base):
+	"""High-water mark of the last scrape for one (keywords, location) search."""
+
+	__tablename__ = "scrape_watermarks"
+	__table_args__ = (
+		UniqueConstraint("keywords", "location", name="uq_scrape_watermarks_search"),
+	)
+
+	id = Column(Integer, primary_key=True, index=True)
+	keywords = Column(String(255), nullable=False)
+	location = Column(String(255), nullable=False)
+	newest_posted_date = Column(Date, nullable=True)
+	last_found = Column(Integer, nullable=False, default=0)
+	last_run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ScrapeRun(Base):
+	"""A scrape submitted through the API or scheduler and executed in the background."""
+
+	__tablename__ = "scrape_runs"
+
+	id = Column(Integer, primary_key=True, index=True)
+	kind = Column(String(50), nullable=False)
+	keywords = Column(String(255), nullable=False)
+	location = Column(String(255), nullable=False)
+	params = Column(JSON, nullable=True)
+	status = Column(String(50), nullable=False, default="queued", index=True)
+	found = Column(Integer, nullable=True)
+	created = Column(Integer, nullable=True)
+	result = Column(JSON, nullable=True)
+	error = Column(Text, nullable=True)
+	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	started_at = Column(DateTime, nullable=True)
+	finished_at = Column(DateTime, nullable=True)
+	# Process that queued the run and executes it, and until when it has vouched for it
+	holder = Column(String(100), nullable=True)
+	lease_expires_at = Column(DateTime, nullable=True)
+
+
+class SavedSearch(Base):
+	"""A (keywords, location) search the scheduler runs on its own cron or interval.
+
+	Runs go through the scrape queue; the last_* columns describe the most recent one.
+	"""
+
+	__tablename__ = "saved_searches"
+
+	id = Column(Integer, primary_key=True, index=True)
+	name = Column(String(255), nullable=True)
+	keywords = Column(String(255), nullable=False)
+	location = Column(String(255), nullable=False)
+	# Exactly one of cron (crontab syntax) and interval_minutes is set
+	cron = Column(String(100), nullable=True)
+	interval_minutes = Column(Integer, nullable=True)
+	# Higher runs first when the scrape queue is backed up
+	priority = Column(Integer, nullable=False, default=0)
+	max_pages = Column(Integer, nullable=False, default=3)
+	enabled = Column(Boolean, nullable=False, default=True)
+	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+	last_run_id = Column(Integer, nullable=True)
+	last_run_at = Column(DateTime, nullable=True)
+	last_status = Column(String(50), nullable=True)
+	last_found = Column(Integer, nullable=True)
+	last_created = Column(Integer, nullable=True)
+	last_duration_seconds = Column(Float, nullable=True)
+	last_error = Column(Text, nullable=True)
+	run_count = Column(Integer, nullable=False, default=0)
+
+
+class LeaderLease(Base):
+	"""A named lease held by one process at a time (e.g. the scheduler leader).
+
+	The holder renews ``expires_at`` periodically; once it lapses any process may take over.
+	"""
+
+	__tablename__ = "leader_leases"
+
+	name = Column(String(100), primary_key=True)
+	holder = Column(String(255), nullable=False)
+	acquired_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	renewed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	expires_at = Column(DateTime, nullable=False)
+
+
+class DataVersion(Base):
+	"""Change counter per kind of data ("jobs", "alerts"); cached API responses key on it."""
+
+	__tablename__ = "data_versions"
+
+	name = Column(String(50), primary_key=True)
+	version = Column(BigInteger, nullable=False, default=0)
+	updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class AlertOutbox(Base):
+	"""One pending alert delivery, written in the same transaction as the job it announces.
+
+	The outbox worker claims due rows, delivers them and records the outcome in
+	``alert_logs``; ``idempotency_key`` keeps a job from being queued twice per channel.
+	"""
+
+	__tablename__ = "alert_outbox"
+	__table_args__ = (
+		UniqueConstraint("idempotency_key", name="uq_alert_outbox_idempotency_key"),
+		Index("ix_alert_outbox_status_next_attempt", "status", "next_attempt_at"),
+	)
+
+	id = Column(Integer, primary_key=True, index=True)
+	job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+	channel = Column(String(50), nullable=False)
+	idempotency_key = Column(String(100), nullable=False)
+	status = Column(String(50), nullable=False, default="pending")
+	attempts = Column(Integer, nullable=False, default=0)
+	next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	claimed_by = Column(String(100), nullable=True)
+	locked_until = Column(DateTime, nullable=True)
+	last_error = Column(Text, nullable=True)
+	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	sent_at = Column(DateTime, nullable=True)
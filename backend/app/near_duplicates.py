@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+import struct
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import metrics, models
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Signature layout; changing any of these invalidates stored signatures (re-run with --rebuild).
+# 16 bands of 8 rows make pairs above ~0.7 similarity candidates (about 95% of pairs at 0.8)
+# while pairs at 0.3 almost never are, so short title-only texts don't flood the check
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 2
+
+_PRIME = (1 << 61) - 1
+# Minima are stored truncated to 32 bits; a false match costs 2**-32 per row
+_MASK = 0xFFFFFFFF
+# Signature of a job without any text; such jobs are never bucketed
+_EMPTY = (_MASK,) * NUM_PERM
+# Fixed seed: every process must draw the same permutations
+_rng = random.Random(0x6A6F6273)
+_PERMUTATIONS = [(_rng.getrandbits(61) | 1, _rng.getrandbits(61)) for _ in range(NUM_PERM)]
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+
+# Bucket/job id lookups per statement; keeps SQLite under its bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+Signature = Tuple[int, ...]
+
+
+def _shingles(title: Optional[str], company: Optional[str], description: Optional[str]) -> set[int]:
+	tokens = _TOKEN_RE.findall(" ".join(filter(None, (title, company, description))).lower())
+	if len(tokens) < SHINGLE_SIZE:
+		grams = tokens
+	else:
+		grams = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+	return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams}
+
+
+def signature(title: Optional[str], company: Optional[str], description: Optional[str] = None) -> Signature:
+	"""MinHash of the word shingles of title, company and description."""
+	hashes = _shingles(title, company, description)
+	if not hashes:
+		return _EMPTY
+	return tuple(min((a * h + b) % _PRIME for h in hashes) & _MASK for a, b in _PERMUTATIONS)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+	"""Estimated Jaccard similarity of the two shingle sets."""
+	return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_buckets(sig: Signature) -> List[int]:
+	"""One signed 64-bit bucket per band; none for a job without any text."""
+	if sig == _EMPTY:
+		return []
+	buckets = []
+	for band in range(BANDS):
+		rows = struct.pack(f"<H{ROWS}I", band, *sig[band * ROWS:(band + 1) * ROWS])
+		buckets.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "little", signed=True))
+	return buckets
+
+
+def pack(sig: Signature) -> bytes:
+	return _PACK.pack(*sig)
+
+
+def unpack(data: bytes) -> Signature:
+	return _PACK.unpack(data)
+
+
+def is_duplicate(job: models.Job) -> bool:
+	return job.cluster_id is not None and job.cluster_id != job.id
+
+
+def _candidates(db: Session, buckets: Iterable[int]) -> Dict[int, List[int]]:
+	"""Stored job ids per bucket."""
+	buckets = list(set(buckets))
+	found: Dict[int, List[int]] = {}
+	for i in range(0, len(buckets), _LOOKUP_CHUNK):
+		chunk = buckets[i:i + _LOOKUP_CHUNK]
+		rows = db.execute(
+			select(models.JobLshBucket.bucket, models.JobLshBucket.job_id).where(models.JobLshBucket.bucket.in_(chunk))
+		)
+		for bucket, job_id in rows:
+			found.setdefault(bucket, []).append(job_id)
+	return found
+
+
+def _stored(db: Session, ids: Iterable[int]) -> Dict[int, Tuple[Signature, Optional[int]]]:
+	"""(signature, cluster id) of stored, already clustered jobs."""
+	ids = list(set(ids))
+	stored: Dict[int, Tuple[Signature, Optional[int]]] = {}
+	Job = models.Job
+	for i in range(0, len(ids), _LOOKUP_CHUNK):
+		chunk = ids[i:i + _LOOKUP_CHUNK]
+		rows = db.execute(select(Job.id, Job.minhash, Job.cluster_id).where(Job.id.in_(chunk)).where(Job.minhash.is_not(None)))
+		stored.update((job_id, (unpack(data), cluster_id)) for job_id, data, cluster_id in rows)
+	return stored
+
+
+def assign_clusters(
+	db: Session,
+	jobs: Sequence[models.Job],
+	descriptions: Mapping[int, Optional[str]] | None = None,
+	threshold: float | None = None,
+) -> int:
+	"""Sign ``jobs``, index them in the LSH buckets and join each to the cluster of its closest match.
+
+	Candidates come from ``job_lsh_buckets`` (jobs sharing at least one band) plus the
+	earlier jobs of the same batch, so the cost does not grow with the table. A job
+	whose best candidate reaches ``threshold`` gets that candidate's cluster id; the
+	first posting of a cluster carries its own id. Does not commit. Returns how many
+	jobs were marked as duplicates.
+	"""
+	if not jobs:
+		return 0
+	threshold = settings.near_dup_threshold if threshold is None else threshold
+	descriptions = descriptions or {}
+	signed = [(job, signature(job.title, job.company, descriptions.get(job.id))) for job in jobs]
+	job_buckets = {job.id: band_buckets(sig) for job, sig in signed}
+	stored_buckets = _candidates(db, (b for buckets in job_buckets.values() for b in buckets))
+	known = _stored(db, (job_id for ids in stored_buckets.values() for job_id in ids))
+
+	batch_buckets: Dict[int, List[int]] = {}
+	batch: Dict[int, Tuple[models.Job, Signature]] = {}
+	# Stored jobs that became the first posting of a cluster
+	founders: set[int] = set()
+	duplicates = 0
+	for job, sig in signed:
+		candidates = set()
+		for bucket in job_buckets[job.id]:
+			candidates.update(stored_buckets.get(bucket, ()))
+			candidates.update(batch_buckets.get(bucket, ()))
+		candidates.discard(job.id)
+		# Ties go to the older posting
+		best, best_score = None, 0.0
+		for cand in sorted(candidates):
+			cand_sig = batch[cand][1] if cand in batch else known[cand][0] if cand in known else None
+			score = similarity(sig, cand_sig) if cand_sig is not None else 0.0
+			if score > best_score:
+				best, best_score = cand, score
+		job.minhash = pack(sig)
+		if best is not None and best_score >= threshold:
+			if best in batch:
+				founder = batch[best][0]
+				if founder.cluster_id is None:
+					founder.cluster_id = best
+				cluster = founder.cluster_id
+			else:
+				cluster = known[best][1]
+				if cluster is None:
+					cluster = best
+					founders.add(best)
+					known[best] = (known[best][0], best)
+			job.cluster_id = cluster
+			duplicates += 1
+		batch[job.id] = (job, sig)
+		for bucket in job_buckets[job.id]:
+			batch_buckets.setdefault(bucket, []).append(job.id)
+
+	if founders:
+		db.execute(
+			update(models.Job)
+			.where(models.Job.id.in_(founders))
+			.where(models.Job.cluster_id.is_(None))
+			.values(cluster_id=models.Job.id)
+		)
+	rows = [{"bucket": bucket, "job_id": job_id} for job_id, buckets in job_buckets.items() for bucket in set(buckets)]
+	if rows:
+		db.execute(insert(models.JobLshBucket.__table__), rows)
+	db.flush()
+	if duplicates:
+		metrics.NEAR_DUPLICATES.inc(duplicates)
+	return duplicates
+
+
+def _descriptions(db: Session, job_ids: Iterable[int]) -> Dict[int, str]:
+	Detail = models.JobDetail
+	rows = db.execute(select(Detail.job_id, Detail.description_text).where(Detail.job_id.in_(list(job_ids))))
+	return {job_id: text for job_id, text in rows if text}
+
+
+def cluster_existing(db: Session, rebuild: bool = False, chunk_size: int = _LOOKUP_CHUNK) -> Dict[str, int]:
+	"""Batch mode: cluster every stored job that has no signature yet, oldest first.
+
+	With ``rebuild`` all signatures, buckets and cluster ids are dropped first, e.g.
+	after changing the threshold. Commits after each chunk, so it can be interrupted
+	and resumed.
+	"""
+	from . import crud
+
+	if rebuild:
+		db.execute(delete(models.JobLshBucket))
+		db.execute(update(models.Job).values(minhash=None, cluster_id=None))
+		db.commit()
+	processed = duplicates = 0
+	while True:
+		jobs = list(
+			db.scalars(select(models.Job).where(models.Job.minhash.is_(None)).order_by(models.Job.id).limit(chunk_size))
+		)
+		if not jobs:
+			break
+		duplicates += assign_clusters(db, jobs, _descriptions(db, (j.id for j in jobs)))
+		# cluster_id is part of the job listings
+		crud.bump_data_version(db, crud.DATA_JOBS)
+		db.commit()
+		processed += len(jobs)
+	logger.info("Clustered %d jobs, %d near-duplicates", processed, duplicates)
+	return {"processed": processed, "duplicates": duplicates}
+
+
+if __name__ == "__main__":
+	import argparse
+
+	from .database import SessionLocal, init_db
+
+	parser = argparse.ArgumentParser(description="Cluster stored jobs into near-duplicate groups.")
+	parser.add_argument("--rebuild", action="store_true", help="drop existing signatures and clusters first")
+	args = parser.parse_args()
+	init_db()
+	db = SessionLocal()
+	try:
+		print(cluster_existing(db, rebuild=args.rebuild))
+	finally:
+		db.close()
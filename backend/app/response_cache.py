@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence, Tuple, Union
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from . import crud, metrics
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+HIT = "hit"
+MISS = "miss"
+NOT_MODIFIED = "not_modified"
+
+_SEPARATOR = b"\n"
+
+
+class LocalBackend:
+	"""In-process LRU of at most ``max_entries`` responses."""
+
+	def __init__(self, max_entries: int):
+		self.max_entries = max_entries
+		self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: str) -> Optional[bytes]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			expires, value = entry
+			if expires <= time.monotonic():
+				del self._entries[key]
+				return None
+			self._entries.move_to_end(key)
+			return value
+
+	def set(self, key: str, value: bytes, ttl: int) -> None:
+		with self._lock:
+			self._entries[key] = (time.monotonic() + ttl, value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+
+class RedisBackend:
+	"""Responses shared by every API process through any client with Redis' get/set(ex=) API.
+
+	Cache errors are logged and treated as misses, so an unreachable server only costs speed.
+	"""
+
+	def __init__(self, client: Any, prefix: str = "job-scraper:response:"):
+		self.client = client
+		self.prefix = prefix
+
+	def get(self, key: str) -> Optional[bytes]:
+		try:
+			return self.client.get(self.prefix + key)
+		except Exception as e:
+			logger.warning("Response cache get failed: %s", e)
+			return None
+
+	def set(self, key: str, value: bytes, ttl: int) -> None:
+		try:
+			self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+		except Exception as e:
+			logger.warning("Response cache set failed: %s", e)
+
+
+Backend = Union[LocalBackend, RedisBackend]
+
+_backend: Optional[Backend] = None
+_local_backend: Optional[LocalBackend] = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend() -> Backend:
+	url = settings.response_cache_redis_url
+	if url:
+		try:
+			import redis  # type: ignore
+		except ImportError:
+			logger.warning("RESPONSE_CACHE_REDIS_URL is set but redis is not installed; caching in process")
+		else:
+			return RedisBackend(redis.Redis.from_url(url))
+	return LocalBackend(settings.response_cache_max_entries)
+
+
+def get_backend() -> Backend:
+	global _backend
+	with _backend_lock:
+		if _backend is None:
+			_backend = _create_backend()
+		return _backend
+
+
+def get_local_backend() -> LocalBackend:
+	"""This process's own cache: the backend itself when it is local, else a separate LRU."""
+	global _local_backend
+	backend = get_backend()
+	if isinstance(backend, LocalBackend):
+		return backend
+	with _backend_lock:
+		if _local_backend is None:
+			_local_backend = LocalBackend(settings.response_cache_max_entries)
+		return _local_backend
+
+
+def set_backend(backend: Optional[Backend]) -> None:
+	"""Replace the process-wide backend (None recreates it from settings on next use)."""
+	global _backend, _local_backend
+	with _backend_lock:
+		_backend = backend
+		_local_backend = None
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+	return TypeAdapter(response_type)
+
+
+def _serialize(response_type: Any, data: Any) -> bytes:
+	adapter = _adapter(response_type)
+	return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def _key(request: Request, versions: Sequence[int]) -> str:
+	# Parameter order and empty parameters don't change the result
+	params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+	raw = repr((request.url.path, params, tuple(versions))).encode("utf-8")
+	return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+	if not if_none_match:
+		return False
+	if if_none_match.strip() == "*":
+		return True
+	tags = (t.strip() for t in if_none_match.split(","))
+	# If-None-Match uses the weak comparison
+	return etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def respond(
+	request: Request,
+	db: Session,
+	response_type: Any,
+	compute: Callable[[], Any],
+	depends_on: Sequence[str] = (crud.DATA_JOBS,),
+	generation: Optional[int] = None,
+) -> Any:
+	"""Answer a read endpoint from the response cache, computing and storing the body on a miss.
+
+	Entries are keyed by path, normalized query parameters and the ``depends_on`` data
+	versions, so writes that bump a version make older entries unreachable and the TTL
+	only bounds how long they take up space. Responses carry a strong ETag of the body;
+	a matching If-None-Match gets a 304 without a body.
+
+	Bodies computed from in-process state pass its ``generation`` instead: they are
+	keyed by it rather than the data versions and stay in this process's own cache,
+	since another process's state may differ.
+	"""
+	if not settings.response_cache_enabled:
+		return compute()
+	route = getattr(request.scope.get("route"), "path", request.url.path)
+	if generation is not None:
+		key = _key(request, [generation])
+		backend = get_local_backend()
+	else:
+		# Read before computing: a body is never older than the versions it is stored under
+		versions = crud.data_versions(db)
+		key = _key(request, [versions.get(name, 0) for name in depends_on])
+		backend = get_backend()
+	cached = backend.get(key)
+	if cached is not None:
+		etag, body = cached.split(_SEPARATOR, 1)
+		etag = etag.decode("ascii")
+		result = HIT
+	else:
+		body = _serialize(response_type, compute())
+		etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+		backend.set(key, etag.encode("ascii") + _SEPARATOR + body, settings.response_cache_ttl)
+		result = MISS
+	headers = {"ETag": etag, "Cache-Control": settings.response_cache_control}
+	if _matches(request.headers.get("if-none-match"), etag):
+		metrics.RESPONSE_CACHE_REQUESTS.inc(route=route, result=NOT_MODIFIED)
+		return Response(status_code=304, headers=headers)
+	metrics.RESPONSE_CACHE_REQUESTS.inc(route=route, result=result)
+	return Response(content=body, media_type="application/json", headers=headers)
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
 
 from ..database import get_db
-from .. import crud
-from ..schemas import AlertLogRead
+from .. import crud, response_cache
+from ..schemas import AlertLogPage
 
 router = APIRouter(tags=["alerts"])
 
 
-@router.get("/alerts", response_model=List[AlertLogRead])
-def get_alerts(limit: int = 100, offset: int = 0, db: Session = Depends(get_db)):
-	return crud.list_alert_logs(db, limit=limit, offset=offset)
+@router.get("/alerts", response_model=AlertLogPage)
+def get_alerts(
+	request: Request,
+	limit: int = 100,
+	offset: int = 0,
+	cursor: str | None = None,
+	db: Session = Depends(get_db),
+):
+	def compute():
+		try:
+			items, next_cursor = crud.list_alert_logs_page(db, limit=min(max(limit, 1), 500), offset=max(offset, 0), cursor=cursor)
+		except crud.InvalidCursor as e:
+			raise HTTPException(status_code=400, detail=str(e))
+		return {"items": items, "next_cursor": next_cursor}
+
+	return response_cache.respond(request, db, AlertLogPage, compute, depends_on=(crud.DATA_ALERTS,))
+
+
+@router.get("/alerts/outbox")
+def get_alert_outbox(db: Session = Depends(get_db)):
+	"""Queued alert deliveries by status."""
+	return crud.alert_outbox_counts(db)
@@ -1,22 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from datetime import date, datetime
 from typing import List
-from datetime import datetime, date
 
-from ..database import get_db
-from .. import crud
-from ..schemas import JobRead, JobFilter, JobCreate
-from ..services.scraper import scrape_linkedin_jobs
-from ..services.linkedin_scraper_advanced import run_advanced_scrape, ScrapeConfig
-import os
-import pandas as pd
-from ..services.alerts import send_email_alert, send_telegram_alert
+from ..config import settings
+from ..database import SessionLocal, get_db
+from .. import crud, models, response_cache
+from ..schemas import JobDetailRead, JobRead, JobFilter, JobPage, ScrapeRunRead
+from ..services import exporters
+from ..services.fetchers import resolve_backend
+from ..suggest_index import suggestions
+from ..services.scrape_queue import ACTIVE_STATUSES, KIND_ADVANCED, KIND_BASIC, get_scrape_queue
 
 router = APIRouter(tags=["jobs"])
 
 
-@router.get("/jobs", response_model=List[JobRead])
+@router.get("/jobs", response_model=JobPage)
 def get_jobs(
+	request: Request,
 	keyword: str | None = None,
 	company: str | None = None,
 	location: str | None = None,
@@ -25,6 +27,7 @@ def get_jobs(
 	limit: int = 50,
 	offset: int = 0,
 	order_by: str | None = "-created_at",
+	cursor: str | None = None,
 	db: Session = Depends(get_db),
 ):
 	filters = JobFilter(
@@ -34,119 +37,206 @@ def get_jobs(
 		limit=min(max(limit, 1), 200),
 		offset=max(offset, 0),
 		order_by=order_by,
+		cursor=cursor,
 	)
-	return crud.list_jobs(db, filters)
 
+	def compute():
+		try:
+			items, next_cursor = crud.list_jobs_page(db, filters)
+		except crud.InvalidCursor as e:
+			raise HTTPException(status_code=400, detail=str(e))
+		return {"items": items, "next_cursor": next_cursor}
+
+	return response_cache.respond(request, db, JobPage, compute)
+
+
+@router.get("/jobs/export")
+def export_jobs(
+	format: str = "csv",
+	keyword: str | None = None,
+	company: str | None = None,
+	location: str | None = None,
+	date_from: date | None = None,
+	date_to: date | None = None,
+	order_by: str | None = "-created_at",
+	limit: int | None = None,
+	offset: int = 0,
+):
+	"""Stream every job matching the filters as CSV, NDJSON or Parquet."""
+	fmt = format.lower()
+	if fmt not in exporters.FORMATS:
+		raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(exporters.FORMATS)}")
+	try:
+		exporters.check_available(fmt)
+	except exporters.ExportUnavailable as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	filters = JobFilter(
+		keyword=keyword,
+		company=company,
+		location=location,
+		date_from=date_from,
+		date_to=date_to,
+		offset=max(offset, 0),
+		order_by=order_by,
+	)
+	write, media_type, ext = exporters.FORMATS[fmt]
+
+	def body():
+		# The request-scoped session may be closed before streaming ends; use our own
+		db = SessionLocal()
+		try:
+			yield from write(crud.stream_jobs(db, filters, limit=max(limit, 0) if limit is not None else None))
+		finally:
+			db.close()
+
+	return StreamingResponse(
+		body(),
+		media_type=media_type,
+		headers={"Content-Disposition": f'attachment; filename="jobs-{datetime.utcnow():%Y%m%d-%H%M%S}.{ext}"'},
+	)
 
-@router.post("/scrape")
-def trigger_scrape(keywords: str, location: str, max_pages: int = 10, db: Session = Depends(get_db)):
-    results = scrape_linkedin_jobs(keywords=keywords, location=location, max_pages=max_pages)
-	new_jobs = []
-	for r in results:
-		posted_date = None
-		if r.get("posted_date"):
-			try:
-				posted_date = date.fromisoformat(r["posted_date"])  # yyyy-mm-dd
-			except Exception:
-				posted_date = None
-		job = JobCreate(
-			title=r.get("title") or "",
-			company=r.get("company"),
-			location=r.get("location"),
-			posted_date=posted_date,
-			job_link=r.get("job_link") or "",
-			experience_level=r.get("experience_level"),
-			job_type=r.get("job_type"),
-			keywords=r.get("keywords"),
-		)
-		created = crud.create_job_if_not_exists(db, job)
-		if created:
-			new_jobs.append(created)
-
-	# Alerts for new jobs
-	for job in new_jobs:
-		subject = f"New Job: {job.title} at {job.company or ''}".strip()
-		body = f"<b>{job.title}</b> at {job.company or ''}<br/>{job.location or ''}<br/><a href='{job.job_link}'>Open</a>"
-		send_email_alert(db, job.id, subject, body)
-		text = f"New Job: {job.title} at {job.company or ''}\n{job.location or ''}\n{job.job_link}"
-		send_telegram_alert(db, job.id, text)
-
-	return {"found": len(results), "created": len(new_jobs)}
-@router.post("/scrape/advanced")
+
+@router.get("/jobs/{job_id}/details", response_model=JobDetailRead)
+def get_job_details(job_id: int, db: Session = Depends(get_db)):
+	details = crud.get_job_details(db, job_id)
+	if details is None:
+		raise HTTPException(status_code=404, detail="No details stored for this job")
+	return details
+
+
+def _check_backend(backend: str | None) -> None:
+	try:
+		resolve_backend(backend)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+
+
+def _submit(db: Session, kind: str, keywords: str, location: str, params: dict) -> models.ScrapeRun:
+	if not settings.has_role("scraper"):
+		raise HTTPException(status_code=503, detail="This API process does not run scrapes (APP_ROLE)")
+	run_id, _ = get_scrape_queue().submit(kind, keywords, location, params)
+	return crud.get_scrape_run(db, run_id)
+
+
+@router.post("/scrape", response_model=ScrapeRunRead, status_code=202)
+def trigger_scrape(
+	keywords: str,
+	location: str,
+	max_pages: int = 10,
+	backend: str | None = None,
+	db: Session = Depends(get_db),
+):
+	_check_backend(backend)
+	return _submit(db, KIND_BASIC, keywords, location, {"max_pages": max_pages, "backend": backend})
+
+
+@router.post("/scrape/advanced", response_model=ScrapeRunRead, status_code=202)
 def scrape_advanced(
-    keywords: str,
-    location: str,
-    enrich: bool = True,
-    max_pages: int = 10,
-    headless: bool = True,
-    delay_min: float = 2.0,
-    delay_max: float = 5.0,
-    persist: bool = True,
-    db: Session = Depends(get_db),
+	keywords: str,
+	location: str,
+	enrich: bool = True,
+	max_pages: int = 10,
+	headless: bool = True,
+	delay_min: float = 0.0,
+	delay_max: float = 0.0,
+	persist: bool = True,
+	export: bool = True,
+	enrich_workers: int = 1,
+	enrich_rate: float | None = None,
+	backend: str | None = None,
+	db: Session = Depends(get_db),
 ):
-    cfg = ScrapeConfig(delay_min=delay_min, delay_max=delay_max, headless=headless, max_pages=max_pages)
-    result = run_advanced_scrape(keywords=keywords, location=location, out_dir="exports", config=cfg, enrich=enrich)
-    # Attach URLs for download via mounted static route
-    files = result.get("files", {})
-    for k, p in list(files.items()):
-        if p:
-            files[k] = f"/exports/{p.split('exports/')[-1]}"
-    result["files"] = files
-    # Optionally persist basic fields to DB so UI can query immediately
-    if persist and files.get("csv"):
-        csv_fs_path = os.path.join("exports", os.path.basename(files["csv"]))
-        try:
-            df = pd.read_csv(csv_fs_path)
-            for _, row in df.iterrows():
-                try:
-                    from ..schemas import JobCreate
-                    job = JobCreate(
-                        title=str(row.get("title") or ""),
-                        company=(row.get("company") if pd.notna(row.get("company")) else None),
-                        location=(row.get("location") if pd.notna(row.get("location")) else None),
-                        posted_date=None,
-                        job_link=str(row.get("job_link") or ""),
-                        experience_level=(row.get("employment_type") if pd.notna(row.get("employment_type")) else None),
-                        job_type=None,
-                        keywords=keywords,
-                    )
-                    crud.create_job_if_not_exists(db, job)
-                except Exception:
-                    continue
-        except Exception:
-            pass
-    return result
+	_check_backend(backend)
+	params = {
+		"enrich": enrich,
+		"persist": persist,
+		"export": export,
+		"delay_min": delay_min,
+		"delay_max": delay_max,
+		"headless": headless,
+		"max_pages": max_pages,
+		"enrich_workers": max(enrich_workers, 1),
+		"enrich_rate": enrich_rate,
+		"backend": backend,
+	}
+	return _submit(db, KIND_ADVANCED, keywords, location, params)
+
+
+@router.get("/scrape/runs", response_model=List[ScrapeRunRead])
+def get_scrape_runs(limit: int = 50, status: str | None = None, db: Session = Depends(get_db)):
+	return crud.list_scrape_runs(db, limit=min(max(limit, 1), 200), status=status)
+
+
+@router.get("/scrape/runs/{run_id}", response_model=ScrapeRunRead)
+def get_scrape_run(run_id: int, db: Session = Depends(get_db)):
+	run = crud.get_scrape_run(db, run_id)
+	if run is None:
+		raise HTTPException(status_code=404, detail="Scrape run not found")
+	return run
+
+
+@router.delete("/scrape/runs/{run_id}", response_model=ScrapeRunRead)
+def cancel_scrape_run(run_id: int, db: Session = Depends(get_db)):
+	run = crud.get_scrape_run(db, run_id)
+	if run is None:
+		raise HTTPException(status_code=404, detail="Scrape run not found")
+	if run.status not in ACTIVE_STATUSES or not get_scrape_queue().cancel(run_id):
+		raise HTTPException(status_code=409, detail=f"Scrape run is {run.status}")
+	return run
 
 
 @router.get("/search", response_model=List[JobRead])
 def search_and_scrape(
-    keyword: str,
-    location: str | None = None,
-    max_pages: int = 5,
-    db: Session = Depends(get_db),
+	response: Response,
+	keyword: str,
+	location: str | None = None,
+	max_pages: int = 5,
+	refresh: bool = True,
+	db: Session = Depends(get_db),
 ):
-    # Kick off an advanced scrape synchronously for fresh results
-    cfg = ScrapeConfig(max_pages=max_pages)
-    try:
-        run_advanced_scrape(keywords=keyword, location=location or "Remote", out_dir="exports", config=cfg, enrich=True)
-    except Exception:
-        # Scrape best-effort; still return whatever is in DB
-        pass
-    # Return latest jobs filtered by keyword/location
-    filters = JobFilter(keyword=keyword, location=location or None, limit=100, offset=0, order_by="-created_at")
-    return crud.list_jobs(db, filters)
+	# Refresh in the background; identical in-flight searches share one run
+	if refresh and settings.has_role("scraper"):
+		try:
+			run_id, _ = get_scrape_queue().submit(
+				KIND_ADVANCED, keyword, location or "Remote", {"max_pages": max_pages, "enrich": True}
+			)
+			response.headers["X-Scrape-Run-Id"] = str(run_id)
+		except Exception:
+			# Scrape best-effort; still return whatever is in DB
+			pass
+	# Return latest jobs filtered by keyword/location
+	filters = JobFilter(keyword=keyword, location=location or None, limit=100, offset=0, order_by="-created_at")
+	return crud.list_jobs(db, filters)
 
 
 @router.get("/suggest/keywords", response_model=list[str])
-def suggest_keywords(q: str = "", limit: int = 10, db: Session = Depends(get_db)):
-    return crud.suggest_keywords(db, q=q, limit=limit)
+def suggest_keywords(request: Request, q: str = "", limit: int = 10, db: Session = Depends(get_db)):
+	return response_cache.respond(
+		request,
+		db,
+		list[str],
+		lambda: suggestions.suggest_keywords(q, limit=min(max(limit, 1), 50)),
+		generation=suggestions.generation,
+	)
 
 
 @router.get("/suggest/companies", response_model=list[str])
-def suggest_companies(q: str = "", limit: int = 10, db: Session = Depends(get_db)):
-    return crud.suggest_companies(db, q=q, limit=limit)
+def suggest_companies(request: Request, q: str = "", limit: int = 10, db: Session = Depends(get_db)):
+	return response_cache.respond(
+		request,
+		db,
+		list[str],
+		lambda: suggestions.suggest_companies(q, limit=min(max(limit, 1), 50)),
+		generation=suggestions.generation,
+	)
 
 
 @router.get("/suggest/locations", response_model=list[str])
-def suggest_locations(q: str = "", limit: int = 10, db: Session = Depends(get_db)):
-    return crud.suggest_locations(db, q=q, limit=limit)
\ No newline at end of file
+def suggest_locations(request: Request, q: str = "", limit: int = 10, db: Session = Depends(get_db)):
+	return response_cache.respond(
+		request,
+		db,
+		list[str],
+		lambda: suggestions.suggest_locations(q, limit=min(max(limit, 1), 50)),
+		generation=suggestions.generation,
+	)
\ No newline at end of file
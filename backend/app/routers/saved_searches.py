@@ -0,0 +1,87 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import get_db
+from .. import crud
+from ..schemas import SavedSearchCreate, SavedSearchRead, SavedSearchUpdate, ScrapeRunRead
+
+router = APIRouter(prefix="/saved-searches", tags=["saved-searches"])
+
+
+def _resync() -> None:
+	# A scheduler in this process picks the change up now; others on their next sync
+	if settings.has_role("scheduler"):
+		from ..scheduler import sync_saved_searches
+
+		sync_saved_searches()
+
+
+def _get_or_404(db: Session, search_id: int):
+	search = crud.get_saved_search(db, search_id)
+	if search is None:
+		raise HTTPException(status_code=404, detail="Saved search not found")
+	return search
+
+
+@router.get("", response_model=List[SavedSearchRead])
+def list_saved_searches(enabled: bool | None = None, db: Session = Depends(get_db)):
+	return crud.list_saved_searches(db, enabled=enabled)
+
+
+@router.post("", response_model=SavedSearchRead, status_code=201)
+def create_saved_search(payload: SavedSearchCreate, db: Session = Depends(get_db)):
+	search = crud.create_saved_search(db, **payload.model_dump())
+	_resync()
+	return search
+
+
+@router.get("/{search_id}", response_model=SavedSearchRead)
+def get_saved_search(search_id: int, db: Session = Depends(get_db)):
+	return _get_or_404(db, search_id)
+
+
+@router.patch("/{search_id}", response_model=SavedSearchRead)
+def update_saved_search(search_id: int, payload: SavedSearchUpdate, db: Session = Depends(get_db)):
+	search = _get_or_404(db, search_id)
+	fields = payload.model_dump(exclude_unset=True)
+	# Setting one kind of schedule replaces the other
+	if fields.get("cron"):
+		fields.setdefault("interval_minutes", None)
+	if fields.get("interval_minutes"):
+		fields.setdefault("cron", None)
+	cron = fields.get("cron", search.cron)
+	interval = fields.get("interval_minutes", search.interval_minutes)
+	if (cron is None) == (interval is None):
+		raise HTTPException(status_code=422, detail="set exactly one of cron and interval_minutes")
+	if any(fields.get(k) is None for k in ("keywords", "location", "priority", "max_pages", "enabled") if k in fields):
+		raise HTTPException(status_code=422, detail="keywords, location, priority, max_pages and enabled cannot be null")
+	search = crud.update_saved_search(db, search_id, **fields)
+	_resync()
+	return search
+
+
+@router.delete("/{search_id}", status_code=204)
+def delete_saved_search(search_id: int, db: Session = Depends(get_db)):
+	if not crud.delete_saved_search(db, search_id):
+		raise HTTPException(status_code=404, detail="Saved search not found")
+	_resync()
+	return Response(status_code=204)
+
+
+@router.post("/{search_id}/run", response_model=ScrapeRunRead, status_code=202)
+def run_saved_search_now(search_id: int, db: Session = Depends(get_db)):
+	"""Queue a run outside the schedule (same queue, coalescing and overlap rules)."""
+	if not settings.has_role("scraper"):
+		raise HTTPException(status_code=503, detail="This API process does not run scrapes (APP_ROLE)")
+	search = _get_or_404(db, search_id)
+	if not search.enabled:
+		raise HTTPException(status_code=409, detail="Saved search is disabled")
+	from ..scheduler import run_saved_search
+
+	run_id = run_saved_search(search_id)
+	if run_id is None:
+		raise HTTPException(status_code=409, detail=f"Saved search is already running (run {search.last_run_id})")
+	return crud.get_scrape_run(db, run_id)
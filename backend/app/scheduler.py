@@ -1,56 +1,206 @@
 from __future__ import annotations
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy.orm import Session
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 from .config import settings
 from .database import SessionLocal
-from .services.scraper import scrape_linkedin_jobs
 from . import crud
-from .schemas import JobCreate
-from datetime import date
 
+if TYPE_CHECKING:
+	from apscheduler.schedulers.background import BackgroundScheduler
+
+	from . import models
+	from .services.leader import LeaderElector
+
+
+logger = logging.getLogger(__name__)
 
 scheduler: BackgroundScheduler | None = None
+elector: LeaderElector | None = None
+
+JOB_PREFIX = "saved_search:"
+SYNC_JOB_ID = "saved_searches_sync"
+LEASE_NAME = "scheduler"
+
+# saved search id -> schedule its job was added with
+_synced: Dict[int, Tuple[Optional[str], Optional[int]]] = {}
+_sync_lock = threading.Lock()
 
 
-def run_daily_scrape(keywords: str, location: str):
-	db: Session = SessionLocal()
+def run_saved_search(search_id: int) -> Optional[int]:
+	"""Hand one saved search to the scrape queue; returns the run id, or None when skipped.
+
+	Searches for the same (keywords, location) share one run. A search whose previous
+	run is still queued or running is skipped rather than stacked up behind it. The
+	queue runs scrapes in this process, so only processes with the scraper role submit.
+	"""
+	if not settings.has_role("scraper"):
+		logger.warning("Saved search %s skipped: this process does not run scrapes (APP_ROLE)", search_id)
+		return None
+	from .services.scrape_queue import KIND_BASIC, get_scrape_queue
+
+	db = SessionLocal()
 	try:
-		results = scrape_linkedin_jobs(keywords=keywords, location=location, max_pages=3)
-		for r in results:
-			posted_date = None
-			if r.get("posted_date"):
-				try:
-					posted_date = date.fromisoformat(r["posted_date"])  # yyyy-mm-dd
-				except Exception:
-					posted_date = None
-			job = JobCreate(
-				title=r.get("title") or "",
-				company=r.get("company"),
-				location=r.get("location"),
-				posted_date=posted_date,
-				job_link=r.get("job_link") or "",
-				experience_level=r.get("experience_level"),
-				job_type=r.get("job_type"),
-				keywords=r.get("keywords"),
+		search = crud.get_saved_search(db, search_id)
+		if search is None or not search.enabled:
+			return None
+		queue = get_scrape_queue()
+		if search.last_run_id is not None and queue.is_active(search.last_run_id):
+			logger.info("Saved search %s skipped: run %s still active", search_id, search.last_run_id)
+			return None
+		params = {
+			"max_pages": search.max_pages,
+			"incremental": settings.incremental_scrape,
+			"saved_search_ids": [search.id],
+		}
+		run_id, _ = queue.submit(KIND_BASIC, search.keywords, search.location, params, priority=search.priority)
+		crud.mark_saved_search_submitted(db, search.id, run_id)
+		return run_id
+	finally:
+		db.close()
+
+
+def _run_scheduled(search_id: int) -> Optional[int]:
+	# A leader that lost its lease may fire once more before its scheduler is stopped
+	if elector is not None and not elector.is_leader():
+		return None
+	return run_saved_search(search_id)
+
+
+def _trigger(search: models.SavedSearch):
+	from apscheduler.triggers.cron import CronTrigger
+	from apscheduler.triggers.interval import IntervalTrigger
+
+	if search.cron:
+		return CronTrigger.from_crontab(search.cron)
+	return IntervalTrigger(minutes=search.interval_minutes)
+
+
+def sync_saved_searches() -> int:
+	"""Add, reschedule or remove scheduler jobs to match saved_searches; returns the jobs scheduled."""
+	if scheduler is None:
+		return 0
+	from apscheduler.jobstores.base import JobLookupError
+
+	db = SessionLocal()
+	try:
+		searches = crud.list_saved_searches(db, enabled=True)
+	finally:
+		db.close()
+	with _sync_lock:
+		wanted = {}
+		for search in searches:
+			schedule = (search.cron, search.interval_minutes)
+			wanted[search.id] = schedule
+			if _synced.get(search.id) == schedule:
+				continue
+			try:
+				trigger = _trigger(search)
+			except (TypeError, ValueError) as e:
+				logger.warning("Saved search %s has an invalid schedule: %s", search.id, e)
+				continue
+			scheduler.add_job(
+				_run_scheduled,
+				trigger,
+				args=[search.id],
+				id=f"{JOB_PREFIX}{search.id}",
+				replace_existing=True,
+				max_instances=1,
+				coalesce=True,
+			)
+			_synced[search.id] = schedule
+		for search_id in set(_synced) - set(wanted):
+			try:
+				scheduler.remove_job(f"{JOB_PREFIX}{search_id}")
+			except JobLookupError:
+				pass
+			del _synced[search_id]
+		return len(_synced)
+
+
+def _seed_default_search() -> None:
+	db = SessionLocal()
+	try:
+		if not crud.list_saved_searches(db):
+			crud.create_saved_search(
+				db,
+				name="Default",
+				keywords=settings.schedule_keywords,
+				location=settings.schedule_location,
+				cron=settings.schedule_cron,
+				max_pages=3,
 			)
-			crud.create_job_if_not_exists(db, job)
 	finally:
 		db.close()
 
 
-def start_scheduler():
+def _start_local_scheduler():
 	global scheduler
 	if scheduler is not None:
 		return scheduler
+	from apscheduler.schedulers.background import BackgroundScheduler
+	from apscheduler.triggers.interval import IntervalTrigger
+
+	_seed_default_search()
 	scheduler = BackgroundScheduler()
-	# Defaults: user can later configure via admin
-	cron = settings.schedule_cron
-	# Example default keywords/location; can be overridden later via persisted config
-	keywords = "Software Engineer"
-	location = "Remote"
-	scheduler.add_job(run_daily_scrape, CronTrigger.from_crontab(cron), kwargs={"keywords": keywords, "location": location}, id="daily_scrape", replace_existing=True)
 	scheduler.start()
+	sync_saved_searches()
+	# Saved searches edited through another process's API show up within one interval
+	scheduler.add_job(
+		sync_saved_searches,
+		IntervalTrigger(seconds=max(settings.saved_search_sync_seconds, 1)),
+		id=SYNC_JOB_ID,
+		replace_existing=True,
+		max_instances=1,
+		coalesce=True,
+	)
 	return scheduler
+
+
+def _stop_local_scheduler():
+	global scheduler
+	if scheduler is not None:
+		scheduler.shutdown(wait=False)
+		scheduler = None
+	with _sync_lock:
+		_synced.clear()
+
+
+def start_scheduler():
+	"""Run saved searches from this process, or, with leader election on, whenever it holds the lease.
+
+	Every process with the scheduler role contends for one lease in the database, so
+	N API workers or containers still run each scheduled scrape once; when the leader
+	dies another process takes over within SCHEDULER_LEASE_SECONDS. Saved searches run
+	on this process's scrape queue, so a process without the scraper role doesn't
+	schedule them or contend for the lease.
+	"""
+	global elector
+	if not settings.has_role("scraper"):
+		logger.warning("APP_ROLE has scheduler without scraper; saved searches are not scheduled here")
+		return None
+	if not settings.scheduler_leader_election:
+		return _start_local_scheduler()
+	if elector is None:
+		from .services.leader import LeaderElector
+
+		elector = LeaderElector(
+			LEASE_NAME,
+			ttl=settings.scheduler_lease_seconds,
+			renew_interval=settings.scheduler_lease_renew_seconds,
+			on_elected=_start_local_scheduler,
+			on_demoted=_stop_local_scheduler,
+		)
+		elector.start()
+	return elector
+
+
+def stop_scheduler():
+	global elector
+	if elector is not None:
+		# Releasing the lease lets a surviving process take over without waiting out the TTL
+		elector.stop()
+		elector = None
+	_stop_local_scheduler()
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, HttpUrl, field_validator
+from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Any, Optional, List
 
 
 class JobBase(BaseModel):
@@ -23,12 +23,29 @@ class JobBase(BaseModel):
 
 
 class JobCreate(JobBase):
-	pass
+	# Enriched description text; only used to detect near-duplicates at ingest
+	description: Optional[str] = None
 
 
 class JobRead(JobBase):
 	id: int
 	created_at: datetime
+	# Id of the first posting of this job's near-duplicate cluster, if any
+	cluster_id: Optional[int] = None
+
+	class Config:
+		from_attributes = True
+
+
+class JobDetailRead(BaseModel):
+	job_id: int
+	description_html: Optional[str] = None
+	description_text: Optional[str] = None
+	criteria: List[str] = []
+	employment_type: Optional[str] = None
+	content_hash: str
+	fetched_at: datetime
+	updated_at: datetime
 
 	class Config:
 		from_attributes = True
@@ -43,6 +60,7 @@ class JobFilter(BaseModel):
 	limit: int = 50
 	offset: int = 0
 	order_by: Optional[str] = "-created_at"
+	cursor: Optional[str] = None
 
 
 class AlertLogRead(BaseModel):
@@ -55,3 +73,97 @@ class AlertLogRead(BaseModel):
 
 	class Config:
 		from_attributes = True
+
+
+class JobPage(BaseModel):
+	items: List[JobRead]
+	next_cursor: Optional[str] = None
+
+
+class AlertLogPage(BaseModel):
+	items: List[AlertLogRead]
+	next_cursor: Optional[str] = None
+
+
+class ScrapeRunRead(BaseModel):
+	id: int
+	kind: str
+	keywords: str
+	location: str
+	params: Optional[dict[str, Any]] = None
+	status: str
+	found: Optional[int] = None
+	created: Optional[int] = None
+	result: Optional[dict[str, Any]] = None
+	error: Optional[str] = None
+	created_at: datetime
+	started_at: Optional[datetime] = None
+	finished_at: Optional[datetime] = None
+
+	class Config:
+		from_attributes = True
+
+
+def _check_cron(v: Optional[str]) -> Optional[str]:
+	if v is not None and len(v.split()) != 5:
+		raise ValueError("cron must have five fields (minute hour day month weekday)")
+	return v
+
+
+class SavedSearchBase(BaseModel):
+	name: Optional[str] = None
+	keywords: str
+	location: str
+	cron: Optional[str] = None
+	interval_minutes: Optional[int] = Field(default=None, ge=1)
+	priority: int = 0
+	max_pages: int = Field(default=3, ge=1, le=40)
+	enabled: bool = True
+
+	@field_validator("cron")
+	@classmethod
+	def validate_cron(cls, v: Optional[str]) -> Optional[str]:
+		return _check_cron(v)
+
+	@model_validator(mode="after")
+	def one_schedule(self):
+		if (self.cron is None) == (self.interval_minutes is None):
+			raise ValueError("set exactly one of cron and interval_minutes")
+		return self
+
+
+class SavedSearchCreate(SavedSearchBase):
+	pass
+
+
+class SavedSearchUpdate(BaseModel):
+	name: Optional[str] = None
+	keywords: Optional[str] = None
+	location: Optional[str] = None
+	cron: Optional[str] = None
+	interval_minutes: Optional[int] = Field(default=None, ge=1)
+	priority: Optional[int] = None
+	max_pages: Optional[int] = Field(default=None, ge=1, le=40)
+	enabled: Optional[bool] = None
+
+	@field_validator("cron")
+	@classmethod
+	def validate_cron(cls, v: Optional[str]) -> Optional[str]:
+		return _check_cron(v)
+
+
+class SavedSearchRead(SavedSearchBase):
+	id: int
+	created_at: datetime
+	updated_at: datetime
+	last_run_id: Optional[int] = None
+	last_run_at: Optional[datetime] = None
+	last_status: Optional[str] = None
+	last_found: Optional[int] = None
+	last_created: Optional[int] = None
+	last_duration_seconds: Optional[float] = None
+	last_error: Optional[str] = None
+	run_count: int = 0
+
+	class Config:
+		from_attributes = True
@@ -2,54 +2,137 @@ from __future__ import annotations
 
 import smtplib
 from email.mime.text import MIMEText
-from typing import Optional
-import requests
-
-from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from ..config import settings
-from .. import crud
+from .telegram import get_telegram_sender, group_messages, job_text
 
 
-def send_email_alert(db: Session, job_id: int, subject: str, body: str) -> bool:
-	if not settings.email_enabled:
-		return False
-	if not (settings.sender_email and settings.sender_password and settings.receiver_email):
-		return False
+class EmailDispatcher:
+	"""One authenticated SMTP session reused for a batch of alert emails.
 
-	msg = MIMEText(body, "html")
-	msg["Subject"] = subject
-	msg["From"] = settings.sender_email
-	msg["To"] = settings.receiver_email
+	A send that fails on a dropped connection reconnects and is retried once.
+	"""
 
-	try:
-		smtp = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
-		if settings.smtp_use_tls:
-			smtp.starttls()
-		smtp.login(settings.sender_email, settings.sender_password)
-		smtp.sendmail(settings.sender_email, [settings.receiver_email], msg.as_string())
-		smtp.quit()
-		crud.create_alert_log(db, job_id=job_id, channel="email", status="sent", message=subject)
-		return True
-	except Exception as e:
-		crud.create_alert_log(db, job_id=job_id, channel="email", status="failed", message=str(e))
-		return False
+	def __init__(self):
+		self._smtp: Optional[smtplib.SMTP] = None
+
+	def __enter__(self) -> "EmailDispatcher":
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+	def _connect(self) -> smtplib.SMTP:
+		smtp = smtplib.SMTP(settings.smtp_server, settings.smtp_port, timeout=30)
+		try:
+			if settings.smtp_use_tls:
+				smtp.starttls()
+			smtp.login(settings.sender_email, settings.sender_password)
+		except Exception:
+			smtp.close()
+			raise
+		return smtp
+
+	def send(self, subject: str, body: str) -> None:
+		msg = MIMEText(body, "html")
+		msg["Subject"] = subject
+		msg["From"] = settings.sender_email
+		msg["To"] = settings.receiver_email
+		for attempt in range(2):
+			if self._smtp is None:
+				self._smtp = self._connect()
+			try:
+				self._smtp.sendmail(settings.sender_email, [settings.receiver_email], msg.as_string())
+				return
+			except (smtplib.SMTPServerDisconnected, OSError):
+				self._drop()
+				if attempt:
+					raise
+
+	def _drop(self) -> None:
+		if self._smtp is not None:
+			try:
+				self._smtp.close()
+			except Exception:
+				pass
+			self._smtp = None
+
+	def close(self) -> None:
+		if self._smtp is not None:
+			try:
+				self._smtp.quit()
+			except Exception:
+				pass
+			self._smtp = None
+
+
+def _email_subject(job) -> str:
+	return f"New Job: {job.title} at {job.company or ''}".strip()
 
 
-def send_telegram_alert(db: Session, job_id: int, text: str) -> bool:
-	if not settings.telegram_enabled:
-		return False
-	if not (settings.telegram_bot_token and settings.telegram_chat_id):
-		return False
+def _email_body(job) -> str:
+	return f"<b>{job.title}</b> at {job.company or ''}<br/>{job.location or ''}<br/><a href='{job.job_link}'>Open</a>"
+
+
+def _digest_email(jobs: Sequence) -> tuple[str, str]:
+	subject = f"{len(jobs)} new jobs: {jobs[0].title}" + (" and more" if len(jobs) > 1 else "")
+	body = "<br/><br/>".join(_email_body(job) for job in jobs)
+	return subject, body
+
+
+def deliver_email(jobs: Sequence, digest: Optional[bool] = None) -> List[Tuple[bool, str]]:
+	"""Email alerts for many jobs over one SMTP session; returns (ok, detail) per job.
+
+	In digest mode up to ``email_digest_size`` jobs share one message and its outcome.
+	"""
+	if not jobs:
+		return []
+	digest = settings.email_digest if digest is None else digest
+	size = max(settings.email_digest_size, 1) if digest else 1
+	results: List[Tuple[bool, str]] = []
+	with EmailDispatcher() as dispatcher:
+		for i in range(0, len(jobs), size):
+			batch = jobs[i:i + size]
+			if digest:
+				subject, body = _digest_email(batch)
+			else:
+				subject, body = _email_subject(batch[0]), _email_body(batch[0])
+			try:
+				dispatcher.send(subject, body)
+				outcome = (True, subject)
+			except Exception as e:
+				outcome = (False, str(e) or e.__class__.__name__)
+			results.extend([outcome] * len(batch))
+	return results
+
+
+def deliver_telegram(jobs: Sequence) -> List[Tuple[bool, str]]:
+	"""Telegram alerts for many jobs, grouped ``telegram_group_size`` per message.
+
+	Delivery is rate limited and retried by the shared TelegramSender. Returns
+	(ok, detail) per job.
+	"""
+	if not jobs:
+		return []
+	texts = [job_text(job) for job in jobs]
+	groups = group_messages(texts, max_items=max(settings.telegram_group_size, 1))
 	try:
-		resp = requests.post(
-			f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendMessage",
-			json={"chat_id": settings.telegram_chat_id, "text": text, "parse_mode": "HTML"},
-			timeout=10,
+		# Finish inside the outbox lease, or another worker could claim and resend these jobs
+		sent = get_telegram_sender().send_many(
+			settings.telegram_chat_id, [message for message, _ in groups], timeout=settings.outbox_lease_seconds * 0.8
 		)
-		ok = resp.ok
-		crud.create_alert_log(db, job_id=job_id, channel="telegram", status="sent" if ok else "failed", message=text[:180])
-		return ok
 	except Exception as e:
-		crud.create_alert_log(db, job_id=job_id, channel="telegram", status="failed", message=str(e))
-		return False
+		sent = [(False, str(e) or e.__class__.__name__)] * len(groups)
+	results: List[Tuple[bool, str]] = [(False, "")] * len(jobs)
+	for (_, indexes), (ok, detail) in zip(groups, sent):
+		for i in indexes:
+			results[i] = (ok, (texts[i] if ok else detail)[:180])
+	return results
+
+
+# Delivery functions used by the alert outbox worker, by channel name
+CHANNELS: Dict[str, Callable[[Sequence], List[Tuple[bool, str]]]] = {
+	"email": deliver_email,
+	"telegram": deliver_telegram,
+}
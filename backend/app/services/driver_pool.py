@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .. import metrics
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def resolve_driver_path() -> str:
+	"""Locate chromedriver once per process; webdriver_manager does version checks on every install()."""
+	if settings.chrome_driver_path:
+		return settings.chrome_driver_path
+	from webdriver_manager.chrome import ChromeDriverManager
+
+	return ChromeDriverManager().install()
+
+
+_SCROLL_HEIGHT = "return document.body.scrollHeight"
+
+
+def scroll_until_loaded(driver, steps: int, timeout: float) -> int:
+	"""Scroll to the bottom until the page stops growing; returns the scrolls made.
+
+	After each scroll waits up to ``timeout`` seconds for lazy-loaded content to
+	extend the page, instead of sleeping a fixed time. ``timeout <= 0`` scrolls once.
+	"""
+	height = driver.execute_script(_SCROLL_HEIGHT)
+	for step in range(1, steps + 1):
+		driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+		if timeout <= 0:
+			return step
+		try:
+			WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: d.execute_script(_SCROLL_HEIGHT) != height)
+		except TimeoutException:
+			return step
+		height = driver.execute_script(_SCROLL_HEIGHT)
+	return steps
+
+
+@dataclass(frozen=True)
+class DriverProfile:
+	headless: bool = True
+	proxy_url: Optional[str] = None
+	# Anti-detection flags used by the advanced scraper
+	stealth: bool = False
+
+
+def _build_options(profile: DriverProfile) -> ChromeOptions:
+	options = ChromeOptions()
+	if profile.headless:
+		options.add_argument("--headless=new")
+	options.add_argument("--disable-gpu")
+	options.add_argument("--no-sandbox")
+	options.add_argument("--disable-dev-shm-usage")
+	options.add_argument("--window-size=1920,1080")
+	if profile.stealth:
+		options.add_argument("--disable-blink-features=AutomationControlled")
+		options.add_experimental_option("excludeSwitches", ["enable-automation"])
+		options.add_experimental_option("useAutomationExtension", False)
+	if profile.proxy_url:
+		options.add_argument(f"--proxy-server={profile.proxy_url}")
+	return options
+
+
+class PooledDriver:
+	"""Proxy around a Chrome session that counts page loads for recycling."""
+
+	def __init__(self, driver: webdriver.Chrome):
+		self._driver = driver
+		self.page_loads = 0
+		self.created_at = time.monotonic()
+
+	def get(self, url: str) -> None:
+		self.page_loads += 1
+		self._driver.get(url)
+
+	def navigated(self) -> None:
+		"""Count a navigation made without get(), e.g. clicking a pagination link."""
+		self.page_loads += 1
+
+	@property
+	def raw(self) -> webdriver.Chrome:
+		return self._driver
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._driver, name)
+
+
+class SessionBudget:
+	"""Cap on live Chrome sessions shared by several pools (one per DriverProfile).
+
+	Pools share its condition. A pool that needs a session while the cap is reached
+	closes an idle session of another pool rather than waiting for one to be returned.
+	"""
+
+	def __init__(self, limit: int):
+		self.limit = max(limit, 1)
+		self.used = 0
+		self.cond = threading.Condition()
+		self.pools: List[DriverPool] = []
+
+	def take_idle(self, exclude: DriverPool) -> Optional[PooledDriver]:
+		"""Detach the oldest idle session of another pool; call with ``cond`` held."""
+		for pool in self.pools:
+			if pool is not exclude and pool._idle:
+				pool._total -= 1
+				self.used -= 1
+				return pool._idle.pop(0)
+		return None
+
+
+class DriverPool:
+	"""Bounded, thread-safe pool of Chrome sessions.
+
+	Sessions are health-checked and reset (cookies, storage, blank page) on return,
+	and replaced after ``max_page_loads`` navigations or when they stop responding.
+	Pools built with the same ``budget`` never run more than ``budget.limit`` sessions
+	together; without one the pool gets its own budget of ``size``.
+	"""
+
+	def __init__(
+		self,
+		profile: DriverProfile,
+		size: int,
+		max_page_loads: int,
+		lease_timeout: float,
+		budget: Optional[SessionBudget] = None,
+	):
+		self.profile = profile
+		self.size = max(size, 1)
+		self.max_page_loads = max_page_loads
+		self.lease_timeout = lease_timeout
+		self.budget = budget or SessionBudget(self.size)
+		self._idle: List[PooledDriver] = []
+		self._total = 0
+		self._closed = False
+		self._cond = self.budget.cond
+		with self._cond:
+			self.budget.pools.append(self)
+
+	@property
+	def in_use(self) -> int:
+		with self._cond:
+			return self._total - len(self._idle)
+
+	@property
+	def capacity(self) -> int:
+		"""Sessions this pool can hold at once, given the budget it shares."""
+		return min(self.size, self.budget.limit)
+
+	@property
+	def total(self) -> int:
+		with self._cond:
+			return self._total
+
+	def _create(self) -> PooledDriver:
+		with metrics.stage("driver_startup"):
+			service = ChromeService(executable_path=resolve_driver_path())
+			driver = webdriver.Chrome(service=service, options=_build_options(self.profile))
+		if self.profile.stealth:
+			try:
+				driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+					"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+				})
+			except Exception:
+				pass
+		return PooledDriver(driver)
+
+	@staticmethod
+	def _quit(pd: PooledDriver) -> None:
+		try:
+			pd.raw.quit()
+		except Exception:
+			pass
+
+	@staticmethod
+	def _healthy(pd: PooledDriver) -> bool:
+		try:
+			return pd.raw.execute_script("return 1") == 1
+		except Exception:
+			return False
+
+	@staticmethod
+	def _reset(pd: PooledDriver) -> None:
+		driver = pd.raw
+		try:
+			driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+		except Exception:
+			pass
+		driver.delete_all_cookies()
+		driver.implicitly_wait(0)
+		driver.get("about:blank")
+
+	def _discard(self, pd: PooledDriver) -> None:
+		self._quit(pd)
+		with self._cond:
+			self._total -= 1
+			self.budget.used -= 1
+			self._cond.notify_all()
+
+	def acquire(self, timeout: Optional[float] = None, user_agent: Optional[str] = None) -> PooledDriver:
+		with metrics.DRIVER_ACQUIRE_SECONDS.time():
+			return self._acquire(timeout, user_agent)
+
+	def _acquire(self, timeout: Optional[float], user_agent: Optional[str]) -> PooledDriver:
+		deadline = time.monotonic() + (self.lease_timeout if timeout is None else timeout)
+		while True:
+			create = False
+			evicted = None
+			with self._cond:
+				while not self._idle:
+					if self._total < self.size:
+						if self.budget.used < self.budget.limit:
+							break
+						evicted = self.budget.take_idle(self)
+						if evicted is not None:
+							break
+					remaining = deadline - time.monotonic()
+					if self._closed or remaining <= 0:
+						raise TimeoutError("No browser available in driver pool")
+					self._cond.wait(remaining)
+				if self._idle:
+					pd = self._idle.pop()
+				else:
+					self._total += 1
+					self.budget.used += 1
+					create = True
+			if evicted is not None:
+				self._quit(evicted)
+			if create:
+				try:
+					pd = self._create()
+				except Exception:
+					with self._cond:
+						self._total -= 1
+						self.budget.used -= 1
+						self._cond.notify_all()
+					raise
+			elif not self._healthy(pd):
+				logger.info("Discarding unresponsive browser session")
+				self._discard(pd)
+				continue
+			if user_agent:
+				try:
+					pd.raw.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+				except Exception:
+					pass
+			return pd
+
+	def release(self, pd: PooledDriver, broken: bool = False) -> None:
+		recycle = broken or self._closed or pd.page_loads >= self.max_page_loads
+		if not recycle:
+			try:
+				self._reset(pd)
+			except Exception:
+				recycle = True
+		if recycle or not self._healthy(pd):
+			self._discard(pd)
+			return
+		with self._cond:
+			self._idle.append(pd)
+			self._cond.notify_all()
+
+	@contextmanager
+	def lease(self, timeout: Optional[float] = None, user_agent: Optional[str] = None) -> Iterator[PooledDriver]:
+		pd = self.acquire(timeout=timeout, user_agent=user_agent)
+		broken = False
+		try:
+			yield pd
+		except WebDriverException:
+			broken = True
+			raise
+		finally:
+			self.release(pd, broken=broken)
+
+	def warm(self, count: Optional[int] = None, background: bool = True) -> None:
+		"""Start up to ``count`` sessions ahead of the first lease."""
+		def _run():
+			started: List[PooledDriver] = []
+			try:
+				for _ in range(min(count or self.size, self.size)):
+					started.append(self.acquire(timeout=0))
+			except Exception as e:
+				logger.warning("Driver pool warm-up stopped: %s", e)
+			for pd in started:
+				self.release(pd)
+
+		if background:
+			threading.Thread(target=_run, name="driver-pool-warm", daemon=True).start()
+		else:
+			_run()
+
+	def close(self) -> None:
+		with self._cond:
+			self._closed = True
+			idle, self._idle = self._idle, []
+			self._total -= len(idle)
+			self.budget.used -= len(idle)
+			self._cond.notify_all()
+		for pd in idle:
+			self._quit(pd)
+
+
+_pools: Dict[DriverProfile, DriverPool] = {}
+_pools_lock = threading.Lock()
+# DRIVER_POOL_SIZE bounds the Chrome processes of all profiles together
+_budget: Optional[SessionBudget] = None
+
+
+def get_driver_pool(headless: Optional[bool] = None, proxy_url: Optional[str] = None, stealth: bool = False) -> DriverPool:
+	profile = DriverProfile(
+		headless=settings.selenium_headless if headless is None else headless,
+		proxy_url=proxy_url,
+		stealth=stealth,
+	)
+	global _budget
+	with _pools_lock:
+		pool = _pools.get(profile)
+		if pool is None:
+			if _budget is None:
+				_budget = SessionBudget(settings.driver_pool_size)
+			pool = DriverPool(
+				profile,
+				size=settings.driver_pool_size,
+				max_page_loads=settings.driver_max_page_loads,
+				lease_timeout=settings.driver_lease_timeout,
+				budget=_budget,
+			)
+			_pools[profile] = pool
+		return pool
+
+
+def all_pools() -> List[DriverPool]:
+	with _pools_lock:
+		return list(_pools.values())
+
+
+def _pool_utilization():
+	pools = all_pools()
+	in_use = sum(p.in_use for p in pools)
+	total = sum(p.total for p in pools)
+	capacity = _budget.limit if _budget is not None else 0
+	return [(("in_use",), in_use), (("idle",), total - in_use), (("capacity",), capacity)]
+
+
+metrics.gauge("driver_pool_sessions", "Browser sessions across driver pools by state", ["state"], callback=_pool_utilization)
+
+
+@atexit.register
+def shutdown_pools() -> None:
+	with _pools_lock:
+		pools = list(_pools.values())
+		_pools.clear()
+	for pool in pools:
+		pool.close()
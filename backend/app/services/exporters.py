@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+# Column order of every export format
+EXPORT_COLUMNS = [
+	"id",
+	"title",
+	"company",
+	"location",
+	"posted_date",
+	"job_link",
+	"experience_level",
+	"job_type",
+	"keywords",
+	"created_at",
+]
+
+Chunks = Iterable[List[Mapping[str, Any]]]
+
+
+class ExportUnavailable(RuntimeError):
+	"""The requested format needs an optional dependency that isn't installed."""
+
+
+def _json_default(value: Any) -> Any:
+	if isinstance(value, (date, datetime)):
+		return value.isoformat()
+	raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_csv(chunks: Chunks, columns: List[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+	buf = io.StringIO()
+	writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore")
+	writer.writeheader()
+	for chunk in chunks:
+		writer.writerows(chunk)
+		yield buf.getvalue().encode("utf-8")
+		buf.seek(0)
+		buf.truncate()
+	if buf.tell():
+		yield buf.getvalue().encode("utf-8")
+
+
+def iter_ndjson(chunks: Chunks, columns: List[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+	for chunk in chunks:
+		lines = [
+			json.dumps({c: row.get(c) for c in columns}, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+			for row in chunk
+		]
+		if lines:
+			yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+	"""Write-only file object whose contents are handed out and dropped after each batch."""
+
+	def __init__(self):
+		self._parts: List[bytes] = []
+
+	def writable(self) -> bool:
+		return True
+
+	def write(self, b) -> int:
+		self._parts.append(bytes(b))
+		return len(b)
+
+	def drain(self) -> bytes:
+		data = b"".join(self._parts)
+		self._parts.clear()
+		return data
+
+
+def _parquet_schema():
+	import pyarrow as pa  # type: ignore
+
+	return pa.schema([
+		("id", pa.int64()),
+		("title", pa.string()),
+		("company", pa.string()),
+		("location", pa.string()),
+		("posted_date", pa.date32()),
+		("job_link", pa.string()),
+		("experience_level", pa.string()),
+		("job_type", pa.string()),
+		("keywords", pa.string()),
+		("created_at", pa.timestamp("us")),
+	])
+
+
+def iter_parquet(chunks: Chunks, columns: List[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+	"""One Parquet row group per chunk, streamed as it is written."""
+	try:
+		import pyarrow as pa  # type: ignore
+		import pyarrow.parquet as pq  # type: ignore
+	except ImportError as e:
+		raise ExportUnavailable("Parquet export requires pyarrow") from e
+	schema = _parquet_schema()
+	sink = _Sink()
+	writer = pq.ParquetWriter(sink, schema, compression="snappy")
+	try:
+		for chunk in chunks:
+			if not chunk:
+				continue
+			writer.write_batch(pa.RecordBatch.from_pylist([{c: row.get(c) for c in columns} for row in chunk], schema=schema))
+			data = sink.drain()
+			if data:
+				yield data
+	finally:
+		writer.close()
+	yield sink.drain()
+
+
+def check_available(fmt: str) -> None:
+	if fmt == "parquet":
+		try:
+			import pyarrow.parquet  # type: ignore  # noqa: F401
+		except ImportError as e:
+			raise ExportUnavailable("Parquet export requires pyarrow") from e
+
+
+# format -> (writer, media type, file extension)
+FORMATS: Dict[str, Tuple[Callable[[Chunks], Iterator[bytes]], str, str]] = {
+	"csv": (iter_csv, "text/csv; charset=utf-8", "csv"),
+	"ndjson": (iter_ndjson, "application/x-ndjson", "ndjson"),
+	"parquet": (iter_parquet, "application/vnd.apache.parquet", "parquet"),
+}
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from ..config import settings
+from ..identity import extract_job_id
+from . import politeness
+
+
+logger = logging.getLogger(__name__)
+
+BACKEND_SELENIUM = "selenium"
+BACKEND_HTTP = "http"
+BACKENDS = (BACKEND_SELENIUM, BACKEND_HTTP)
+
+# Server-rendered endpoints LinkedIn serves to logged-out visitors
+GUEST_SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+GUEST_POSTING_PATH = "/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+_DEFAULT_HEADERS = {
+	"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+	"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+	"Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def resolve_backend(backend: Optional[str]) -> str:
+	backend = (backend or settings.scrape_backend or BACKEND_SELENIUM).lower()
+	if backend not in BACKENDS:
+		raise ValueError(f"Unknown scrape backend: {backend}")
+	return backend
+
+
+_clients: Dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(base_url: Optional[str] = None) -> httpx.Client:
+	"""Process-wide keep-alive client per base URL; httpx.Client is thread-safe."""
+	base_url = (base_url or settings.linkedin_base_url).rstrip("/")
+	with _clients_lock:
+		client = _clients.get(base_url)
+		if client is None:
+			client = httpx.Client(
+				base_url=base_url,
+				headers=_DEFAULT_HEADERS,
+				timeout=settings.http_timeout,
+				follow_redirects=True,
+				limits=httpx.Limits(
+					max_connections=settings.http_max_connections,
+					max_keepalive_connections=settings.http_max_connections,
+				),
+			)
+			_clients[base_url] = client
+		return client
+
+
+def close_http_clients() -> None:
+	with _clients_lock:
+		clients = list(_clients.values())
+		_clients.clear()
+	for client in clients:
+		client.close()
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+	try:
+		return max(float(resp.headers["Retry-After"]), 0.0)
+	except (KeyError, ValueError):
+		return None
+
+
+def classify_response(resp: httpx.Response) -> Tuple[str, Optional[float]]:
+	"""Politeness outcome of a response, plus any server-requested pause in seconds."""
+	if resp.status_code == 429:
+		return politeness.THROTTLED, _retry_after(resp)
+	# 999 is LinkedIn's "request denied"; auth walls arrive as redirects to a login page
+	if resp.status_code == 999 or politeness.is_auth_wall(str(resp.url)):
+		return politeness.BLOCKED, None
+	if resp.status_code >= 500:
+		return politeness.THROTTLED if resp.status_code == 503 else politeness.ERROR, _retry_after(resp)
+	return politeness.OK, None
+
+
+class Page(NamedTuple):
+	html: Optional[str]
+	etag: Optional[str]
+	last_modified: Optional[str]
+	not_modified: bool
+
+
+class HttpFetcher:
+	"""Browserless fetch backend for LinkedIn's public job search and posting pages.
+
+	Returns the same server-rendered markup the Selenium backend reads from
+	``page_source``, so the output feeds straight into ``services.parsers``.
+	"""
+
+	def __init__(
+		self,
+		base_url: Optional[str] = None,
+		client: Optional[httpx.Client] = None,
+		controller: Optional[politeness.RateController] = None,
+	):
+		self.client = client or get_http_client(base_url)
+		self.controller = controller or politeness.get_rate_controller()
+
+	def _request(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> Optional[httpx.Response]:
+		"""Paced GET; None when it failed or hit an auth wall."""
+		target = str(self.client.base_url.join(url))
+		self.controller.acquire(target)
+		try:
+			resp = self.client.get(url, params=params, headers=headers)
+		except httpx.HTTPError as e:
+			logger.warning("HTTP fetch failed for %s: %s", url, e)
+			self.controller.report(target, politeness.ERROR)
+			return None
+		outcome, retry_after = classify_response(resp)
+		self.controller.report(target, outcome, retry_after)
+		if outcome == politeness.BLOCKED:
+			logger.info("HTTP fetch of %s hit an auth wall (%s)", url, resp.status_code)
+			return None
+		return resp
+
+	def _get(self, url: str, params: Optional[dict] = None) -> Optional[str]:
+		resp = self._request(url, params)
+		if resp is None:
+			return None
+		if resp.status_code != 200:
+			logger.info("HTTP fetch of %s returned %s", url, resp.status_code)
+			return None
+		return resp.text
+
+	def report(self, outcome: str) -> None:
+		"""Feed back an outcome only the parser can tell (e.g. an empty page) for this host."""
+		self.controller.report(str(self.client.base_url), outcome)
+
+	def search_url(self, keywords: str, location: str, start: int = 0) -> str:
+		params = {"keywords": keywords, "location": location, "start": start}
+		return f"{GUEST_SEARCH_PATH}?{urlencode(params)}"
+
+	def search_page(self, keywords: str, location: str, start: int = 0) -> Optional[str]:
+		return self._get(self.search_url(keywords, location, start))
+
+	def _detail_url(self, job_url: str) -> str:
+		job_id = extract_job_id(job_url)
+		return GUEST_POSTING_PATH.format(job_id=job_id) if job_id else job_url
+
+	def fetch_detail_page(self, job_url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[Page]:
+		"""Detail page with its validators; conditional when given a cached copy's ETag/Last-Modified,
+		in which case ``Page.not_modified`` means that copy is still current."""
+		headers = {}
+		if etag:
+			headers["If-None-Match"] = etag
+		if last_modified:
+			headers["If-Modified-Since"] = last_modified
+		resp = self._request(self._detail_url(job_url), headers=headers)
+		if resp is None:
+			return None
+		if resp.status_code == 304:
+			return Page(None, etag, last_modified, True)
+		if resp.status_code != 200:
+			logger.info("HTTP fetch of %s returned %s", job_url, resp.status_code)
+			return None
+		return Page(resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), False)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..config import settings
+
+
+def _posted(card: Dict[str, Any]) -> Optional[date]:
+	value = card.get("posted_date")
+	if isinstance(value, date):
+		return value
+	try:
+		return date.fromisoformat(value) if value else None
+	except ValueError:
+		return None
+
+
+class KnownPageCheck:
+	"""Stop-condition for incremental scrapes of one (keywords, location) search.
+
+	A card counts as known when its link is already stored or it was posted before
+	the newest posting seen on the previous run. Pagination stops after the first
+	page whose known share reaches ``threshold``.
+	"""
+
+	def __init__(self, db: Session, keywords: str, location: str, threshold: Optional[float] = None):
+		self.db = db
+		self.keywords = keywords
+		self.location = location
+		self.threshold = settings.incremental_known_ratio if threshold is None else threshold
+		mark = crud.get_watermark(db, keywords, location)
+		self.high_water: Optional[date] = mark.newest_posted_date if mark else None
+		self.pages = 0
+
+	def is_known(self, card: Dict[str, Any], stored: set[str]) -> bool:
+		if card.get("job_link") in stored:
+			return True
+		posted = _posted(card)
+		return bool(self.high_water and posted and posted < self.high_water)
+
+	def __call__(self, cards: List[Dict[str, Any]]) -> bool:
+		self.pages += 1
+		if not cards:
+			return True
+		stored = crud.known_job_links(self.db, (c.get("job_link") for c in cards))
+		known = sum(1 for c in cards if self.is_known(c, stored))
+		return known / len(cards) >= self.threshold
+
+	def record_run(self, results: List[Dict[str, Any]]) -> None:
+		dates = [d for d in (_posted(r) for r in results) if d]
+		crud.update_watermark(self.db, self.keywords, self.location, max(dates) if dates else None, len(results))
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from .. import crud, metrics
+from ..database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+LEADER = metrics.gauge("leader_lease_held", "1 while this process holds the named lease", ["name"])
+
+
+class LeaderElector:
+	"""Keeps at most one process per deployment in charge of ``name`` through a lease row.
+
+	Every ``renew_interval`` seconds the elector takes or renews the lease. If the
+	holder dies, another process takes over once the lease expires, at most ``ttl``
+	seconds later. Leadership is dropped locally as soon as a renewal cannot be
+	confirmed before the lease would expire, so two processes never both believe
+	they lead (assuming host clocks agree to well within ``ttl``).
+	"""
+
+	def __init__(
+		self,
+		name: str,
+		ttl: float,
+		renew_interval: Optional[float] = None,
+		on_elected: Optional[Callable[[], None]] = None,
+		on_demoted: Optional[Callable[[], None]] = None,
+	):
+		self.name = name
+		self.ttl = ttl
+		self.renew_interval = renew_interval or ttl / 3
+		self.on_elected = on_elected
+		self.on_demoted = on_demoted
+		self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+		self._leader = False
+		self._valid_until = 0.0
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def is_leader(self) -> bool:
+		return self._leader and time.monotonic() < self._valid_until
+
+	def start(self) -> None:
+		if self._thread is not None:
+			return
+		self._thread = threading.Thread(target=self._loop, name=f"leader-{self.name}", daemon=True)
+		self._thread.start()
+
+	def stop(self, release: bool = True, timeout: Optional[float] = None) -> None:
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join(timeout)
+		was_leader = self._leader
+		self._set_leader(False)
+		if release and was_leader:
+			db = SessionLocal()
+			try:
+				crud.release_lease(db, self.name, self.holder)
+			except SQLAlchemyError:
+				logger.warning("Releasing lease %s failed", self.name, exc_info=True)
+			finally:
+				db.close()
+
+	def _loop(self) -> None:
+		while not self._stop.is_set():
+			self.tick()
+			self._stop.wait(self.renew_interval)
+
+	def tick(self) -> bool:
+		"""Take or renew the lease once; returns whether this process leads afterwards."""
+		started = time.monotonic()
+		db = SessionLocal()
+		try:
+			acquired: Optional[bool] = crud.acquire_lease(db, self.name, self.holder, self.ttl)
+		except SQLAlchemyError:
+			logger.warning("Lease %s check failed", self.name, exc_info=True)
+			acquired = None
+		finally:
+			db.close()
+		if acquired:
+			# Counted from before the round trip, so the local view lapses no later than the row
+			self._valid_until = started + self.ttl
+		# An unreachable database only keeps us leading until the lease we hold runs out
+		self._set_leader(bool(acquired) or (acquired is None and self.is_leader()))
+		return self._leader
+
+	def _set_leader(self, leader: bool) -> None:
+		if leader == self._leader:
+			return
+		self._leader = leader
+		LEADER.set(1.0 if leader else 0.0, name=self.name)
+		logger.info("%s %s lease %s", self.holder, "acquired" if leader else "lost", self.name)
+		callback = self.on_elected if leader else self.on_demoted
+		if callback is not None:
+			try:
+				callback()
+			except Exception:
+				logger.exception("Leader %s callback failed", "elected" if leader else "demoted")
@@ -1,29 +1,33 @@
 from __future__ import annotations
 
+import csv
 import json
 import os
+import queue
 import random
-import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
 try:
     from fake_useragent import UserAgent  # type: ignore
 except Exception:  # pragma: no cover
     UserAgent = None  # Fallback handled below
 
-from bs4 import BeautifulSoup  # type: ignore
-import pandas as pd  # type: ignore
+from .. import metrics
+from ..config import settings
+from ..identity import job_key
+from .driver_pool import get_driver_pool, scroll_until_loaded
+from .fetchers import BACKEND_HTTP, HttpFetcher, resolve_backend
+from .page_cache import HIT, MISS, REVALIDATED, CacheEntry, get_page_cache
+from .parsers import DETAIL_SELECTORS, SELECTORS, parse_job_cards, parse_job_details
+from .politeness import BLOCKED, EMPTY, OK, Throttle, get_rate_controller, is_auth_wall
 
 
 LINKEDIN_JOBS_SEARCH_URL = "https://www.linkedin.com/jobs/search/"
@@ -44,10 +48,6 @@ def _random_user_agent() -> str:
     return random.choice(pool)
 
 
-def _sleep(min_s: float, max_s: float) -> None:
-    time.sleep(random.uniform(min_s, max_s))
-
-
 def _urlencode(params: Dict[str, Any]) -> str:
     from urllib.parse import urlencode
 
@@ -56,167 +56,279 @@ def _urlencode(params: Dict[str, Any]) -> str:
 
 @dataclass
 class ScrapeConfig:
-    delay_min: float = 2.0
-    delay_max: float = 5.0
+    # Page loads are paced per host by the process-wide rate controller. A non-zero
+    # delay_min/delay_max additionally spaces this scrape's own page loads
+    # uniformly within [delay_min, delay_max] seconds, measured start to start.
+    delay_min: float = 0.0
+    delay_max: float = 0.0
     headless: bool = True
     use_proxy: bool = False
     proxy_url: Optional[str] = None
     max_pages: int = 10
+    # Parallel detail enrichment: workers and an optional cap on this scrape's
+    # detail-page rate (pages/second across all workers)
+    enrich_workers: int = 1
+    enrich_rate: Optional[float] = None
+    # "selenium" or "http"; None uses settings.scrape_backend
+    backend: Optional[str] = None
+    # Longest wait for lazy-loaded results after a scroll; None uses settings.scroll_timeout
+    scroll_timeout: Optional[float] = None
+    # Serve detail pages from the on-disk page cache (if PAGE_CACHE_ENABLED)
+    use_page_cache: bool = True
 
 
 class LinkedInJobScraper:
     def __init__(self, config: ScrapeConfig):
         self.config = config
-        self.driver = self._setup_driver()
+        self.backend = resolve_backend(config.backend)
+        self.controller = get_rate_controller()
+        self.scroll_timeout = settings.scroll_timeout if config.scroll_timeout is None else config.scroll_timeout
+        self._spacing = self._page_spacing()
+        self.cache = get_page_cache() if config.use_page_cache else None
+        self.fetcher: Optional[HttpFetcher] = None
+        self.driver = None
+        if self.backend == BACKEND_HTTP:
+            self.fetcher = HttpFetcher()
+            return
+        self._pool = get_driver_pool(
+            headless=config.headless,
+            proxy_url=config.proxy_url if config.use_proxy else None,
+            stealth=True,
+        )
+        self.driver = self._pool.acquire(user_agent=_random_user_agent())
         self.wait = WebDriverWait(self.driver, 15)
 
-    def _setup_driver(self) -> webdriver.Chrome:
-        options = ChromeOptions()
-        if self.config.headless:
-            options.add_argument("--headless=new")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        # Anti-detection flags
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        options.add_argument(f"user-agent={_random_user_agent()}")
-        if self.config.use_proxy and self.config.proxy_url:
-            options.add_argument(f"--proxy-server={self.config.proxy_url}")
-
-        exe_path = ChromeDriverManager().install()
-        service = ChromeService(executable_path=exe_path)
-        driver = webdriver.Chrome(service=service, options=options)
-        try:
-            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-                "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            })
-        except Exception:
-            pass
-        driver.set_window_size(1920, 1080)
-        return driver
-
     def _build_search_url(self, keywords: str, location: str, start: int = 0) -> str:
         params = {"keywords": keywords, "location": location}
         if start:
             params["start"] = start
         return f"{LINKEDIN_JOBS_SEARCH_URL}?{_urlencode(params)}"
 
-    def _human_scroll(self, steps: int = 6) -> None:
-        last = 0
-        for _ in range(steps):
-            self.driver.execute_script("window.scrollBy(0, document.body.scrollHeight/6);")
-            _sleep(self.config.delay_min / 3, self.config.delay_max / 2)
-            new_h = self.driver.execute_script("return document.body.scrollHeight")
-            if new_h == last:
-                break
-            last = new_h
+    def _page_spacing(self) -> Optional[Throttle]:
+        low = max(self.config.delay_min, 0.0)
+        high = max(self.config.delay_max, low)
+        if high <= 0:
+            return None
+        return Throttle(2.0 / (low + high), jitter=(high - low) / (high + low))
+
+    def _pace(self) -> None:
+        if self._spacing is not None:
+            self._spacing.wait()
+
+    def _navigate(self, driver, url: str) -> bool:
+        """Paced page load; False (and reported) when the site answered with an auth wall."""
+        self._pace()
+        self.controller.acquire(url)
+        with metrics.stage("page_load"):
+            driver.get(url)
+        if is_auth_wall(driver.current_url):
+            self.controller.report(url, BLOCKED)
+            return False
+        return True
 
     def _collect_cards_on_page(self) -> List[Dict[str, Any]]:
-        jobs: List[Dict[str, Any]] = []
-        cards = self.driver.find_elements(By.CSS_SELECTOR, "div.base-card")
-        for card in cards:
-            try:
-                title = card.find_element(By.CSS_SELECTOR, "h3.base-search-card__title").text.strip()
-            except NoSuchElementException:
-                title = ""
-            company = None
-            try:
-                company = card.find_element(By.CSS_SELECTOR, "h4.base-search-card__subtitle").text.strip()
-            except NoSuchElementException:
-                pass
-            location = None
-            try:
-                location = card.find_element(By.CSS_SELECTOR, "span.job-search-card__location").text.strip()
-            except NoSuchElementException:
-                pass
-            link = ""
-            try:
-                link = card.find_element(By.CSS_SELECTOR, "a.base-card__full-link").get_attribute("href")
-            except NoSuchElementException:
-                pass
-            posted = None
-            try:
-                t = card.find_element(By.CSS_SELECTOR, "time").get_attribute("datetime")
-                posted = t.split("T")[0] if t else None
-            except NoSuchElementException:
-                pass
-
-            if link:
-                jobs.append({
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "job_link": link,
-                    "posted_date": posted,
-                })
-        return jobs
-
-    def _extract_details(self, job_url: str) -> Dict[str, Any]:
+        # Parse a single page_source snapshot rather than querying each card over WebDriver
+        with metrics.stage("card_extraction"):
+            return parse_job_cards(self.driver.page_source)
+
+    def _load_search_page(self, keywords: str, location: str, start: int) -> Optional[List[Dict[str, Any]]]:
+        """Cards on one result page, or None when the page never rendered."""
+        if self.fetcher is not None:
+            self._pace()
+            with metrics.stage("page_load"):
+                html = self.fetcher.search_page(keywords, location, start=start)
+            with metrics.stage("card_extraction"):
+                cards = parse_job_cards(html)
+            if html is not None and not cards and start == 0:
+                self.fetcher.report(EMPTY)
+            return cards
+        url = self._build_search_url(keywords, location, start=start)
+        if not self._navigate(self.driver, url):
+            return None
+        try:
+            self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, SELECTORS["job_cards"])))
+        except TimeoutException:
+            # Past the first page this is just the end of the results
+            self.controller.report(url, EMPTY if start == 0 else OK)
+            return None
+        with metrics.stage("scroll_wait"):
+            scroll_until_loaded(self.driver, 8, self.scroll_timeout)
+        cards = self._collect_cards_on_page()
+        self.controller.report(url, OK if cards or start else EMPTY)
+        return cards
+
+    def _extract_details(self, job_url: str, driver=None) -> Dict[str, Any]:
+        cached = self.cache.get(job_url) if self.cache is not None else None
+        if cached is not None and cached.fresh(self.cache.ttl):
+            self.cache.record(HIT, cached)
+            return dict(cached.parsed)
+        with metrics.stage("detail_extraction"):
+            details = self._fetch_details(job_url, driver=driver, cached=cached)
+        metrics.SCRAPE_DETAILS.inc(backend=self.backend)
+        return details
+
+    def _store(self, job_url: str, html: Optional[str], data: Dict[str, Any], etag=None, last_modified=None) -> None:
+        # Only pages that parsed; a failed or walled load is retried next time
+        if self.cache is not None and data.get("description_text"):
+            self.cache.put(CacheEntry(job_url, html, data, etag, last_modified))
+
+    def _fetch_details(self, job_url: str, driver=None, cached: Optional[CacheEntry] = None) -> Dict[str, Any]:
+        if self.fetcher is not None:
+            self._pace()
+            validators = (cached.etag, cached.last_modified) if cached is not None else (None, None)
+            page = self.fetcher.fetch_detail_page(job_url, *validators)
+            if page is not None and page.not_modified:
+                self.cache.touch(cached)
+                self.cache.record(REVALIDATED, cached)
+                return dict(cached.parsed)
+            if self.cache is not None:
+                self.cache.record(MISS)
+            html = page.html if page is not None else None
+            data = parse_job_details(html)
+            if html is not None and not data.get("description_text"):
+                self.fetcher.report(EMPTY)
+            self._store(job_url, html, data, page.etag if page else None, page.last_modified if page else None)
+            return data
+        if self.cache is not None:
+            self.cache.record(MISS)
+        driver = driver or self.driver
         data: Dict[str, Any] = {}
         try:
-            self.driver.get(job_url)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            _sleep(self.config.delay_min, self.config.delay_max)
-            self._human_scroll(steps=4)
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
-
-            desc = soup.select_one("div.description__text, div.show-more-less-html__markup")
-            data["description_html"] = str(desc) if desc else None
-            data["description_text"] = desc.get_text("\n").strip() if desc else None
-
-            criteria = [li.get_text(" ", strip=True) for li in soup.select("li.description__job-criteria-item")]
-            data["criteria"] = criteria
-
-            # Best-effort extraction for structured fields
-            text = data.get("description_text") or ""
-            for key in ["Full-time", "Part-time", "Contract", "Internship", "Temporary"]:
-                if key.lower() in text.lower():
-                    data["employment_type"] = key
-                    break
+            if not self._navigate(driver, job_url):
+                return data
+            # The description is server-rendered; once it is in the DOM the page is usable
+            try:
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, DETAIL_SELECTORS["description"]))
+                )
+            except TimeoutException:
+                self.controller.report(job_url, EMPTY)
+                return data
+            self.controller.report(job_url, OK)
+            html = driver.page_source
+            data = parse_job_details(html)
+            self._store(job_url, html, data)
         except WebDriverException:
             pass
         return data
 
-    def search_and_collect(self, keywords: str, location: str) -> List[Dict[str, Any]]:
+    def search_and_collect(
+        self,
+        keywords: str,
+        location: str,
+        stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
         start = 0
+        throughput = metrics.ThroughputTimer(self.backend)
         for page in range(self.config.max_pages):
-            url = self._build_search_url(keywords, location, start=start)
-            self.driver.get(url)
-            try:
-                self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.base-card")))
-            except TimeoutException:
-                break
-
-            self._human_scroll(steps=8)
-            batch = self._collect_cards_on_page()
+            batch = self._load_search_page(keywords, location, start)
             if not batch:
                 break
+            throughput.page(len(batch))
             results.extend(batch)
+            if stop_when is not None and stop_when(batch):
+                break
 
-            start += 25  # LinkedIn paginates in ~25 increments
-            _sleep(self.config.delay_min, self.config.delay_max)
-        # Deduplicate by job_link
+            # The search page paginates in ~25 increments; the guest endpoint by cards returned
+            start += len(batch) if self.fetcher is not None else 25
+        throughput.finish()
+        # Deduplicate by posting, not by exact link text
         seen = set()
         unique: List[Dict[str, Any]] = []
         for j in results:
-            k = j.get("job_link")
-            if k and k not in seen:
+            k = job_key(j["job_link"]) if j.get("job_link") else None
+            if k is not None and k not in seen:
                 unique.append(j)
                 seen.add(k)
         return unique
 
-    def enrich_details(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def enrich_details(
+        self,
+        jobs: List[Dict[str, Any]],
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        if self.config.enrich_workers > 1:
+            # Merge streamed results by job_link, keeping the listing order
+            by_link = {j["job_link"]: j for j in jobs if j.get("job_link")}
+            for record in self.enrich_details_iter(jobs, should_stop=should_stop):
+                by_link[record["job_link"]] = record
+            return [by_link.get(j.get("job_link"), j) if j.get("job_link") else j for j in jobs]
         enriched: List[Dict[str, Any]] = []
         for j in jobs:
+            if should_stop is not None and should_stop():
+                # Keep the remaining listings unenriched
+                enriched.append(j)
+                continue
             details = self._extract_details(j["job_link"]) if j.get("job_link") else {}
             enriched.append({**j, **details})
-            _sleep(self.config.delay_min, self.config.delay_max)
         return enriched
 
+    def _enrich_throttle(self) -> Optional[Throttle]:
+        rate = self.config.enrich_rate
+        return Throttle(rate, jitter=0.3) if rate else None
+
+    def enrich_details_iter(
+        self,
+        jobs: List[Dict[str, Any]],
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Enrich jobs across ``enrich_workers`` workers and yield records as they finish.
+
+        Every page load goes through the host rate controller, so the total
+        detail-page rate does not grow with the worker count. Order is not preserved.
+        """
+        pending: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        for j in jobs:
+            if j.get("job_link"):
+                pending.put(j)
+        if pending.empty():
+            return
+        done: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        throttle = self._enrich_throttle()
+        workers = max(1, min(self.config.enrich_workers, pending.qsize()))
+        if self.fetcher is None:
+            workers = min(workers, self._pool.capacity)
+
+        def drain(driver) -> None:
+            while True:
+                if should_stop is not None and should_stop():
+                    return
+                try:
+                    j = pending.get_nowait()
+                except queue.Empty:
+                    return
+                if throttle is not None:
+                    throttle.wait()
+                details = self._extract_details(j["job_link"], driver=driver)
+                done.put({**j, **details})
+
+        def worker(index: int) -> None:
+            try:
+                if index == 0 or self.fetcher is not None:
+                    # The HTTP backend shares one pooled client across workers
+                    drain(self.driver)
+                else:
+                    # Don't wait for browsers leased by other scrapes
+                    with self._pool.lease(timeout=0, user_agent=_random_user_agent()) as driver:
+                        drain(driver)
+            except Exception:
+                # Lost browser or no free browser: the remaining workers drain the queue
+                pass
+            finally:
+                done.put(None)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as executor:
+            for i in range(workers):
+                executor.submit(worker, i)
+            finished = 0
+            while finished < workers:
+                record = done.get()
+                if record is None:
+                    finished += 1
+                else:
+                    yield record
+
     @staticmethod
     def _ensure_dir(path: str) -> None:
         os.makedirs(path, exist_ok=True)
@@ -226,32 +338,65 @@ class LinkedInJobScraper:
         ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
         csv_path = os.path.join(out_dir, f"{base_name}-{ts}.csv")
         json_path = os.path.join(out_dir, f"{base_name}-{ts}.json")
-        df = pd.DataFrame.from_records(records)
-        df.to_csv(csv_path, index=False)
+        columns: Dict[str, None] = {}
+        for r in records:
+            columns.update(dict.fromkeys(r))
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(columns))
+            writer.writeheader()
+            writer.writerows(records)
         with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
+            json.dump(records, f, ensure_ascii=False, separators=(",", ":"), default=str)
         return {"csv": csv_path, "json": json_path}
 
     def close(self) -> None:
-        try:
-            self.driver.quit()
-        except Exception:
-            pass
-
-
-def run_advanced_scrape(keywords: str, location: str, out_dir: str, config: Optional[ScrapeConfig] = None, enrich: bool = True) -> Dict[str, Any]:
+        # Hand the browser back to the pool; it is reset there or recycled if unhealthy.
+        # The HTTP backend's client is process-wide and stays open.
+        if self.driver is not None:
+            self._pool.release(self.driver)
+            self.driver = None
+
+
+def run_advanced_scrape(
+    keywords: str,
+    location: str,
+    out_dir: str,
+    config: Optional[ScrapeConfig] = None,
+    enrich: bool = True,
+    stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    ingest: Optional[Callable[[List[Dict[str, Any]]], int]] = None,
+    export: bool = True,
+    stored_details: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """Scrape, optionally enrich, then hand records to ``ingest`` and/or write export files.
+
+    ``ingest`` receives the records in memory and returns how many jobs it created.
+    ``stored_details`` maps listings to already known details by job_link; those
+    listings are not enriched again.
+    """
     cfg = config or ScrapeConfig()
     scraper = LinkedInJobScraper(cfg)
     try:
-        listings = scraper.search_and_collect(keywords, location)
-        records = scraper.enrich_details(listings) if enrich else listings
-        files = scraper.export(records, out_dir=out_dir, base_name=f"{keywords}-{location}".replace(" ", "_"))
+        listings = scraper.search_and_collect(keywords, location, stop_when=stop_when)
+        records = listings
+        reused: Dict[str, Dict[str, Any]] = {}
+        if enrich:
+            reused = stored_details(listings) if stored_details is not None and listings else {}
+            fresh = scraper.enrich_details([j for j in listings if j["job_link"] not in reused], should_stop=should_stop)
+            by_link = {r["job_link"]: r for r in fresh}
+            records = [
+                {**j, **reused[j["job_link"]]} if j["job_link"] in reused else by_link.get(j["job_link"], j)
+                for j in listings
+            ]
+        created = ingest(records) if ingest is not None and records else 0
+        files = scraper.export(records, out_dir=out_dir, base_name=f"{keywords}-{location}".replace(" ", "_")) if export else {}
         return {
             "found": len(listings),
-            "exported": len(records),
+            "reused_details": len(reused),
+            "exported": len(records) if export else 0,
+            "created": created,
             "files": files,
         }
     finally:
         scraper.close()
-
-
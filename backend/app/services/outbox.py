@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .. import crud, metrics, models
+from ..config import settings
+from ..database import SessionLocal
+from .alerts import CHANNELS
+
+
+logger = logging.getLogger(__name__)
+
+# (outbox row update, alert log or None) for one delivered entry
+Outcome = Tuple[Dict[str, Any], Optional[Dict[str, Any]]]
+
+
+def backoff_seconds(attempts: int, base: float, cap: float) -> float:
+	"""Exponential backoff with jitter for the ``attempts``-th failed delivery."""
+	return min(base * 2 ** max(attempts - 1, 0), cap) * random.uniform(0.5, 1.0)
+
+
+class OutboxWorker:
+	"""Drains ``alert_outbox`` in batches on a daemon thread.
+
+	Each batch is claimed under a lease, grouped by channel and delivered with up to
+	``concurrency`` channels in flight. Successes and exhausted retries are recorded
+	in ``alert_logs``; other failures are rescheduled with exponential backoff. Any
+	number of workers, in one process or many, can share the table.
+	"""
+
+	def __init__(
+		self,
+		batch_size: int,
+		poll_interval: float,
+		max_attempts: int,
+		lease_seconds: int,
+		concurrency: int,
+		backoff_base: float,
+		backoff_max: float,
+	):
+		self.batch_size = max(batch_size, 1)
+		self.poll_interval = poll_interval
+		self.max_attempts = max(max_attempts, 1)
+		self.lease_seconds = lease_seconds
+		self.backoff_base = backoff_base
+		self.backoff_max = backoff_max
+		self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+		self._executor = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="outbox-send")
+		self._wake = threading.Event()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def start(self) -> None:
+		if self._thread is not None:
+			return
+		self._thread = threading.Thread(target=self._loop, name="alert-outbox", daemon=True)
+		self._thread.start()
+
+	def wake(self) -> None:
+		"""Check the outbox now instead of at the next poll."""
+		self._wake.set()
+
+	def stop(self, timeout: Optional[float] = None) -> None:
+		self._stop.set()
+		self._wake.set()
+		if self._thread is not None:
+			self._thread.join(timeout)
+		self._executor.shutdown(wait=False, cancel_futures=True)
+
+	def _loop(self) -> None:
+		while not self._stop.is_set():
+			try:
+				claimed = self.drain_once()
+			except Exception:
+				logger.exception("Alert outbox batch failed")
+				claimed = 0
+			if claimed >= self.batch_size:
+				continue
+			self._wake.wait(self.poll_interval)
+			self._wake.clear()
+
+	def drain_once(self) -> int:
+		"""Claim and deliver one batch; returns how many outbox rows were claimed."""
+		db = SessionLocal()
+		try:
+			entries = crud.claim_alert_outbox(db, self.name, self.batch_size, self.lease_seconds)
+			if not entries:
+				return 0
+			jobs = crud.jobs_by_id(db, (e.job_id for e in entries))
+			by_channel: Dict[str, List[models.AlertOutbox]] = defaultdict(list)
+			for entry in entries:
+				by_channel[entry.channel].append(entry)
+			enabled = set(settings.alert_channels())
+			futures = {
+				channel: self._executor.submit(self._deliver, channel, group, jobs, channel in enabled)
+				for channel, group in by_channel.items()
+			}
+			outcomes: List[Outcome] = []
+			for channel, future in futures.items():
+				for entry, ok, detail in future.result():
+					outcomes.append(self._outcome(entry, ok, detail))
+			finished = crud.finish_alert_outbox(db, self.name, outcomes)
+			if finished < len(outcomes):
+				logger.warning("%d outbox rows outlived their lease and were left to another worker", len(outcomes) - finished)
+			return len(entries)
+		finally:
+			db.close()
+
+	def _deliver(
+		self, channel: str, entries: Sequence[models.AlertOutbox], jobs: Dict[int, models.Job], enabled: bool
+	) -> List[Tuple[models.AlertOutbox, Optional[bool], str]]:
+		"""Returns (entry, ok, detail); ok is None when retrying cannot help."""
+		send = CHANNELS.get(channel)
+		if send is None or not enabled:
+			return [(e, None, f"channel {channel} is not configured") for e in entries]
+		ready = [e for e in entries if e.job_id in jobs]
+		out: List[Tuple[models.AlertOutbox, Optional[bool], str]] = [
+			(e, None, "job no longer exists") for e in entries if e.job_id not in jobs
+		]
+		start = time.perf_counter()
+		try:
+			results = send([jobs[e.job_id] for e in ready])
+		except Exception as e:
+			logger.exception("Delivering %s alerts failed", channel)
+			results = [(False, str(e) or e.__class__.__name__)] * len(ready)
+		elapsed = time.perf_counter() - start
+		metrics.ALERT_SEND_SECONDS.observe(elapsed, channel=channel)
+		metrics.SCRAPE_STAGE_SECONDS.observe(elapsed, stage="alert_send")
+		out.extend((entry, ok, detail) for entry, (ok, detail) in zip(ready, results))
+		return out
+
+	def _outcome(self, entry: models.AlertOutbox, ok: Optional[bool], detail: str) -> Outcome:
+		"""Outbox update (keyed by id and the claim's lease) and alert log for one delivery."""
+		now = datetime.utcnow()
+		claim = {"id": entry.id, "locked_until": entry.locked_until}
+		attempts = entry.attempts + 1
+		metrics.ALERT_DELIVERIES.inc(
+			channel=entry.channel,
+			status="sent" if ok else ("failed" if ok is None or attempts >= self.max_attempts else "retry"),
+		)
+		if ok:
+			return (
+				{**claim, "status": crud.OUTBOX_SENT, "attempts": attempts, "sent_at": now, "last_error": None},
+				{"job_id": entry.job_id, "channel": entry.channel, "status": "sent", "message": detail[:180]},
+			)
+		if ok is None or attempts >= self.max_attempts:
+			return (
+				{**claim, "status": crud.OUTBOX_DEAD, "attempts": attempts, "last_error": detail},
+				{"job_id": entry.job_id, "channel": entry.channel, "status": "failed", "message": detail[:180]},
+			)
+		delay = backoff_seconds(attempts, self.backoff_base, self.backoff_max)
+		return (
+			{
+				**claim,
+				"status": crud.OUTBOX_PENDING,
+				"attempts": attempts,
+				"next_attempt_at": now + timedelta(seconds=delay),
+				"last_error": detail,
+			},
+			None,
+		)
+
+
+_worker: Optional[OutboxWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_outbox_worker() -> OutboxWorker:
+	global _worker
+	with _worker_lock:
+		if _worker is None:
+			_worker = OutboxWorker(
+				batch_size=settings.outbox_batch_size,
+				poll_interval=settings.outbox_poll_interval,
+				max_attempts=settings.outbox_max_attempts,
+				lease_seconds=settings.outbox_lease_seconds,
+				concurrency=settings.outbox_concurrency,
+				backoff_base=settings.outbox_backoff_base,
+				backoff_max=settings.outbox_backoff_max,
+			)
+		return _worker
+
+
+def start_outbox_worker() -> OutboxWorker:
+	worker = get_outbox_worker()
+	worker.start()
+	return worker
+
+
+def stop_outbox_worker(timeout: float = 5) -> None:
+	global _worker
+	with _worker_lock:
+		worker, _worker = _worker, None
+	if worker is not None:
+		worker.stop(timeout)
+
+
+def notify_outbox() -> None:
+	"""Nudge this process's worker after an ingest; a no-op if it isn't running."""
+	if _worker is not None:
+		_worker.wake()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .. import metrics
+from ..config import settings
+from ..identity import canonical_job_url
+
+
+logger = logging.getLogger(__name__)
+
+HIT = metrics.PAGE_CACHE_HIT
+REVALIDATED = metrics.PAGE_CACHE_REVALIDATED
+MISS = metrics.PAGE_CACHE_MISS
+
+
+@dataclass
+class CacheEntry:
+	url: str
+	html: Optional[str]
+	# parse_job_details output for html
+	parsed: Dict[str, Any]
+	etag: Optional[str] = None
+	last_modified: Optional[str] = None
+	fetched_at: float = field(default_factory=time.time)
+
+	def fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+		return (now if now is not None else time.time()) - self.fetched_at < ttl
+
+
+class PageCache:
+	"""Detail pages on disk, one gzip file of HTML plus parsed fields per canonical job URL.
+
+	Entries younger than ``ttl`` are served as is; older ones are returned too so the
+	caller can revalidate them with their ETag/Last-Modified. Reads bump a file's mtime,
+	and once the directory grows past ``max_bytes`` the least recently used files are
+	deleted down to 90% of it. Writes are atomic, so processes can share a directory.
+	"""
+
+	def __init__(self, directory: str, max_bytes: int, ttl: float):
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.ttl = ttl
+		self._lock = threading.Lock()
+		# Bytes on disk; None until the first write scans the directory
+		self._size: Optional[int] = None
+
+	def _path(self, url: str) -> str:
+		key = hashlib.sha256(canonical_job_url(url).encode("utf-8")).hexdigest()
+		return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+	def get(self, url: str) -> Optional[CacheEntry]:
+		path = self._path(url)
+		try:
+			with gzip.open(path, "rt", encoding="utf-8") as f:
+				data = json.load(f)
+			os.utime(path)
+		except FileNotFoundError:
+			return None
+		except (OSError, ValueError) as e:
+			logger.warning("Dropping unreadable page cache entry %s: %s", path, e)
+			self._remove(path)
+			return None
+		return CacheEntry(**data)
+
+	def put(self, entry: CacheEntry) -> None:
+		path = self._path(entry.url)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+		try:
+			old = os.path.getsize(path)
+		except OSError:
+			old = 0
+		with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+			json.dump(entry.__dict__, f, ensure_ascii=False, separators=(",", ":"), default=str)
+		size = os.path.getsize(tmp)
+		os.replace(tmp, path)
+		with self._lock:
+			if self._size is None:
+				self._size = self._scan_size()
+			else:
+				self._size += size - old
+			over = self._size > self.max_bytes
+		if over:
+			self._evict()
+
+	def touch(self, entry: CacheEntry) -> None:
+		"""Restart an entry's TTL after the server confirmed it is current."""
+		entry.fetched_at = time.time()
+		self.put(entry)
+
+	def _files(self) -> List[os.DirEntry]:
+		files: List[os.DirEntry] = []
+		try:
+			subdirs = [d for d in os.scandir(self.directory) if d.is_dir()]
+		except FileNotFoundError:
+			return files
+		for subdir in subdirs:
+			files.extend(f for f in os.scandir(subdir.path) if f.name.endswith(".json.gz"))
+		return files
+
+	def _scan_size(self) -> int:
+		return sum(f.stat().st_size for f in self._files())
+
+	def _remove(self, path: str) -> None:
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+
+	def _evict(self) -> None:
+		with self._lock:
+			files = sorted((f.stat().st_mtime, f.stat().st_size, f.path) for f in self._files())
+			size = sum(s for _, s, _ in files)
+			target = int(self.max_bytes * 0.9)
+			removed = 0
+			for _, file_size, path in files:
+				if size <= target:
+					break
+				self._remove(path)
+				size -= file_size
+				removed += 1
+			self._size = size
+		logger.info("Evicted %d page cache entries, %d bytes left", removed, size)
+
+	def size(self) -> int:
+		with self._lock:
+			if self._size is None:
+				self._size = self._scan_size()
+			return self._size
+
+	@staticmethod
+	def record(result: str, entry: Optional[CacheEntry] = None) -> None:
+		metrics.PAGE_CACHE_REQUESTS.inc(result=result)
+		if entry is not None and entry.html:
+			metrics.PAGE_CACHE_BYTES_SAVED.inc(len(entry.html.encode("utf-8")))
+
+
+_cache: Optional[PageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+	"""Process-wide detail page cache, or None when PAGE_CACHE_ENABLED is off."""
+	global _cache
+	if not settings.page_cache_enabled:
+		return None
+	with _cache_lock:
+		if _cache is None:
+			_cache = PageCache(settings.page_cache_dir, settings.page_cache_max_bytes, settings.page_cache_ttl)
+			metrics.gauge("page_cache_bytes", "Size of the detail page cache on disk", callback=lambda: [((), _cache.size())])
+		return _cache
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional
+from urllib.parse import urljoin
+
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+
+from ..identity import canonical_job_url
+
+
+LINKEDIN_BASE_URL = "https://www.linkedin.com/"
+
+# CSS selectors for a search-result card
+SELECTORS = {
+	"job_cards": "div.base-card",
+	"title": "h3.base-search-card__title",
+	"company": "h4.base-search-card__subtitle",
+	"location": "span.job-search-card__location",
+	"posted_date": "time",
+	"job_link": "a.base-card__full-link",
+}
+
+# CSS selectors for a job detail page
+DETAIL_SELECTORS = {
+	"description": "div.description__text, div.show-more-less-html__markup",
+	"criteria": "li.description__job-criteria-item",
+}
+
+EMPLOYMENT_TYPES = ["Full-time", "Part-time", "Contract", "Internship", "Temporary"]
+
+
+@lru_cache(maxsize=None)
+def _compile(selector: str) -> CSSSelector:
+	return CSSSelector(selector)
+
+
+def _parse(page_source: str | None):
+	if not page_source or not page_source.strip():
+		return None
+	try:
+		return lxml_html.fromstring(page_source)
+	except (etree.ParserError, ValueError):
+		return None
+
+
+def _first(el, selector: Optional[str]):
+	if not selector:
+		return None
+	found = _compile(selector)(el)
+	return found[0] if found else None
+
+
+def _text(el) -> str:
+	# Collapse whitespace the way WebElement.text renders inline markup
+	return " ".join(el.text_content().split()) if el is not None else ""
+
+
+def parse_job_cards(
+	page_source: str | None,
+	selectors: Mapping[str, str] = SELECTORS,
+	base_url: str = LINKEDIN_BASE_URL,
+) -> List[Dict[str, Any]]:
+	"""Extract every job card from one search-result page snapshot.
+
+	Cards without a link are skipped since the link is the job's identity.
+	"""
+	doc = _parse(page_source)
+	if doc is None:
+		return []
+	jobs: List[Dict[str, Any]] = []
+	for card in _compile(selectors["job_cards"])(doc):
+		link_el = _first(card, selectors.get("job_link"))
+		href = (link_el.get("href") or "").strip() if link_el is not None else ""
+		if not href:
+			continue
+		posted = None
+		posted_el = _first(card, selectors.get("posted_date"))
+		if posted_el is not None and posted_el.get("datetime"):
+			# LinkedIn time tag carries an ISO datetime attribute
+			posted = posted_el.get("datetime").split("T")[0]
+		company_el = _first(card, selectors.get("company"))
+		location_el = _first(card, selectors.get("location"))
+		jobs.append({
+			"title": _text(_first(card, selectors.get("title"))),
+			"company": _text(company_el) if company_el is not None else None,
+			"location": _text(location_el) if location_el is not None else None,
+			"job_link": canonical_job_url(urljoin(base_url, href)),
+			"posted_date": posted,
+		})
+	return jobs
+
+
+def parse_job_details(page_source: str | None, selectors: Mapping[str, str] = DETAIL_SELECTORS) -> Dict[str, Any]:
+	"""Extract description, criteria and employment type from a job detail page."""
+	doc = _parse(page_source)
+	if doc is None:
+		return {}
+	data: Dict[str, Any] = {}
+	desc = _first(doc, selectors.get("description"))
+	data["description_html"] = etree.tostring(desc, encoding="unicode", method="html", with_tail=False) if desc is not None else None
+	data["description_text"] = "\n".join(desc.itertext()).strip() if desc is not None else None
+	data["criteria"] = [_text(li) for li in _compile(selectors["criteria"])(doc)]
+
+	# Best-effort extraction for structured fields
+	text = (data.get("description_text") or "").lower()
+	for key in EMPLOYMENT_TYPES:
+		if key.lower() in text:
+			data["employment_type"] = key
+			break
+	return data
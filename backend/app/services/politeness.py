@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .. import metrics
+from ..config import settings
+
+
+# Page outcomes reported back to the rate controller
+OK = "ok"
+THROTTLED = "throttled"
+BLOCKED = "blocked"
+EMPTY = "empty"
+ERROR = "error"
+
+# Redirect targets LinkedIn uses instead of content when it wants a login
+AUTH_WALL_MARKERS = ("/authwall", "/login", "/checkpoint", "/uas/login", "/signup")
+
+
+def is_auth_wall(url: Optional[str]) -> bool:
+	path = urlsplit(url or "").path
+	return any(path.startswith(marker) for marker in AUTH_WALL_MARKERS)
+
+
+def host_of(url: str) -> str:
+	return (urlsplit(url).hostname or url or "").lower()
+
+
+class Throttle:
+	"""Spaces out request starts across threads so they share one global rate.
+
+	Each ``wait()`` reserves the next free slot, ``1 / rate`` seconds (with jitter)
+	after the previous one, and sleeps until it arrives.
+	"""
+
+	def __init__(self, rate: float, jitter: float = 0.0):
+		if rate <= 0:
+			raise ValueError("rate must be positive")
+		self.rate = rate
+		self.jitter = jitter
+		self._next = 0.0
+		self._lock = threading.Lock()
+
+	def wait(self) -> float:
+		with self._lock:
+			now = time.monotonic()
+			slot = max(now, self._next)
+			interval = 1.0 / self.rate
+			if self.jitter:
+				interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+			self._next = slot + interval
+		delay = slot - now
+		if delay > 0:
+			time.sleep(delay)
+		return delay
+
+
+class _Budget:
+	"""Token bucket handing out reservations, so waiting threads never spin."""
+
+	def __init__(self, rate: float, burst: float):
+		self.rate = rate
+		self.burst = max(burst, 1.0)
+		self.tokens = self.burst
+		self.updated = time.monotonic()
+
+	def reserve(self, now: float) -> float:
+		self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+		self.tokens -= 1
+		return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class HostPacer:
+	"""AIMD pacing for one host.
+
+	Healthy responses raise the rate by ``increase`` requests/second up to
+	``max_rate``; throttling, auth walls and empty pages multiply it by ``decrease``
+	down to ``min_rate``, and 429s/auth walls also pause the host for a cooldown.
+	"""
+
+	def __init__(self, initial_rate: float, min_rate: float, max_rate: float, increase: float, decrease: float, cooldown: float):
+		self.min_rate = min_rate
+		self.max_rate = max_rate
+		self.rate = min(max(initial_rate, min_rate), max_rate)
+		self.increase = increase
+		self.decrease = decrease
+		self.cooldown = cooldown
+		self._next = 0.0
+		self.blocked_until = 0.0
+
+	def reserve(self, now: float) -> float:
+		slot = max(now, self._next, self.blocked_until)
+		self._next = slot + (1.0 / self.rate) * random.uniform(0.8, 1.2)
+		return slot - now
+
+	def feedback(self, outcome: str, now: float, retry_after: Optional[float] = None) -> None:
+		if outcome == OK:
+			self.rate = min(self.max_rate, self.rate + self.increase)
+			return
+		self.rate = max(self.min_rate, self.rate * self.decrease)
+		pause = retry_after if retry_after is not None else (self.cooldown if outcome in (THROTTLED, BLOCKED) else 0.0)
+		if pause:
+			self.blocked_until = max(self.blocked_until, now + pause)
+			# Reservations handed out before the backoff would otherwise still fire early
+			self._next = max(self._next, self.blocked_until)
+
+
+class RateController:
+	"""Central pacing for every scrape in the process: one AIMD pacer per host plus a global budget.
+
+	Scrapers call ``acquire(url)`` before each navigation and ``report(url, outcome)``
+	once they know how the page went.
+	"""
+
+	def __init__(
+		self,
+		global_rate: float,
+		global_burst: float,
+		initial_rate: float,
+		min_rate: float,
+		max_rate: float,
+		increase: float = 0.05,
+		decrease: float = 0.5,
+		cooldown: float = 60.0,
+		enabled: bool = True,
+	):
+		self.enabled = enabled
+		self._budget = _Budget(global_rate, global_burst)
+		self._host_params = dict(
+			initial_rate=initial_rate, min_rate=min_rate, max_rate=max_rate, increase=increase, decrease=decrease, cooldown=cooldown
+		)
+		self._hosts: Dict[str, HostPacer] = {}
+		self._lock = threading.Lock()
+
+	def _pacer(self, host: str) -> HostPacer:
+		pacer = self._hosts.get(host)
+		if pacer is None:
+			pacer = self._hosts[host] = HostPacer(**self._host_params)
+		return pacer
+
+	def acquire(self, url: str) -> float:
+		"""Block until a request to ``url`` may start; returns the seconds waited."""
+		if not self.enabled:
+			return 0.0
+		with self._lock:
+			now = time.monotonic()
+			delay = max(self._budget.reserve(now), self._pacer(host_of(url)).reserve(now))
+		if delay > 0:
+			with metrics.stage("politeness_wait"):
+				time.sleep(delay)
+		return delay
+
+	def report(self, url: str, outcome: str, retry_after: Optional[float] = None) -> None:
+		metrics.POLITENESS_OUTCOMES.inc(outcome=outcome)
+		if not self.enabled:
+			return
+		with self._lock:
+			self._pacer(host_of(url)).feedback(outcome, time.monotonic(), retry_after)
+
+	def rates(self) -> Dict[str, float]:
+		with self._lock:
+			return {host: pacer.rate for host, pacer in self._hosts.items()}
+
+
+_controller: Optional[RateController] = None
+_controller_lock = threading.Lock()
+
+
+def get_rate_controller() -> RateController:
+	global _controller
+	with _controller_lock:
+		if _controller is None:
+			_controller = RateController(
+				global_rate=settings.politeness_global_rate,
+				global_burst=settings.politeness_global_burst,
+				initial_rate=settings.politeness_initial_rate,
+				min_rate=settings.politeness_min_rate,
+				max_rate=settings.politeness_max_rate,
+				increase=settings.politeness_increase,
+				decrease=settings.politeness_decrease,
+				cooldown=settings.politeness_cooldown,
+				enabled=settings.politeness_enabled,
+			)
+		return _controller
+
+
+def _host_rates():
+	return [((host,), rate) for host, rate in (_controller.rates() if _controller else {}).items()]
+
+
+metrics.gauge("politeness_host_rate", "Current paced request rate per host (requests/second)", ["host"], callback=_host_rates)
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import dataclasses
+import heapq
+import itertools
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+from ..config import settings
+from ..database import SessionLocal
+from .incremental import KnownPageCheck
+from .outbox import notify_outbox
+
+
+logger = logging.getLogger(__name__)
+
+KIND_BASIC = "basic"
+KIND_ADVANCED = "advanced"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+class ScrapeCancelled(Exception):
+	pass
+
+
+def _run_basic(db: Session, run: models.ScrapeRun, should_stop: Callable[[], bool]) -> Dict[str, Any]:
+	from .scraper import scrape_linkedin_jobs
+
+	params = run.params or {}
+	# Scheduled runs stop paginating once pages are mostly already-stored jobs
+	check = KnownPageCheck(db, run.keywords, run.location) if params.get("incremental") else None
+	results = scrape_linkedin_jobs(
+		keywords=run.keywords,
+		location=run.location,
+		max_pages=params.get("max_pages", DEFAULT_MAX_PAGES),
+		backend=params.get("backend"),
+		stop_when=lambda cards: should_stop() or (check is not None and check(cards)),
+	)
+	if should_stop():
+		raise ScrapeCancelled()
+	new_jobs = crud.bulk_create_jobs(db, (crud.job_from_record(r, run.keywords) for r in results))
+	notify_outbox()
+	if check is not None:
+		check.record_run(results)
+	return {"found": len(results), "created": len(new_jobs)}
+
+
+def _run_advanced(db: Session, run: models.ScrapeRun, should_stop: Callable[[], bool]) -> Dict[str, Any]:
+	from .linkedin_scraper_advanced import ScrapeConfig, run_advanced_scrape
+
+	params = run.params or {}
+	enrich = params.get("enrich", True)
+	persist = params.get("persist", True)
+	export = params.get("export", True)
+	# Runs also carry queue-level keys (saved_search_ids, incremental) that aren't scraper settings
+	fields = {f.name for f in dataclasses.fields(ScrapeConfig)}
+	cfg = ScrapeConfig(**{k: v for k, v in params.items() if k in fields})
+
+	def ingest(records: List[Dict[str, Any]]) -> int:
+		if should_stop():
+			raise ScrapeCancelled()
+		# Persist basic fields straight from the scraped records so the UI can query immediately
+		created = crud.bulk_create_jobs(db, (crud.job_from_record(r, run.keywords) for r in records))
+		crud.save_job_details(db, records)
+		notify_outbox()
+		return len(created)
+
+	result = run_advanced_scrape(
+		keywords=run.keywords,
+		location=run.location,
+		out_dir="exports",
+		config=cfg,
+		enrich=enrich,
+		stop_when=lambda batch: should_stop(),
+		should_stop=should_stop,
+		ingest=ingest if persist else None,
+		# Listings whose card is unchanged since their last enrichment reuse the stored details
+		stored_details=(lambda listings: crud.stored_job_details(db, listings)) if persist else None,
+		export=export,
+	)
+	if should_stop():
+		raise ScrapeCancelled()
+	# Attach URLs for download via mounted static route
+	files = result.get("files", {})
+	for k, p in list(files.items()):
+		if p:
+			files[k] = f"/exports/{p.split('exports/')[-1]}"
+	result["files"] = files
+	return result
+
+
+RUNNERS: Dict[str, Callable[[Session, models.ScrapeRun, Callable[[], bool]], Dict[str, Any]]] = {
+	KIND_BASIC: _run_basic,
+	KIND_ADVANCED: _run_advanced,
+}
+
+
+DEFAULT_MAX_PAGES = 10
+
+# Run params that change what a scrape returns or stores, with their defaults. Submissions
+# only share a run when these match; max_pages is merged instead (see ScrapeQueue._covers)
+_RESULT_PARAMS = {"enrich": True, "persist": True, "export": True, "incremental": False, "backend": None}
+
+DedupKey = Tuple[Any, ...]
+
+
+def _dedup_key(kind: str, keywords: str, location: str, params: Optional[Dict[str, Any]] = None) -> DedupKey:
+	params = params or {}
+	result = tuple(params.get(name, default) for name, default in _RESULT_PARAMS.items())
+	# An explicit default backend fetches the same pages as no backend at all
+	result = result[:-1] + (result[-1] or settings.scrape_backend,)
+	return (kind, (keywords or "").strip().lower(), (location or "").strip().lower()) + result
+
+
+def _coalesce_params(current: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+	"""Params of a run shared by two submissions: the deeper page count and every saved search."""
+	merged = dict(current)
+	if "max_pages" in new:
+		merged["max_pages"] = max(merged.get("max_pages") or 0, new["max_pages"] or 0)
+	ids = list(merged.get("saved_search_ids") or [])
+	ids.extend(i for i in new.get("saved_search_ids") or [] if i not in ids)
+	if ids:
+		merged["saved_search_ids"] = ids
+	return merged
+
+
+class ScrapeQueue:
+	"""Runs scrapes on a bounded worker pool with state persisted in ``scrape_runs``.
+
+	Submissions with the same kind, keywords, location and result-affecting params
+	share the run already queued or in flight. A shared run that has not started yet
+	picks up the larger page count and priority; a running one is only shared when
+	it already covers the requested page count. Queued runs start highest priority first. Cancellation is
+	cooperative: scrapers check it between pages and between enriched jobs.
+
+	Runs are owned by the queue's ``holder``. A heartbeat renews their lease every
+	third of ``lease_seconds`` and fails runs of other processes whose lease lapsed.
+	"""
+
+	def __init__(self, max_workers: int, lease_seconds: Optional[float] = None):
+		self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+		self.lease_seconds = lease_seconds or settings.scrape_run_lease_seconds
+		self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="scrape")
+		self._lock = threading.Lock()
+		self._inflight: Dict[DedupKey, int] = {}
+		self._cancel: Dict[int, threading.Event] = {}
+		# (-priority, seq, run id, key); every entry has one executor task that pops the best entry
+		self._pending: List[Tuple[int, int, int, DedupKey]] = []
+		self._priority: Dict[int, int] = {}
+		self._params: Dict[int, Dict[str, Any]] = {}
+		self._started: set[int] = set()
+		self._seq = itertools.count()
+		self._stop = threading.Event()
+		self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="scrape-lease", daemon=True)
+		self._heartbeat.start()
+
+	def submit(
+		self,
+		kind: str,
+		keywords: str,
+		location: str,
+		params: Optional[Dict[str, Any]] = None,
+		priority: int = 0,
+	) -> Tuple[int, bool]:
+		"""Queue a scrape; returns (run id, whether a new run was created)."""
+		if kind not in RUNNERS:
+			raise ValueError(f"Unknown scrape kind: {kind}")
+		key = _dedup_key(kind, keywords, location, params)
+		with self._lock:
+			existing = self._inflight.get(key)
+			if existing is not None and self._covers(existing, params or {}):
+				self._coalesce(existing, key, params or {}, priority)
+				return existing, False
+			db = SessionLocal()
+			try:
+				run_id = crud.create_scrape_run(
+					db, kind, keywords, location, params, holder=self.holder, lease_seconds=self.lease_seconds
+				).id
+			finally:
+				db.close()
+			# A run started with fewer pages keeps going; later submissions share the new one
+			self._inflight[key] = run_id
+			self._cancel[run_id] = threading.Event()
+			self._params[run_id] = dict(params or {})
+			self._push(run_id, key, priority)
+		return run_id, True
+
+	def _push(self, run_id: int, key: DedupKey, priority: int) -> None:
+		# Caller holds the lock
+		self._priority[run_id] = priority
+		heapq.heappush(self._pending, (-priority, next(self._seq), run_id, key))
+		self._executor.submit(self._next)
+
+	def _covers(self, run_id: int, params: Dict[str, Any]) -> bool:
+		# Caller holds the lock. Queued runs read their params only when they start
+		if run_id not in self._started:
+			return True
+		current = self._params.get(run_id, {}).get("max_pages") or DEFAULT_MAX_PAGES
+		return current >= (params.get("max_pages") or DEFAULT_MAX_PAGES)
+
+	def _coalesce(self, run_id: int, key: DedupKey, params: Dict[str, Any], priority: int) -> None:
+		# Caller holds the lock, so the run can't finish (and miss the merged params) meanwhile
+		db = SessionLocal()
+		try:
+			run = crud.get_scrape_run(db, run_id)
+			merged = _coalesce_params(run.params or {}, params) if run is not None else None
+			if merged is not None and merged != (run.params or {}):
+				crud.update_scrape_run(db, run_id, params=merged)
+				self._params[run_id] = merged
+		finally:
+			db.close()
+		if run_id not in self._started and priority > self._priority.get(run_id, 0):
+			self._push(run_id, key, priority)
+
+	def _next(self) -> None:
+		with self._lock:
+			while self._pending:
+				_, _, run_id, key = heapq.heappop(self._pending)
+				# Skip entries superseded by a priority bump, or for runs already done
+				if run_id in self._cancel and run_id not in self._started:
+					self._started.add(run_id)
+					break
+			else:
+				return
+		self._execute(run_id, key)
+
+	def cancel(self, run_id: int) -> bool:
+		with self._lock:
+			event = self._cancel.get(run_id)
+		if event is None:
+			return False
+		event.set()
+		return True
+
+	def is_active(self, run_id: int) -> bool:
+		with self._lock:
+			return run_id in self._cancel
+
+	def _execute(self, run_id: int, key: DedupKey) -> None:
+		event = self._cancel[run_id]
+		db = SessionLocal()
+		try:
+			if event.is_set():
+				crud.update_scrape_run(db, run_id, status=STATUS_CANCELLED, finished_at=datetime.utcnow())
+				return
+			run = crud.update_scrape_run(db, run_id, status=STATUS_RUNNING, started_at=datetime.utcnow())
+			try:
+				result = RUNNERS[run.kind](db, run, event.is_set)
+			except ScrapeCancelled:
+				crud.update_scrape_run(db, run_id, status=STATUS_CANCELLED, finished_at=datetime.utcnow())
+				return
+			except Exception as e:
+				logger.exception("Scrape run %s failed", run_id)
+				db.rollback()
+				crud.update_scrape_run(db, run_id, status=STATUS_FAILED, error=str(e)[:2000], finished_at=datetime.utcnow())
+				return
+			crud.update_scrape_run(
+				db,
+				run_id,
+				status=STATUS_SUCCEEDED,
+				found=result.get("found"),
+				created=result.get("created"),
+				result=result,
+				finished_at=datetime.utcnow(),
+			)
+		finally:
+			with self._lock:
+				if self._inflight.get(key) == run_id:
+					del self._inflight[key]
+				self._cancel.pop(run_id, None)
+				self._priority.pop(run_id, None)
+				self._params.pop(run_id, None)
+				self._started.discard(run_id)
+			try:
+				crud.record_saved_search_run(db, run_id)
+			except Exception:
+				logger.exception("Recording saved search stats for run %s failed", run_id)
+			finally:
+				db.close()
+
+	def heartbeat(self) -> int:
+		"""Renew this queue's runs and fail expired ones; returns how many were failed."""
+		with self._lock:
+			active = bool(self._cancel)
+		db = SessionLocal()
+		try:
+			if active:
+				crud.renew_scrape_runs(db, self.holder, self.lease_seconds)
+			failed = crud.fail_expired_scrape_runs(db, "interrupted: the process running it stopped")
+		except SQLAlchemyError:
+			logger.warning("Scrape run heartbeat failed", exc_info=True)
+			return 0
+		finally:
+			db.close()
+		if failed:
+			logger.warning("Marked %d scrape runs of stopped processes as failed", failed)
+		return failed
+
+	def _heartbeat_loop(self) -> None:
+		while not self._stop.wait(self.lease_seconds / 3):
+			self.heartbeat()
+
+	def shutdown(self, wait: bool = False) -> None:
+		self._stop.set()
+		with self._lock:
+			events = list(self._cancel.values())
+		for event in events:
+			event.set()
+		self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_queue: Optional[ScrapeQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_scrape_queue() -> ScrapeQueue:
+	global _queue
+	with _queue_lock:
+		if _queue is None:
+			_queue = ScrapeQueue(settings.scrape_max_concurrency)
+		return _queue
+
+
+def shutdown_scrape_queue() -> None:
+	global _queue
+	with _queue_lock:
+		queue, _queue = _queue, None
+	if queue is not None:
+		queue.shutdown()
+
+
+def recover_interrupted_runs() -> int:
+	"""Fail runs whose process stopped without finishing them; they will never finish.
+
+	Starts this process's queue, whose heartbeat keeps failing runs of processes that
+	stop later. Runs other live workers own are untouched.
+	"""
+	return get_scrape_queue().heartbeat()
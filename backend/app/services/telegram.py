@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import html
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+
+class _TokenBucket:
+	"""Token bucket for one event loop; ``pause`` honours a server-side retry_after."""
+
+	def __init__(self, rate: float, capacity: float = 1.0):
+		self.rate = rate
+		self.capacity = capacity
+		self.tokens = capacity
+		self.updated = time.monotonic()
+		self.blocked_until = 0.0
+
+	def pause(self, seconds: float) -> None:
+		self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+		self.tokens = 0.0
+
+	async def acquire(self) -> None:
+		while True:
+			now = time.monotonic()
+			if now < self.blocked_until:
+				await asyncio.sleep(self.blocked_until - now)
+				continue
+			self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+			self.updated = now
+			if self.tokens >= 1:
+				self.tokens -= 1
+				return
+			await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def group_messages(texts: Sequence[str], max_items: int, max_length: int = MAX_MESSAGE_LENGTH) -> List[Tuple[str, List[int]]]:
+	"""Fold texts into messages of up to ``max_items`` entries within Telegram's length limit.
+
+	Texts are HTML and are never cut here (that could split an entity or a tag); build
+	them within ``max_length`` as job_text does. Returns (message, indexes of the texts
+	it carries) pairs.
+	"""
+	groups: List[Tuple[str, List[int]]] = []
+	parts: List[str] = []
+	indexes: List[int] = []
+	length = 0
+	for i, text in enumerate(texts):
+		extra = len(text) + (2 if parts else 0)
+		if parts and (len(parts) >= max_items or length + extra > max_length):
+			groups.append(("\n\n".join(parts), indexes))
+			parts, indexes, length = [], [], 0
+			extra = len(text)
+		parts.append(text)
+		indexes.append(i)
+		length += extra
+	if parts:
+		groups.append(("\n\n".join(parts), indexes))
+	return groups
+
+
+class TelegramSender:
+	"""Sends Bot API messages from a dedicated event-loop thread.
+
+	One keep-alive AsyncClient is shared by every send. A global bucket and one
+	bucket per chat keep within Telegram's flood limits; 429 responses pause the
+	chat for ``retry_after`` and other failures retry with exponential backoff.
+	"""
+
+	def __init__(
+		self,
+		token: str,
+		api_base: str,
+		chat_rate: float,
+		global_rate: float,
+		max_retries: int,
+	):
+		self.token = token
+		self.api_base = api_base.rstrip("/")
+		self.chat_rate = chat_rate
+		self.max_retries = max_retries
+		self._global = _TokenBucket(global_rate, capacity=max(global_rate, 1.0))
+		self._chats: Dict[str, _TokenBucket] = {}
+		self._loop = asyncio.new_event_loop()
+		self._client: Optional[httpx.AsyncClient] = None
+		self._thread = threading.Thread(target=self._loop.run_forever, name="telegram-sender", daemon=True)
+		self._thread.start()
+
+	async def _get_client(self) -> httpx.AsyncClient:
+		if self._client is None:
+			self._client = httpx.AsyncClient(
+				base_url=self.api_base,
+				timeout=10,
+				limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+			)
+		return self._client
+
+	def _chat_bucket(self, chat_id: str) -> _TokenBucket:
+		bucket = self._chats.get(chat_id)
+		if bucket is None:
+			bucket = self._chats[chat_id] = _TokenBucket(self.chat_rate)
+		return bucket
+
+	async def _send(self, chat_id: str, text: str) -> Tuple[bool, str]:
+		client = await self._get_client()
+		bucket = self._chat_bucket(chat_id)
+		detail = ""
+		for attempt in range(self.max_retries + 1):
+			await bucket.acquire()
+			await self._global.acquire()
+			try:
+				resp = await client.post(
+					f"/bot{self.token}/sendMessage",
+					json={"chat_id": chat_id, "text": text, "parse_mode": "HTML", "disable_web_page_preview": True},
+				)
+			except httpx.HTTPError as e:
+				detail = str(e) or e.__class__.__name__
+				await asyncio.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.0))
+				continue
+			if resp.status_code == 200:
+				return True, text[:180]
+			try:
+				payload = resp.json()
+			except ValueError:
+				payload = {}
+			detail = payload.get("description") or f"HTTP {resp.status_code}"
+			if resp.status_code == 429:
+				retry_after = float((payload.get("parameters") or {}).get("retry_after") or 1)
+				bucket.pause(retry_after)
+				continue
+			if resp.status_code < 500:
+				# Bad request, blocked bot, unknown chat: retrying won't help
+				return False, detail
+			await asyncio.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.0))
+		return False, detail
+
+	async def _send_all(self, chat_id: str, texts: Sequence[str], results: List[Optional[Tuple[bool, str]]]) -> None:
+		async def send(i: int, text: str) -> None:
+			results[i] = await self._send(chat_id, text)
+
+		await asyncio.gather(*(send(i, t) for i, t in enumerate(texts)))
+
+	def send_many(self, chat_id: str, texts: Sequence[str], timeout: Optional[float] = None) -> List[Tuple[bool, str]]:
+		"""Send texts (concurrently, within rate limits) and block until all are done.
+
+		After ``timeout`` seconds the sends still waiting or in flight are cancelled and
+		reported as failed; the ones already sent keep their result.
+		"""
+		if not texts:
+			return []
+		results: List[Optional[Tuple[bool, str]]] = [None] * len(texts)
+		future = asyncio.run_coroutine_threadsafe(self._send_all(chat_id, texts, results), self._loop)
+		try:
+			future.result(timeout)
+		except concurrent.futures.TimeoutError:
+			future.cancel()
+		return [r if r is not None else (False, f"not sent within {timeout:g}s") for r in results]
+
+	def close(self) -> None:
+		async def _close():
+			if self._client is not None:
+				await self._client.aclose()
+
+		try:
+			asyncio.run_coroutine_threadsafe(_close(), self._loop).result(5)
+		except Exception:
+			pass
+		self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_sender: Optional[TelegramSender] = None
+_sender_lock = threading.Lock()
+
+
+def get_telegram_sender() -> TelegramSender:
+	global _sender
+	with _sender_lock:
+		if _sender is None:
+			_sender = TelegramSender(
+				token=settings.telegram_bot_token or "",
+				api_base=settings.telegram_api_base,
+				chat_rate=settings.telegram_chat_rate,
+				global_rate=settings.telegram_global_rate,
+				max_retries=settings.telegram_max_retries,
+			)
+		return _sender
+
+
+def _escape_within(text: str, limit: int) -> str:
+	"""HTML-escape ``text``, dropping trailing characters so the result fits ``limit``.
+
+	Cuts the raw text, never the escaped one, so no entity is split.
+	"""
+	escaped = html.escape(text)
+	if len(escaped) <= limit:
+		return escaped
+	parts: List[str] = []
+	length = 0
+	for char in text:
+		part = html.escape(char)
+		if length + len(part) > limit - 1:
+			break
+		parts.append(part)
+		length += len(part)
+	return "".join(parts) + "…"
+
+
+# Escaped length budget per field; with the template they stay under MAX_MESSAGE_LENGTH
+_FIELD_LIMITS = {"title": 1000, "company": 500, "location": 500, "job_link": 2000}
+
+
+def job_text(job) -> str:
+	title, company, location, link = (
+		_escape_within(getattr(job, field) or "", limit) for field, limit in _FIELD_LIMITS.items()
+	)
+	return f"New Job: <b>{title}</b> at {company}\n{location}\n{link}"
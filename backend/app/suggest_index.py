@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+# Shown after real matches when the index has few of its own
+DEFAULT_KEYWORDS = ["Engineer", "Developer", "Data Scientist", "Product Manager", "Designer", "Analyst"]
+
+
+def _words(value: str) -> List[str]:
+	return value.replace("/", " ").replace("-", " ").split()
+
+
+class PrefixIndex:
+	"""Frequency-weighted prefix lookup over a sorted array of match keys.
+
+	Every term is reachable from the start of each of its words, so "llc" finds
+	"Google LLC". Lookups bisect to the key range and pick the most frequent terms.
+	"""
+
+	def __init__(self):
+		self._counts: dict[str, int] = {}
+		self._keys: list[tuple[str, str]] = []
+
+	def __len__(self) -> int:
+		return len(self._counts)
+
+	@staticmethod
+	def _match_keys(term: str) -> set[str]:
+		lowered = term.lower()
+		words = _words(lowered)
+		return {lowered} | {" ".join(words[i:]) for i in range(1, len(words))}
+
+	@classmethod
+	def from_counts(cls, counts: Counter) -> "PrefixIndex":
+		"""Bulk build with a single sort instead of one insort per term."""
+		index = cls()
+		index._counts = {t: c for t, c in counts.items() if t}
+		index._keys = sorted((key, term) for term in index._counts for key in cls._match_keys(term))
+		return index
+
+	def add(self, term: Optional[str], count: int = 1) -> None:
+		term = (term or "").strip()
+		if not term:
+			return
+		if term not in self._counts:
+			self._counts[term] = 0
+			for key in self._match_keys(term):
+				insort(self._keys, (key, term))
+		self._counts[term] += count
+
+	def lookup(self, prefix: str, limit: int) -> List[str]:
+		prefix = (prefix or "").strip().lower()
+		if not prefix:
+			candidates = self._counts.keys()
+		else:
+			lo = bisect_left(self._keys, (prefix,))
+			hi = bisect_left(self._keys, (prefix + "\uffff",), lo)
+			candidates = {term for _, term in self._keys[lo:hi]}
+		return heapq.nlargest(limit, candidates, key=lambda t: (self._counts[t], t))
+
+
+class SuggestionIndex:
+	"""In-memory autocomplete data for /api/suggest/*, built from the jobs table at startup.
+
+	Ingest adds new jobs incrementally; a rebuild every ``suggest_index_refresh_seconds``
+	picks up rows written by other processes. ``generation`` changes whenever the
+	index does, so cached suggestions can be keyed by it.
+	"""
+
+	def __init__(self):
+		self._lock = threading.RLock()
+		self._reset()
+		self.built_at: Optional[float] = None
+		self.generation = 0
+		self._rebuilding = False
+
+	def _reset(self) -> None:
+		self.title_tokens = PrefixIndex()
+		self.titles = PrefixIndex()
+		self.keywords = PrefixIndex()
+		self.companies = PrefixIndex()
+		self.locations = PrefixIndex()
+
+	def _add(self, title: Optional[str], company: Optional[str], location: Optional[str], keywords: Optional[str]) -> None:
+		self.titles.add(title)
+		for word in _words(title or ""):
+			self.title_tokens.add(word)
+		for word in _words(keywords or ""):
+			self.title_tokens.add(word)
+		self.keywords.add(keywords)
+		self.companies.add(company)
+		self.locations.add(location)
+
+	def add_jobs(self, jobs: Iterable[models.Job]) -> None:
+		with self._lock:
+			if self.built_at is None:
+				return
+			added = False
+			for job in jobs:
+				self._add(job.title, job.company, job.location, job.keywords)
+				added = True
+			if added:
+				self.generation += 1
+
+	def build(self, db: Session) -> None:
+		rows = db.execute(
+			select(models.Job.title, models.Job.company, models.Job.location, models.Job.keywords)
+			.execution_options(yield_per=5000)
+		)
+		tokens, titles, keywords, companies, locations = Counter(), Counter(), Counter(), Counter(), Counter()
+		for title, company, location, kw in rows:
+			title, company, location, kw = (v.strip() if v else "" for v in (title, company, location, kw))
+			titles[title] += 1
+			tokens.update(_words(title))
+			tokens.update(_words(kw))
+			keywords[kw] += 1
+			companies[company] += 1
+			locations[location] += 1
+		built = [PrefixIndex.from_counts(c) for c in (tokens, titles, keywords, companies, locations)]
+		with self._lock:
+			self.title_tokens, self.titles, self.keywords, self.companies, self.locations = built
+			self.built_at = time.monotonic()
+			self.generation += 1
+
+	def rebuild(self) -> None:
+		db = SessionLocal()
+		try:
+			self.build(db)
+		finally:
+			db.close()
+
+	def _ensure_fresh(self) -> None:
+		if self.built_at is None:
+			with self._lock:
+				if self.built_at is None:
+					self.rebuild()
+			return
+		ttl = settings.suggest_index_refresh_seconds
+		if ttl and time.monotonic() - self.built_at > ttl and not self._rebuilding:
+			self._rebuilding = True
+
+			def _run():
+				try:
+					self.rebuild()
+				except Exception:
+					logger.exception("Suggestion index rebuild failed")
+				finally:
+					self._rebuilding = False
+
+			threading.Thread(target=_run, name="suggest-index", daemon=True).start()
+
+	def suggest_keywords(self, q: str, limit: int = 10) -> List[str]:
+		self._ensure_fresh()
+		with self._lock:
+			tokens = self.title_tokens.lookup(q, limit)
+			titles = self.titles.lookup(q, limit)
+			keywords = self.keywords.lookup(q, limit)
+		merged: List[str] = []
+		seen = set()
+		for term in [*tokens, *titles, *keywords, *DEFAULT_KEYWORDS]:
+			if term and term not in seen:
+				merged.append(term)
+				seen.add(term)
+			if len(merged) >= limit:
+				break
+		return merged
+
+	def suggest_companies(self, q: str, limit: int = 10) -> List[str]:
+		self._ensure_fresh()
+		with self._lock:
+			return self.companies.lookup(q, limit)
+
+	def suggest_locations(self, q: str, limit: int = 10) -> List[str]:
+		self._ensure_fresh()
+		with self._lock:
+			return self.locations.lookup(q, limit)
+
+
+suggestions = SuggestionIndex()
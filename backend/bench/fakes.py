@@ -0,0 +1,333 @@
+"""Offline stand-ins for LinkedIn and Telegram: recorded page fixtures, a fake WebDriver and local HTTP servers."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import socket
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Cards in the recorded search page; later pages reuse them with shifted job IDs
+CARDS_PER_PAGE = 25
+
+_JOB_ID_RE = re.compile(r"\b39(\d{8})\b")
+
+
+@lru_cache(maxsize=None)
+def fixture(name: str) -> str:
+	with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+		return f.read()
+
+
+def search_cards(start: int = 0, pages: int = 10) -> str:
+	"""Guest-endpoint markup (bare <li> cards) for the page beginning at ``start``."""
+	if start >= pages * CARDS_PER_PAGE:
+		return ""
+	return _JOB_ID_RE.sub(lambda m: str(3900000000 + int(m.group(1)) + start), fixture("search_page.html"))
+
+
+def search_document(start: int = 0, pages: int = 10) -> str:
+	"""Full search page as the logged-out site renders it around the same cards."""
+	return (
+		'<!DOCTYPE html><html><head><title>Jobs</title></head><body><main>'
+		f'<ul class="jobs-search__results-list">{search_cards(start, pages)}</ul>'
+		"</main></body></html>"
+	)
+
+
+def detail_document(job_id: Optional[str] = None) -> str:
+	return fixture("detail_page.html")
+
+
+class FakeElement:
+	"""Wraps an lxml element; lxml elements are falsy when empty, WebElements never are."""
+
+	def __init__(self, el):
+		self.el = el
+
+	@property
+	def text(self) -> str:
+		return " ".join(self.el.text_content().split())
+
+	def get_attribute(self, name: str) -> Optional[str]:
+		return self.el.get(name)
+
+
+class FakeWebDriver:
+	"""Just enough of selenium's WebDriver for the scrapers, backed by fixtures.
+
+	``latency`` seconds are slept on every navigation to model page loads.
+	"""
+
+	def __init__(self, pages: int = 10, latency: float = 0.0):
+		self.pages = pages
+		self.latency = latency
+		self.page_source = "<html><body></body></html>"
+		self.current_url = "about:blank"
+		self._doc = None
+
+	def get(self, url: str) -> None:
+		if self.latency:
+			threading.Event().wait(self.latency)
+		self.current_url = url
+		parsed = urlparse(url)
+		if "/jobs/search" in parsed.path:
+			start = int((parse_qs(parsed.query).get("start") or ["0"])[0])
+			self.page_source = search_document(start, self.pages)
+		elif "/jobs/view/" in parsed.path:
+			self.page_source = detail_document()
+		else:
+			self.page_source = "<html><body></body></html>"
+		self._doc = None
+
+	def _root(self):
+		if self._doc is None:
+			self._doc = lxml_html.fromstring(self.page_source)
+		return self._doc
+
+	def find_elements(self, by: str, value: str) -> List[FakeElement]:
+		if by == "css selector":
+			return [FakeElement(el) for el in CSSSelector(value)(self._root())]
+		if by == "tag name":
+			return [FakeElement(el) for el in self._root().iter(value)]
+		return []
+
+	def find_element(self, by: str, value: str):
+		from selenium.common.exceptions import NoSuchElementException
+
+		found = self.find_elements(by, value)
+		if not found:
+			raise NoSuchElementException(value)
+		return found[0]
+
+	def execute_script(self, script: str, *args):
+		if "scrollHeight" in script and script.strip().startswith("return"):
+			return 4000
+		if script.strip() == "return 1":
+			return 1
+		return None
+
+	def execute_cdp_cmd(self, cmd: str, params: dict):
+		return {}
+
+	def delete_all_cookies(self) -> None:
+		pass
+
+	def implicitly_wait(self, seconds: float) -> None:
+		pass
+
+	def quit(self) -> None:
+		pass
+
+
+def fake_driver_pool(size: int = 4, pages: int = 10, latency: float = 0.0):
+	"""A real DriverPool whose sessions are FakeWebDrivers."""
+	from app.services.driver_pool import DriverPool, DriverProfile, PooledDriver
+
+	class FakeDriverPool(DriverPool):
+		def _create(self) -> PooledDriver:
+			return PooledDriver(FakeWebDriver(pages=pages, latency=latency))
+
+	return FakeDriverPool(DriverProfile(headless=True), size=size, max_page_loads=10_000, lease_timeout=30)
+
+
+class FixtureServer:
+	"""Serves the guest search and posting endpoints from fixtures on 127.0.0.1.
+
+	Responses carry an ETag and answer a matching If-None-Match with 304. The first
+	``throttle_first`` requests get a 429 with ``Retry-After: retry_after`` and the
+	next ``auth_wall_first`` are redirected to a login page. Requested paths (with
+	their query) are kept in ``requests``.
+	"""
+
+	def __init__(
+		self,
+		pages: int = 10,
+		latency: float = 0.0,
+		throttle_first: int = 0,
+		retry_after: float = 1.0,
+		auth_wall_first: int = 0,
+	):
+		from app.services.fetchers import GUEST_SEARCH_PATH
+
+		search_path = GUEST_SEARCH_PATH
+		posting_prefix = "/jobs-guest/jobs/api/jobPosting/"
+		self.requests: List[str] = []
+		lock = threading.Lock()
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def setup(self):
+				super().setup()
+				# Headers and body go out in separate writes; don't let Nagle hold the body back
+				self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+			def _reply(self, status: int, data: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+				self.send_response(status)
+				for name, value in (headers or {}).items():
+					self.send_header(name, value)
+				self.send_header("Content-Length", str(len(data)))
+				self.end_headers()
+				self.wfile.write(data)
+
+			def do_GET(self):
+				if latency:
+					threading.Event().wait(latency)
+				parsed = urlparse(self.path)
+				if parsed.path == "/authwall":
+					self._reply(200, b"<html><body><h1>Sign in</h1></body></html>", {"Content-Type": "text/html"})
+					return
+				with lock:
+					server.requests.append(self.path)
+					seen = len(server.requests)
+				if seen <= throttle_first:
+					self._reply(429, headers={"Retry-After": f"{retry_after:g}"})
+					return
+				if seen <= throttle_first + auth_wall_first:
+					self._reply(302, headers={"Location": "/authwall?trk=guest_job_search"})
+					return
+				if parsed.path == search_path:
+					start = int((parse_qs(parsed.query).get("start") or ["0"])[0])
+					body = search_cards(start, pages)
+				elif parsed.path.startswith(posting_prefix):
+					body = detail_document(parsed.path[len(posting_prefix):])
+				else:
+					self.send_error(404)
+					return
+				data = body.encode("utf-8")
+				etag = '"%s"' % hashlib.blake2b(data, digest_size=8).hexdigest()
+				if self.headers.get("If-None-Match") == etag:
+					self._reply(304, headers={"ETag": etag})
+					return
+				self._reply(200, data, {"Content-Type": "text/html; charset=utf-8", "ETag": etag})
+
+			def log_message(self, *args):
+				pass
+
+		self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self.httpd.daemon_threads = True
+		self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+		self._thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+
+	def __enter__(self) -> "FixtureServer":
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.httpd.shutdown()
+		self.httpd.server_close()
+
+
+# Entities Telegram's HTML parse mode accepts; anything else after "&" is rejected
+_TELEGRAM_ENTITY_RE = re.compile(r"&(?!(?:lt|gt|amp|quot|#\d+|#x[0-9a-fA-F]+);)")
+
+
+class FakeTelegramServer:
+	"""Local Bot API ``sendMessage`` endpoint with Telegram's flood control on 127.0.0.1.
+
+	A chat sending again within ``chat_interval`` seconds of its last accepted message
+	gets a 429 with ``retry_after``, and the first ``throttle_first`` requests are
+	throttled regardless. ``fail_first`` requests get a 500 instead. Texts that are too
+	long or carry a broken HTML entity get a 400 like the real API. Accepted messages
+	are kept in ``sent`` as (monotonic time, chat id, text).
+	"""
+
+	def __init__(
+		self,
+		chat_interval: float = 0.0,
+		retry_after: float = 1.0,
+		throttle_first: int = 0,
+		fail_first: int = 0,
+		latency: float = 0.0,
+	):
+		self.sent: List[Tuple[float, str, str]] = []
+		self.throttled = 0
+		self.failed = 0
+		self.rejected = 0
+		lock = threading.Lock()
+		last: Dict[str, float] = {}
+		requests = [0]
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def setup(self):
+				super().setup()
+				self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+			def _reply(self, status: int, payload: dict) -> None:
+				data = json.dumps(payload).encode("utf-8")
+				self.send_response(status)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(data)))
+				self.end_headers()
+				self.wfile.write(data)
+
+			def do_POST(self):
+				body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+				if not self.path.endswith("/sendMessage"):
+					self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+					return
+				if latency:
+					threading.Event().wait(latency)
+				message = json.loads(body or b"{}")
+				chat_id, text = str(message.get("chat_id")), message.get("text") or ""
+				if len(text) > 4096 or _TELEGRAM_ENTITY_RE.search(text) or text.count("<b>") != text.count("</b>"):
+					with lock:
+						server.rejected += 1
+					self._reply(400, {"ok": False, "error_code": 400, "description": "Bad Request: can't parse entities"})
+					return
+				with lock:
+					requests[0] += 1
+					now = time.monotonic()
+					if requests[0] <= fail_first:
+						server.failed += 1
+						status = 500
+					elif requests[0] <= fail_first + throttle_first or now - last.get(chat_id, -1e9) < chat_interval:
+						server.throttled += 1
+						status = 429
+					else:
+						last[chat_id] = now
+						server.sent.append((now, chat_id, text))
+						status = 200
+				if status == 500:
+					self._reply(500, {"ok": False, "error_code": 500, "description": "Internal Server Error"})
+				elif status == 429:
+					self._reply(429, {
+						"ok": False,
+						"error_code": 429,
+						"description": f"Too Many Requests: retry after {retry_after}",
+						"parameters": {"retry_after": retry_after},
+					})
+				else:
+					self._reply(200, {"ok": True, "result": {"message_id": len(server.sent), "text": text}})
+
+			def log_message(self, *args):
+				pass
+
+		self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self.httpd.daemon_threads = True
+		self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+		self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-telegram", daemon=True)
+
+	def __enter__(self) -> "FakeTelegramServer":
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.httpd.shutdown()
+		self.httpd.server_close()
@@ -0,0 +1,449 @@
+"""Offline benchmark suite: scraper pipeline on fixtures, crud at scale, API under load.
+
+Nothing here talks to LinkedIn. Selenium paths run against a fake WebDriver,
+the HTTP backend against a local fixture server, and politeness pacing and
+scroll waits are off.
+Run from backend/:
+
+    python bench/run.py --output bench.json
+    python bench/run.py --suite crud --sizes 10000,100000,1000000
+    python bench/run.py --suite api --concurrency 16 --requests 2000
+    python bench/run.py --baseline bench-main.json
+
+Results are JSON; with ``--baseline`` each benchmark also reports the change in
+its mean against the same benchmark in the earlier report.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Settings are read at import time; point the app at a scratch database before importing it
+_WORKDIR = tempfile.mkdtemp(prefix="jobs-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_WORKDIR, 'api.db')}")
+os.environ.setdefault("APP_ROLE", "api-only")
+os.environ["EMAIL_ENABLED"] = "false"
+os.environ["TELEGRAM_ENABLED"] = "false"
+os.environ["POLITENESS_ENABLED"] = "false"
+os.environ["PAGE_CACHE_DIR"] = os.path.join(_WORKDIR, "pages")
+
+from bench.fakes import CARDS_PER_PAGE, FakeTelegramServer, FixtureServer, fake_driver_pool  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _stats(name: str, samples: List[float], items: int = 1, **extra: Any) -> Dict[str, Any]:
+	ordered = sorted(samples)
+	mean = statistics.fmean(ordered)
+	return {
+		"name": name,
+		"runs": len(ordered),
+		"items_per_run": items,
+		"mean_s": mean,
+		"p50_s": ordered[len(ordered) // 2],
+		"p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+		"min_s": ordered[0],
+		"items_per_s": items / mean if mean > 0 else None,
+		**extra,
+	}
+
+
+def bench(name: str, fn: Callable[[], Any], repeat: int, items: int = 1, warmup: int = 1, **extra: Any) -> Dict[str, Any]:
+	for _ in range(warmup):
+		fn()
+	samples = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		samples.append(time.perf_counter() - start)
+	result = _stats(name, samples, items, **extra)
+	print(f"  {name:<55} {result['mean_s'] * 1000:10.3f} ms", file=sys.stderr)
+	return result
+
+
+# Scraper pipeline
+
+def scraper_suite(args) -> List[Dict[str, Any]]:
+	from app.services import linkedin_scraper_advanced as adv
+	from app.services.fetchers import HttpFetcher, get_http_client
+	from app.services.page_cache import PageCache
+
+	results = []
+	pages = args.pages
+	pool = fake_driver_pool(size=max(args.workers, 1), pages=pages, latency=args.page_latency)
+	adv.get_driver_pool = lambda **kwargs: pool
+
+	def config(**kw) -> adv.ScrapeConfig:
+		# The page cache is measured separately below
+		kw.setdefault("use_page_cache", False)
+		return adv.ScrapeConfig(max_pages=pages, scroll_timeout=0, **kw)
+
+	scraper = adv.LinkedInJobScraper(config(backend="selenium"))
+	try:
+		scraper.driver.get("https://www.linkedin.com/jobs/search/?keywords=python&location=Remote")
+		results.append(bench("selenium._collect_cards_on_page", scraper._collect_cards_on_page, args.repeat * 10, CARDS_PER_PAGE))
+		job_url = "https://www.linkedin.com/jobs/view/senior-software-engineer-at-acme-3900000001"
+		results.append(bench("selenium._extract_details", lambda: scraper._extract_details(job_url), args.repeat * 10))
+		listings = scraper.search_and_collect("python", "Remote")
+		results.append(bench(
+			"selenium.search_and_collect", lambda: scraper.search_and_collect("python", "Remote"), args.repeat, len(listings), pages=pages
+		))
+		results.append(bench("selenium.enrich_details[workers=1]", lambda: scraper.enrich_details(listings), args.repeat, len(listings)))
+	finally:
+		scraper.close()
+	if args.workers > 1:
+		scraper = adv.LinkedInJobScraper(config(backend="selenium", enrich_workers=args.workers))
+		try:
+			results.append(bench(
+				f"selenium.enrich_details[workers={args.workers}]", lambda: scraper.enrich_details(listings), args.repeat, len(listings)
+			))
+		finally:
+			scraper.close()
+	pool.close()
+
+	with FixtureServer(pages=pages, latency=args.page_latency) as server:
+		client = get_http_client(server.base_url)
+		scraper = adv.LinkedInJobScraper(config(backend="http", enrich_workers=max(args.workers, 1)))
+		scraper.fetcher = HttpFetcher(client=client)
+		try:
+			listings = scraper.search_and_collect("python", "Remote")
+			results.append(bench(
+				"http.search_and_collect", lambda: scraper.search_and_collect("python", "Remote"), args.repeat, len(listings), pages=pages
+			))
+			results.append(bench(
+				f"http.enrich_details[workers={max(args.workers, 1)}]", lambda: scraper.enrich_details(listings), args.repeat, len(listings)
+			))
+			# Fresh entries skip the fetch; with a zero TTL every entry is revalidated (304)
+			for label, ttl in (("hit", 3600.0), ("revalidate", 0.0)):
+				scraper.cache = PageCache(os.path.join(_WORKDIR, f"pages-{label}"), 1 << 30, ttl)
+				results.append(bench(
+					f"http.enrich_details[page_cache={label}]", lambda: scraper.enrich_details(listings), args.repeat, len(listings)
+				))
+		finally:
+			scraper.close()
+	return results
+
+
+# crud at scale
+
+def _seed(engine, rows: int, chunk: int = 20_000) -> float:
+	from sqlalchemy import insert
+
+	from app import models
+
+	companies = [f"Company {i}" for i in range(500)]
+	locations = [f"City {i}, Country {i % 40}" for i in range(300)]
+	titles = ["Software Engineer", "Data Scientist", "Product Manager", "Backend Developer", "SRE", "Frontend Engineer"]
+	now = datetime.utcnow()
+	start = time.perf_counter()
+	with engine.begin() as conn:
+		for offset in range(0, rows, chunk):
+			conn.execute(insert(models.Job), [
+				{
+					"title": f"{titles[i % len(titles)]} {i % 97}",
+					"company": companies[i % len(companies)],
+					"location": locations[i % len(locations)],
+					"job_link": f"https://www.linkedin.com/jobs/view/{4000000000 + i}/",
+					"dedup_key": 4000000000 + i,
+					"keywords": titles[i % len(titles)],
+					"created_at": now,
+				}
+				for i in range(offset, min(offset + chunk, rows))
+			])
+	return time.perf_counter() - start
+
+
+def crud_suite(args) -> List[Dict[str, Any]]:
+	from sqlalchemy import create_engine
+	from sqlalchemy.orm import sessionmaker
+
+	from app import crud, fulltext
+	from app.database import Base
+	from app.schemas import JobCreate, JobFilter
+
+	results = []
+	for size in args.sizes:
+		path = os.path.join(_WORKDIR, f"crud-{size}.db")
+		engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+		Base.metadata.create_all(bind=engine)
+		fulltext.install(engine)
+		print(f"seeding {size} rows", file=sys.stderr)
+		seeded = _seed(engine, size)
+		Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+		db = Session()
+		counter = iter(range(10**9))
+
+		def new_job() -> JobCreate:
+			n = next(counter)
+			return JobCreate(title=f"Bench Engineer {n}", company="Bench Co", job_link=f"https://bench.example/jobs/{size}/{n}")
+
+		existing = JobCreate(title="x", job_link="https://www.linkedin.com/jobs/view/4000000000")
+		tag = {"rows": size}
+		results.append({"name": "crud.seed", "rows": size, "seconds": seeded})
+		results.append(bench("crud.create_job_if_not_exists[new]", lambda: crud.create_job_if_not_exists(db, new_job()), args.repeat * 5, **tag))
+		results.append(bench("crud.create_job_if_not_exists[existing]", lambda: crud.create_job_if_not_exists(db, existing), args.repeat * 5, **tag))
+		results.append(bench(
+			"crud.bulk_create_jobs[500 new]", lambda: crud.bulk_create_jobs(db, [new_job() for _ in range(500)], alert_channels=()),
+			args.repeat, 500, **tag,
+		))
+		queries = {
+			"newest": JobFilter(),
+			"keyword": JobFilter(keyword="engineer"),
+			"company": JobFilter(company="Company 7"),
+			"title_sort": JobFilter(order_by="title"),
+			"deep_offset": JobFilter(offset=min(size // 2, 50_000)),
+		}
+		for label, filters in queries.items():
+			results.append(bench(f"crud.list_jobs[{label}]", lambda f=filters: crud.list_jobs(db, f), args.repeat, **tag))
+		_, cursor = crud.list_jobs_page(db, JobFilter(limit=50))
+		results.append(bench(
+			"crud.list_jobs_page[cursor]", lambda: crud.list_jobs_page(db, JobFilter(limit=50, cursor=cursor)), args.repeat, **tag
+		))
+		db.close()
+		engine.dispose()
+		if not args.keep:
+			os.remove(path)
+	return results
+
+
+# API under load
+
+def _serve(env: Dict[str, str]):
+	"""Run the API under uvicorn in its own process so the load generator doesn't share its GIL."""
+	import httpx
+
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		port = sock.getsockname()[1]
+	proc = subprocess.Popen(
+		[sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+		cwd=BACKEND_DIR,
+		env=env,
+	)
+	base_url = f"http://127.0.0.1:{port}"
+	deadline = time.monotonic() + 60
+	while time.monotonic() < deadline:
+		try:
+			if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+				return proc, base_url
+		except httpx.HTTPError:
+			pass
+		if proc.poll() is not None:
+			break
+		time.sleep(0.1)
+	proc.kill()
+	raise RuntimeError("API server did not start")
+
+
+def _load(
+	client, path: str, total: int, concurrency: int, headers: Dict[str, str] | None = None, variant: str = ""
+) -> Dict[str, Any]:
+	latencies: List[float] = []
+	errors = 0
+	lock = threading.Lock()
+
+	def one(_):
+		nonlocal errors
+		start = time.perf_counter()
+		resp = client.get(path, headers=headers)
+		elapsed = time.perf_counter() - start
+		with lock:
+			latencies.append(elapsed)
+			if resp.status_code >= 400:
+				errors += 1
+
+	start = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=concurrency) as executor:
+		list(executor.map(one, range(total)))
+	wall = time.perf_counter() - start
+	ordered = sorted(latencies)
+	result = {
+		"name": f"api GET {path}{variant}",
+		"requests": total,
+		"concurrency": concurrency,
+		"errors": errors,
+		"requests_per_s": total / wall,
+		"p50_s": ordered[len(ordered) // 2],
+		"p95_s": ordered[int(len(ordered) * 0.95)],
+		"p99_s": ordered[int(len(ordered) * 0.99)],
+		"mean_s": statistics.fmean(ordered),
+	}
+	print(f"  {result['name']:<55} {result['requests_per_s']:10.1f} req/s  p95 {result['p95_s'] * 1000:.1f} ms", file=sys.stderr)
+	return result
+
+
+def api_suite(args) -> List[Dict[str, Any]]:
+	import httpx
+
+	from app import fulltext
+	from app.database import engine, init_db
+
+	init_db()
+	fulltext.install(engine)
+	print(f"seeding {args.api_rows} rows for the API", file=sys.stderr)
+	_seed(engine, args.api_rows)
+	engine.dispose()
+
+	results: List[Dict[str, Any]] = []
+	# Uncached first so those runs keep measuring the queries themselves
+	for cached in (False, True):
+		proc, base_url = _serve({**os.environ, "RESPONSE_CACHE_ENABLED": str(cached).lower()})
+		try:
+			limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+			with httpx.Client(base_url=base_url, limits=limits, timeout=30) as client:
+				cursor = client.get("/api/jobs?limit=50").json()["next_cursor"]
+				paths = [
+					"/api/jobs",
+					"/api/jobs?keyword=engineer",
+					"/api/jobs?company=Company%207",
+					f"/api/jobs?cursor={cursor}",
+					"/api/suggest/keywords?q=so",
+					"/api/suggest/companies?q=company%201",
+					"/api/suggest/locations?q=city",
+				]
+				etags = {path: client.get(path).headers.get("etag") for path in paths}
+				if not cached:
+					results.extend(_load(client, path, args.requests, args.concurrency) for path in paths)
+					continue
+				results.extend(_load(client, path, args.requests, args.concurrency, variant=" [cached]") for path in paths)
+				results.extend(
+					_load(client, path, args.requests, args.concurrency, {"If-None-Match": etags[path]}, " [304]")
+					for path in paths
+				)
+		finally:
+			proc.terminate()
+			proc.wait(10)
+	return results
+
+
+# Telegram delivery
+TELEGRAM_CHAT_RATE = 50.0
+
+
+def _telegram_run(server_kwargs: Dict[str, Any], chats: int, per_chat: int) -> Tuple[float, int]:
+	"""Seconds to deliver ``per_chat`` messages to each of ``chats`` chats, and the 429s served."""
+	from app.services.telegram import TelegramSender
+
+	texts = [f"New Job: <b>Engineer {i}</b> at Company &amp; Co\nRemote\nhttps://www.linkedin.com/jobs/view/{i}/" for i in range(per_chat)]
+	with FakeTelegramServer(**server_kwargs) as server:
+		sender = TelegramSender("BENCH", server.base_url, TELEGRAM_CHAT_RATE, 1000.0, max_retries=5)
+		try:
+			start = time.perf_counter()
+			with ThreadPoolExecutor(max_workers=chats) as executor:
+				results = list(executor.map(lambda chat: sender.send_many(str(chat), texts, timeout=120), range(chats)))
+			elapsed = time.perf_counter() - start
+		finally:
+			sender.close()
+	if not all(ok for sent in results for ok, _ in sent) or len(server.sent) != chats * per_chat:
+		raise RuntimeError("fake Telegram server did not receive every message")
+	return elapsed, server.throttled
+
+
+def telegram_suite(args) -> List[Dict[str, Any]]:
+	"""TelegramSender against a local Bot API that enforces a per-chat flood limit."""
+	chats, per_chat = args.telegram_chats, args.telegram_messages
+	# The server allows twice the sender's chat rate: requests granted 1/rate apart can
+	# arrive closer together over concurrent connections, but pacing alone avoids 429s
+	paced = {"chat_interval": 0.5 / TELEGRAM_CHAT_RATE, "latency": args.page_latency}
+	cases = [
+		("telegram.send_many[paced]", paced),
+		# Every chat's first attempt is throttled and has to wait out retry_after
+		("telegram.send_many[retry_after=0.5]", {**paced, "throttle_first": chats, "retry_after": 0.5}),
+	]
+	results = []
+	for name, server_kwargs in cases:
+		samples, throttled = [], 0
+		for _ in range(args.repeat):
+			elapsed, throttled = _telegram_run(server_kwargs, chats, per_chat)
+			samples.append(elapsed)
+		result = _stats(name, samples, chats * per_chat, chats=chats, throttled_per_run=throttled)
+		print(f"  {name:<55} {result['items_per_s']:10.1f} msg/s  ({throttled} x 429)", file=sys.stderr)
+		results.append(result)
+	return results
+
+
+SUITES = {"scraper": scraper_suite, "crud": crud_suite, "api": api_suite, "telegram": telegram_suite}
+
+
+def _git_commit() -> Optional[str]:
+	try:
+		return subprocess.run(
+			["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+		).stdout.strip()
+	except Exception:
+		return None
+
+
+def _compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+	def key(r):
+		return (r["name"], r.get("rows"), r.get("concurrency"))
+
+	before = {key(r): r for suite in baseline.get("suites", {}).values() for r in suite}
+	for suite in report["suites"].values():
+		for r in suite:
+			old = before.get(key(r))
+			if old and old.get("mean_s") and r.get("mean_s") is not None:
+				r["baseline_mean_s"] = old["mean_s"]
+				r["change"] = round((r["mean_s"] - old["mean_s"]) / old["mean_s"], 4)
+
+
+def main(argv: List[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="repeatable; default runs all")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--pages", type=int, default=4, help="search result pages per scrape")
+	parser.add_argument("--workers", type=int, default=4, help="enrichment workers for the parallel runs")
+	parser.add_argument("--page-latency", type=float, default=0.0, help="simulated seconds per page load")
+	parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated table sizes for the crud suite")
+	parser.add_argument("--keep", action="store_true", help="keep the seeded crud databases")
+	parser.add_argument("--api-rows", type=int, default=10_000)
+	parser.add_argument("--requests", type=int, default=500, help="requests per API endpoint")
+	parser.add_argument("--concurrency", type=int, default=8)
+	parser.add_argument("--telegram-chats", type=int, default=5)
+	parser.add_argument("--telegram-messages", type=int, default=20, help="messages per chat")
+	parser.add_argument("--output", help="write the JSON report here")
+	parser.add_argument("--baseline", help="earlier JSON report to compare against")
+	args = parser.parse_args(argv)
+	args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+	report: Dict[str, Any] = {
+		"commit": _git_commit(),
+		"created_at": datetime.utcnow().isoformat() + "Z",
+		"python": sys.version.split()[0],
+		"platform": platform.platform(),
+		"params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "suite")},
+		"suites": {},
+	}
+	for name in args.suite or list(SUITES):
+		print(f"[{name}]", file=sys.stderr)
+		report["suites"][name] = SUITES[name](args)
+	if args.baseline:
+		with open(args.baseline, encoding="utf-8") as f:
+			_compare(report, json.load(f))
+
+	text = json.dumps(report, indent=2, default=str)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			f.write(text + "\n")
+	else:
+		print(text)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,139 @@
+"""Startup-time benchmark for the API process.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the total import time, the slowest modules and whether any of the
+scraping stack was pulled in. Also times the lifespan startup with a given
+APP_ROLE. Run from backend/:
+
+    python bench/startup.py --runs 5 --output startup.json
+    python bench/startup.py --baseline startup.json --tolerance 0.2
+
+Exits non-zero when a forbidden module is imported or the median import time
+regresses past the baseline by more than ``--tolerance``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Never needed to serve API requests
+FORBIDDEN = ["selenium", "webdriver_manager", "fake_useragent", "pandas", "pyarrow", "apscheduler"]
+
+LIFESPAN_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+t1 = time.perf_counter()
+with TestClient(app):
+	t2 = time.perf_counter()
+print(f"{t1 - t0:.6f} {t2 - t1:.6f}")
+"""
+
+
+def _parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+	"""module -> (self us, cumulative us) from ``-X importtime`` output."""
+	modules: Dict[str, Tuple[int, int]] = {}
+	for line in stderr.splitlines():
+		if not line.startswith("import time:") or "self [us]" in line:
+			continue
+		try:
+			self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+			modules[name.strip()] = (int(self_us), int(cumulative))
+		except ValueError:
+			continue
+	return modules
+
+
+def measure_imports(runs: int, env: Dict[str, str]) -> Tuple[List[int], Dict[str, Tuple[int, int]]]:
+	totals: List[int] = []
+	modules: Dict[str, Tuple[int, int]] = {}
+	for _ in range(runs):
+		proc = subprocess.run(
+			[sys.executable, "-X", "importtime", "-c", "import app.main"],
+			cwd=BACKEND_DIR,
+			env=env,
+			capture_output=True,
+			text=True,
+			check=True,
+		)
+		modules = _parse_importtime(proc.stderr)
+		totals.append(modules.get("app.main", (0, 0))[1])
+	return totals, modules
+
+
+def measure_lifespan(runs: int, env: Dict[str, str]) -> List[Tuple[float, float]]:
+	samples = []
+	for _ in range(runs):
+		proc = subprocess.run(
+			[sys.executable, "-c", LIFESPAN_SNIPPET],
+			cwd=BACKEND_DIR,
+			env=env,
+			capture_output=True,
+			text=True,
+			check=True,
+		)
+		imported, started = proc.stdout.split()[-2:]
+		samples.append((float(imported), float(started)))
+	return samples
+
+
+def main(argv: List[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--runs", type=int, default=5)
+	parser.add_argument("--top", type=int, default=15, help="slowest modules to report")
+	parser.add_argument("--role", default="api-only", help="APP_ROLE for the lifespan measurement")
+	parser.add_argument("--database-url", default="sqlite:///./bench-startup.db")
+	parser.add_argument("--output", help="write the JSON report here")
+	parser.add_argument("--baseline", help="previous JSON report to compare against")
+	parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression of the median, as a fraction")
+	args = parser.parse_args(argv)
+
+	env = {**os.environ, "APP_ROLE": args.role, "DATABASE_URL": args.database_url, "PYTHONDONTWRITEBYTECODE": "1"}
+	totals, modules = measure_imports(max(args.runs, 1), env)
+	lifespan = measure_lifespan(max(args.runs, 1), env)
+	top = sorted(modules.items(), key=lambda kv: kv[1][0], reverse=True)[: args.top]
+	forbidden = sorted(
+		name for name in modules if name.split(".")[0] in FORBIDDEN
+	)
+	report = {
+		"python": sys.version.split()[0],
+		"runs": len(totals),
+		"import_us": {"median": int(statistics.median(totals)), "min": min(totals), "max": max(totals)},
+		"lifespan_role": args.role,
+		"lifespan_startup_s": round(statistics.median(s for _, s in lifespan), 4),
+		"modules": len(modules),
+		"slowest_self_us": [{"module": name, "self_us": s, "cumulative_us": c} for name, (s, c) in top],
+		"forbidden_imported": sorted({name.split(".")[0] for name in forbidden}),
+	}
+
+	status = 0
+	if report["forbidden_imported"]:
+		status = 1
+	if args.baseline:
+		with open(args.baseline, encoding="utf-8") as f:
+			baseline = json.load(f)
+		before = baseline["import_us"]["median"]
+		after = report["import_us"]["median"]
+		report["baseline_median_us"] = before
+		report["change"] = round((after - before) / before, 4) if before else None
+		if before and after > before * (1 + args.tolerance):
+			status = 1
+
+	text = json.dumps(report, indent=2)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			f.write(text + "\n")
+	print(text)
+	return status
+
+
+if __name__ == "__main__":
+	sys.exit(main())
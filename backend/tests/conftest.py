@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point the app at a scratch database first
+_tmp = tempfile.mkdtemp(prefix="job-scraper-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ.setdefault("PAGE_CACHE_DIR", os.path.join(_tmp, "pages"))
+
+import pytest  # noqa: E402
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+	init_db()
+
+
+@pytest.fixture
+def db():
+	session = SessionLocal()
+	try:
+		yield session
+	finally:
+		session.close()
+
+
+@pytest.fixture
+def ingest_cleanup(db):
+	"""Deletes the jobs a test creates, and the rows that refer to them, afterwards."""
+	last = db.execute(select(func.max(models.Job.id))).scalar() or 0
+	yield
+	db.rollback()
+	with engine.begin() as conn:
+		for table in (models.JobDetail, models.JobLshBucket, models.AlertLog, models.AlertOutbox):
+			conn.execute(delete(table).where(table.job_id > last))
+		conn.execute(delete(models.Job).where(models.Job.id > last))
@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_malformed_date_is_rejected_before_streaming():
+	response = client.get("/api/jobs/export", params={"format": "ndjson", "date_from": "2026-13-45"})
+	assert response.status_code == 422
+	assert response.json()["error"]["detail"][0]["loc"] == ["query", "date_from"]
+
+
+def test_valid_dates_stream():
+	response = client.get("/api/jobs/export", params={"format": "ndjson", "date_from": "2026-01-01", "date_to": "2026-01-31"})
+	assert response.status_code == 200
+	assert response.headers["content-type"].startswith("application/x-ndjson")
@@ -0,0 +1,103 @@
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import politeness
+from app.services.fetchers import BACKEND_HTTP, HttpFetcher, classify_response, resolve_backend
+from app.services.parsers import parse_job_cards, parse_job_details
+from bench.fakes import CARDS_PER_PAGE, FixtureServer
+
+JOB_URL = "https://www.linkedin.com/jobs/view/3900000001/?refId=abc"
+
+
+@pytest.fixture
+def fetcher_for():
+	clients = []
+
+	def make(server, cooldown=0.3):
+		# Fast enough that only back-off pauses show up in timings
+		controller = politeness.RateController(
+			global_rate=1000, global_burst=1000, initial_rate=1000, min_rate=1, max_rate=1000, cooldown=cooldown
+		)
+		client = httpx.Client(base_url=server.base_url, follow_redirects=True, timeout=5)
+		clients.append(client)
+		return HttpFetcher(client=client, controller=controller)
+
+	yield make
+	for client in clients:
+		client.close()
+
+
+def test_search_pages(fetcher_for):
+	with FixtureServer(pages=2) as server:
+		fetcher = fetcher_for(server)
+		first = parse_job_cards(fetcher.search_page("python developer", "Remote"))
+		second = parse_job_cards(fetcher.search_page("python developer", "Remote", start=CARDS_PER_PAGE))
+		past_end = fetcher.search_page("python developer", "Remote", start=2 * CARDS_PER_PAGE)
+	assert len(first) == len(second) == CARDS_PER_PAGE
+	assert not {c["job_link"] for c in first} & {c["job_link"] for c in second}
+	assert past_end == ""
+	assert "keywords=python+developer" in server.requests[0] and "start=25" in server.requests[1]
+
+
+def test_detail_page_revalidation(fetcher_for):
+	with FixtureServer() as server:
+		fetcher = fetcher_for(server)
+		page = fetcher.fetch_detail_page(JOB_URL)
+		revalidated = fetcher.fetch_detail_page(JOB_URL, etag=page.etag)
+		changed = fetcher.fetch_detail_page(JOB_URL, etag='"stale"')
+	assert not page.not_modified and page.etag
+	assert parse_job_details(page.html)["employment_type"] == "Full-time"
+	assert revalidated.not_modified and revalidated.html is None and revalidated.etag == page.etag
+	assert not changed.not_modified and changed.html == page.html
+	assert server.requests[0] == "/jobs-guest/jobs/api/jobPosting/3900000001"
+
+
+def test_429_backs_off_for_retry_after(fetcher_for):
+	with FixtureServer(throttle_first=1, retry_after=0.4) as server:
+		fetcher = fetcher_for(server)
+		assert fetcher.search_page("go", "Berlin") is None
+		[rate] = fetcher.controller.rates().values()
+		assert rate < 1000
+		start = time.monotonic()
+		html = fetcher.search_page("go", "Berlin")
+		waited = time.monotonic() - start
+	assert len(parse_job_cards(html)) == CARDS_PER_PAGE
+	assert waited >= 0.3
+
+
+def test_auth_wall_is_blocked(fetcher_for):
+	with FixtureServer(auth_wall_first=1) as server:
+		fetcher = fetcher_for(server, cooldown=0.4)
+		assert fetcher.fetch_detail_page(JOB_URL) is None
+		start = time.monotonic()
+		page = fetcher.fetch_detail_page(JOB_URL)
+		waited = time.monotonic() - start
+	assert page is not None and page.html
+	assert waited >= 0.3
+
+
+@pytest.mark.parametrize(
+	"status, url, headers, expected",
+	[
+		(200, "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/1", {}, (politeness.OK, None)),
+		(429, "https://www.linkedin.com/jobs-guest/", {"Retry-After": "7"}, (politeness.THROTTLED, 7.0)),
+		(999, "https://www.linkedin.com/jobs-guest/", {}, (politeness.BLOCKED, None)),
+		(200, "https://www.linkedin.com/authwall?trk=x", {}, (politeness.BLOCKED, None)),
+		(503, "https://www.linkedin.com/jobs-guest/", {"Retry-After": "soon"}, (politeness.THROTTLED, None)),
+		(500, "https://www.linkedin.com/jobs-guest/", {}, (politeness.ERROR, None)),
+	],
+)
+def test_classify_response(status, url, headers, expected):
+	response = httpx.Response(status, headers=headers, request=httpx.Request("GET", url))
+	assert classify_response(response) == expected
+
+
+def test_resolve_backend(monkeypatch):
+	assert resolve_backend("HTTP") == BACKEND_HTTP
+	monkeypatch.setattr(settings, "scrape_backend", "http")
+	assert resolve_backend(None) == BACKEND_HTTP
+	with pytest.raises(ValueError, match="Unknown scrape backend: phantomjs"):
+		resolve_backend("phantomjs")
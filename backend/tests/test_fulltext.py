@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import create_engine, delete, select, update
+from sqlalchemy.orm import Session
+
+from app import crud, fulltext, models
+from app.database import Base, engine
+from app.schemas import JobCreate
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _index():
+	assert fulltext.install(engine)
+
+
+@pytest.fixture(autouse=True)
+def _cleanup(ingest_cleanup):
+	yield
+
+
+def _search(db, query):
+	fts = fulltext.match_subquery(db, query)
+	return db.execute(select(fts.c.job_id).order_by(fts.c.rank)).scalars().all()
+
+
+def _ingest(db, *jobs):
+	return crud.bulk_create_jobs(
+		db,
+		[
+			JobCreate(title=title, company=company, job_link=f"https://www.linkedin.com/jobs/view/{3970000000 + i}/")
+			for i, (title, company) in enumerate(jobs)
+		],
+		alert_channels=[],
+	)
+
+
+def test_tokens_match_as_prefixes_and_title_ranks_first(db):
+	kotlin_title, kotlin_company, other = _ingest(
+		db, ("Kotlinesque Developer", "Acme"), ("Backend Developer", "Kotlinesque Labs"), ("Gardener", "Acme")
+	)
+	assert _search(db, "kotlin") == [kotlin_title.id, kotlin_company.id]
+	assert _search(db, "kotlinesque dev") == [kotlin_title.id, kotlin_company.id]
+	assert _search(db, "kotlinesque gardener") == []
+	assert fulltext.match_subquery(db, "!!!") is None
+
+
+def test_index_follows_updates_and_deletes(db):
+	job, = _ingest(db, ("Zephyrine Engineer", "Acme"))
+	db.execute(update(models.Job).where(models.Job.id == job.id).values(title="Quasarine Engineer"))
+	db.commit()
+	assert _search(db, "zephyrine") == []
+	assert _search(db, "quasarine") == [job.id]
+
+	db.execute(delete(models.Job).where(models.Job.id == job.id))
+	db.commit()
+	assert _search(db, "quasarine") == []
+
+
+def test_descriptions_are_searchable(db):
+	job, = _ingest(db, ("Engineer", "Acme"))
+	fulltext.index_descriptions(db, {job.id: "Maintain our xylograph rendering pipeline"})
+	db.commit()
+	assert _search(db, "xylograph") == [job.id]
+
+
+def test_available_picks_up_an_index_installed_by_another_process(tmp_path, monkeypatch):
+	other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+	Base.metadata.create_all(other)
+	monkeypatch.setattr(fulltext, "_installed", set())
+	monkeypatch.setattr(fulltext, "_checked", {})
+	with Session(other) as db:
+		assert not fulltext.available(db)
+		# Another worker installs the index; this process only notices after the recheck interval
+		assert fulltext.install(other)
+		fulltext._installed.clear()
+		assert not fulltext.available(db)
+		monkeypatch.setattr(fulltext, "RECHECK_SECONDS", 0.0)
+		assert fulltext.available(db)
+	other.dispose()
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import models
+from app.database import Base
+from app.identity import backfill_job_keys, canonical_job_url, job_key
+
+VARIANTS = [
+	"https://www.linkedin.com/jobs/view/3912345678/",
+	"https://www.linkedin.com/jobs/view/3912345678/?refId=abc%3D%3D&trackingId=xyz&trk=public_jobs_topcard",
+	"https://de.linkedin.com/jobs/view/senior-engineer-at-acme-3912345678?position=3&pageNum=0",
+	"https://linkedin.com/jobs/view/3912345678",
+	"https://www.linkedin.com/jobs/search/?currentJobId=3912345678&geoId=92000000",
+]
+
+
+def test_linkedin_variants_share_one_key():
+	assert {job_key(url) for url in VARIANTS} == {3912345678}
+	assert {canonical_job_url(url) for url in VARIANTS} == {"https://www.linkedin.com/jobs/view/3912345678/"}
+	assert job_key("https://www.linkedin.com/jobs/view/3912345679/") != job_key(VARIANTS[0])
+
+
+def test_other_sites_key_on_url_without_tracking_params():
+	plain = "https://careers.example.com/jobs/9?team=core"
+	tracked = "https://Careers.Example.com/jobs/9?utm_source=linkedin&team=core&utm_campaign=x#apply"
+	assert canonical_job_url(tracked) == plain
+	assert job_key(tracked) == job_key(plain) < 0
+	assert job_key("https://careers.example.com/jobs/9?team=infra") != job_key(plain)
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+	"""A database whose jobs table predates dedup keys."""
+	engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+	Base.metadata.create_all(engine)
+	with engine.begin() as conn:
+		conn.execute(text("DROP INDEX uq_jobs_dedup_key"))
+		conn.execute(text("ALTER TABLE jobs DROP COLUMN dedup_key"))
+	yield engine
+	engine.dispose()
+
+
+def test_backfill_merges_duplicates_into_oldest_row(legacy_engine):
+	created = datetime(2026, 1, 1)
+	with legacy_engine.begin() as conn:
+		for i, url in enumerate(VARIANTS[:3] + ["https://careers.example.com/jobs/9?utm_source=li"], start=1):
+			conn.execute(
+				text("INSERT INTO jobs (id, title, job_link, created_at) VALUES (:id, 'Engineer', :link, :created)"),
+				{"id": i, "link": url, "created": created + timedelta(days=i)},
+			)
+		for job_id in (2, 3):
+			conn.execute(
+				text("INSERT INTO alert_logs (job_id, channel, status, created_at) VALUES (:job, 'email', 'sent', :now)"),
+				{"job": job_id, "now": created},
+			)
+		conn.execute(
+			text(
+				"INSERT INTO alert_outbox (job_id, channel, idempotency_key, status, attempts, next_attempt_at, created_at) "
+				"VALUES (3, 'email', 'email:3', 'pending', 0, :now, :now)"
+			),
+			{"now": created},
+		)
+
+	assert backfill_job_keys(legacy_engine) == {"updated": 2, "merged": 2}
+
+	with legacy_engine.connect() as conn:
+		jobs = conn.execute(text("SELECT id, job_link, dedup_key FROM jobs ORDER BY id")).all()
+		logs = conn.execute(text("SELECT job_id FROM alert_logs")).scalars().all()
+		outbox = conn.execute(text("SELECT count(*) FROM alert_outbox")).scalar()
+	assert [tuple(row) for row in jobs] == [
+		(1, "https://www.linkedin.com/jobs/view/3912345678/", 3912345678),
+		(4, "https://careers.example.com/jobs/9", job_key("https://careers.example.com/jobs/9")),
+	]
+	assert logs == [1, 1]
+	assert outbox == 0
+
+	# The unique index init_db builds next now succeeds, and a second run has nothing to do
+	for index in models.Job.__table__.indexes:
+		index.create(bind=legacy_engine, checkfirst=True)
+	unique = {ix["name"]: ix["unique"] for ix in inspect(legacy_engine).get_indexes("jobs")}
+	assert unique["uq_jobs_dedup_key"]
+	assert backfill_job_keys(legacy_engine) == {"updated": 0, "merged": 0}
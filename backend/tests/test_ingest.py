@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from app import crud, models
+from app.database import engine
+from app.schemas import JobCreate
+
+
+@pytest.fixture(autouse=True)
+def _cleanup(ingest_cleanup):
+	yield
+
+
+def _job(job_id, link=None, title=None):
+	return JobCreate(
+		title=title or f"Engineer {job_id}",
+		company=f"Company {job_id}",
+		location="Remote",
+		job_link=link or f"https://www.linkedin.com/jobs/view/{job_id}/",
+	)
+
+
+@pytest.fixture
+def statements():
+	seen = []
+
+	def record(conn, cursor, statement, parameters, context, executemany):
+		seen.append(" ".join(statement.split()))
+
+	event.listen(engine, "before_cursor_execute", record)
+	yield seen
+	event.remove(engine, "before_cursor_execute", record)
+
+
+def _stored(db, keys):
+	return db.execute(select(func.count()).select_from(models.Job).where(models.Job.dedup_key.in_(keys))).scalar()
+
+
+def test_batch_is_deduplicated_by_posting(db):
+	created = crud.bulk_create_jobs(db, [
+		_job(3960000001, "https://www.linkedin.com/jobs/view/3960000001/?refId=a&trackingId=b"),
+		None,
+		_job(3960000001, "https://de.linkedin.com/jobs/view/engineer-at-acme-3960000001"),
+		_job(3960000002),
+		# A scraped record without a link
+		crud.job_from_record({"title": "No link"}),
+	], alert_channels=[])
+	assert [job.dedup_key for job in created] == [3960000001, 3960000002]
+	assert created[0].job_link == "https://www.linkedin.com/jobs/view/3960000001/"
+	assert _stored(db, [3960000001, 3960000002]) == 2
+
+
+def test_only_new_postings_are_returned(db):
+	crud.bulk_create_jobs(db, [_job(3960000011), _job(3960000012)], alert_channels=[])
+	created = crud.bulk_create_jobs(db, [
+		_job(3960000011, "https://www.linkedin.com/jobs/view/3960000011/?trk=public_jobs", title="Changed title"),
+		_job(3960000013),
+	], alert_channels=[])
+	assert [job.dedup_key for job in created] == [3960000013]
+	db.expire_all()
+	[kept] = db.execute(select(models.Job).where(models.Job.dedup_key == 3960000011)).scalars().all()
+	assert kept.title == "Engineer 3960000011"
+	assert crud.bulk_create_jobs(db, [_job(3960000012)], alert_channels=[]) == []
+
+
+def test_chunks_share_one_commit(db, statements, monkeypatch):
+	commits = []
+	monkeypatch.setattr(db, "commit", lambda real=db.commit: (commits.append(1), real())[1])
+	crud.bulk_create_jobs(db, [_job(3960000020)], alert_channels=[])
+	statements.clear()
+	commits.clear()
+
+	jobs = [_job(3960000020 + i) for i in range(8)]
+	created = crud.bulk_create_jobs(db, jobs, chunk_size=3, alert_channels=[])
+
+	assert [job.dedup_key for job in created] == [3960000020 + i for i in range(1, 8)]
+	assert _stored(db, [job.dedup_key for job in created]) == 7
+	lookups = [s for s in statements if s.startswith("SELECT jobs.dedup_key FROM jobs WHERE jobs.dedup_key IN")]
+	inserts = [s for s in statements if s.startswith("INSERT INTO jobs ")]
+	assert len(lookups) == len(inserts) == 3
+	assert len(commits) == 1
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.main import app
+from app.schemas import JobCreate
+
+LINK = "https://www.linkedin.com/jobs/view/3980000001/"
+CARD = {"job_link": LINK, "title": "Platform Engineer", "company": "Acme", "location": "Remote", "posted_date": "2026-03-01"}
+DETAILS = {
+	"description_html": "<div><p>Build our ingestion pipeline.</p></div>",
+	"description_text": "Build our ingestion pipeline.",
+	"criteria": ["Seniority level Mid-Senior level"],
+	"employment_type": "Full-time",
+}
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def job(db, ingest_cleanup):
+	[job] = crud.bulk_create_jobs(db, [JobCreate(**{k: v for k, v in CARD.items() if k != "posted_date"})], alert_channels=[])
+	return job
+
+
+def _detail(db, job):
+	db.expire_all()
+	return db.get(models.JobDetail, job.id)
+
+
+def test_unchanged_details_are_not_rewritten(db, job):
+	assert crud.save_job_details(db, [{**CARD, **DETAILS}]) == 1
+	first = _detail(db, job)
+	fetched, version = first.fetched_at, crud.data_versions(db)[crud.DATA_JOBS]
+
+	assert crud.save_job_details(db, [{**CARD, **DETAILS}]) == 0
+	assert _detail(db, job).fetched_at == fetched
+	assert crud.data_versions(db)[crud.DATA_JOBS] == version
+
+
+def test_changed_details_update_the_row(db, job):
+	crud.save_job_details(db, [{**CARD, **DETAILS}])
+	first = _detail(db, job)
+	hash_, updated, version = first.content_hash, first.updated_at, crud.data_versions(db)[crud.DATA_JOBS]
+	time.sleep(0.01)
+
+	changed = {**DETAILS, "description_text": "Build and run our ingestion pipeline.", "employment_type": "Contract"}
+	assert crud.save_job_details(db, [{**CARD, **changed}]) == 1
+	detail = _detail(db, job)
+	assert detail.description_text == "Build and run our ingestion pipeline."
+	assert detail.employment_type == "Contract"
+	assert detail.content_hash != hash_ and detail.updated_at > updated
+	assert crud.data_versions(db)[crud.DATA_JOBS] == version + 1
+
+
+def test_changed_card_with_same_details_keeps_updated_at(db, job):
+	crud.save_job_details(db, [{**CARD, **DETAILS}])
+	first = _detail(db, job)
+	updated, fetched = first.updated_at, first.fetched_at
+	time.sleep(0.01)
+
+	card = {**CARD, "posted_date": "2026-03-05"}
+	assert crud.save_job_details(db, [{**card, **DETAILS}]) == 1
+	detail = _detail(db, job)
+	assert detail.updated_at == updated and detail.fetched_at > fetched
+	assert list(crud.stored_job_details(db, [card])) == [LINK]
+	assert crud.stored_job_details(db, [CARD]) == {}
+
+
+def test_records_without_details_or_stored_job_are_skipped(db, job):
+	assert crud.save_job_details(db, [CARD, {**DETAILS, "job_link": "https://www.linkedin.com/jobs/view/3980000099/"}]) == 0
+	assert _detail(db, job) is None
+
+
+def test_stored_details_are_reused_for_an_unchanged_card(db, job):
+	crud.save_job_details(db, [{**CARD, **DETAILS}])
+	assert crud.stored_job_details(db, [CARD]) == {LINK: DETAILS}
+
+
+def test_details_endpoint(db, job):
+	assert client.get(f"/api/jobs/{job.id}/details").status_code == 404
+	crud.save_job_details(db, [{**CARD, **DETAILS}])
+	response = client.get(f"/api/jobs/{job.id}/details")
+	assert response.status_code == 200
+	assert response.json()["description_html"] == DETAILS["description_html"]
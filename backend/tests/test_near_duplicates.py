@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import select
+
+from app import crud, models, near_duplicates
+from app.schemas import JobCreate
+
+DESCRIPTION = (
+	"Quillfeather is hiring a platform engineer to own our ingestion pipeline, tune Postgres under heavy write load, "
+	"and mentor two junior engineers. You will pair with the data team on schema changes and on-call tooling."
+)
+UNRELATED = (
+	"Marrowbyte needs a field biologist to survey wetland amphibians across three counties during spring, "
+	"log specimens and write quarterly reports for the conservation trust."
+)
+
+
+@pytest.fixture(autouse=True)
+def _cleanup(ingest_cleanup):
+	yield
+
+
+def _posting(job_id, location, title="Platform Engineer", company="Quillfeather", description=DESCRIPTION):
+	return JobCreate(
+		title=title,
+		company=company,
+		location=location,
+		job_link=f"https://www.linkedin.com/jobs/view/{job_id}/",
+		description=description,
+	)
+
+
+def _alerted(db, jobs):
+	ids = [job.id for job in jobs]
+	return db.execute(select(models.AlertOutbox.job_id).where(models.AlertOutbox.job_id.in_(ids))).scalars().all()
+
+
+def test_syndicated_copies_share_a_cluster_in_one_batch(db):
+	original, copy, unrelated = crud.bulk_create_jobs(
+		db,
+		[
+			_posting(3950000001, "Austin, TX"),
+			_posting(3950000002, "Remote (US)"),
+			_posting(3950000003, "Austin, TX", "Field Biologist", "Marrowbyte", UNRELATED),
+		],
+		alert_channels=["telegram"],
+	)
+	assert copy.cluster_id == original.id
+	assert near_duplicates.is_duplicate(copy) and not near_duplicates.is_duplicate(original)
+	assert unrelated.cluster_id != original.id and not near_duplicates.is_duplicate(unrelated)
+	assert sorted(_alerted(db, [original, copy, unrelated])) == sorted([original.id, unrelated.id])
+
+
+def test_copy_joins_a_stored_cluster_without_alerting(db):
+	[original] = crud.bulk_create_jobs(db, [_posting(3950000011, "Berlin")], alert_channels=["telegram"])
+	[copy] = crud.bulk_create_jobs(db, [_posting(3950000012, "Munich")], alert_channels=["telegram"])
+	[unrelated] = crud.bulk_create_jobs(
+		db, [_posting(3950000013, "Berlin", "Field Biologist", "Marrowbyte", UNRELATED)], alert_channels=["telegram"]
+	)
+	db.expire_all()
+	original, copy, unrelated = (db.get(models.Job, job.id) for job in (original, copy, unrelated))
+	assert copy.cluster_id == original.id
+	assert unrelated.cluster_id != original.id
+	assert sorted(_alerted(db, [original, copy, unrelated])) == sorted([original.id, unrelated.id])
+
+
+def test_similarity_of_signatures():
+	a = near_duplicates.signature("Platform Engineer", "Quillfeather", DESCRIPTION)
+	b = near_duplicates.signature("Platform Engineer", "Quillfeather", DESCRIPTION + " Remote friendly.")
+	c = near_duplicates.signature("Field Biologist", "Marrowbyte", UNRELATED)
+	assert near_duplicates.similarity(a, b) > 0.8
+	assert near_duplicates.similarity(a, c) < 0.2
+	assert set(near_duplicates.band_buckets(a)) & set(near_duplicates.band_buckets(b))
+	assert near_duplicates.band_buckets(near_duplicates.signature(None, None)) == []
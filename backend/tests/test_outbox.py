@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+
+from app import crud, models
+from app.database import engine
+
+JOB_ID = 900001
+
+
+@pytest.fixture
+def outbox_row(db):
+	with engine.begin() as conn:
+		conn.execute(insert(models.Job), [{
+			"id": JOB_ID,
+			"title": "Outbox job",
+			"job_link": f"https://www.linkedin.com/jobs/view/{JOB_ID}/",
+			"dedup_key": JOB_ID,
+		}])
+		conn.execute(insert(models.AlertOutbox), [{
+			"job_id": JOB_ID,
+			"channel": "telegram",
+			"idempotency_key": crud.outbox_key("telegram", JOB_ID),
+			"status": crud.OUTBOX_PENDING,
+			"attempts": 0,
+			"next_attempt_at": datetime.utcnow() - timedelta(seconds=1),
+		}])
+	yield
+	with engine.begin() as conn:
+		conn.execute(delete(models.AlertLog).where(models.AlertLog.job_id == JOB_ID))
+		conn.execute(delete(models.AlertOutbox).where(models.AlertOutbox.job_id == JOB_ID))
+		conn.execute(delete(models.Job).where(models.Job.id == JOB_ID))
+
+
+def _sent(entry):
+	update = {"id": entry.id, "locked_until": entry.locked_until, "status": crud.OUTBOX_SENT, "attempts": 1, "last_error": None}
+	log = {"job_id": entry.job_id, "channel": entry.channel, "status": "sent", "message": "ok"}
+	return update, log
+
+
+def _logs(db):
+	return db.execute(select(models.AlertLog).where(models.AlertLog.job_id == JOB_ID)).scalars().all()
+
+
+def test_finish_after_lease_expired_leaves_row_to_new_holder(db, outbox_row):
+	[first] = crud.claim_alert_outbox(db, "worker-a", limit=10, lease_seconds=60)
+	stale = _sent(first)
+	# Worker A overruns its lease and worker B reclaims the row
+	db.execute(update(models.AlertOutbox).values(locked_until=datetime.utcnow() - timedelta(seconds=1)))
+	db.commit()
+	[second] = crud.claim_alert_outbox(db, "worker-b", limit=10, lease_seconds=60)
+	assert second.id == first.id
+
+	assert crud.finish_alert_outbox(db, "worker-a", [stale]) == 0
+	db.expire_all()
+	row = db.get(models.AlertOutbox, first.id)
+	assert (row.status, row.claimed_by) == (crud.OUTBOX_SENDING, "worker-b")
+	assert _logs(db) == []
+
+	assert crud.finish_alert_outbox(db, "worker-b", [_sent(second)]) == 1
+	db.expire_all()
+	row = db.get(models.AlertOutbox, first.id)
+	assert (row.status, row.claimed_by, row.locked_until) == (crud.OUTBOX_SENT, None, None)
+	assert len(_logs(db)) == 1
+
+
+def test_finish_within_lease(db, outbox_row):
+	[entry] = crud.claim_alert_outbox(db, "worker-a", limit=10, lease_seconds=60)
+	assert crud.finish_alert_outbox(db, "worker-a", [_sent(entry)]) == 1
+	db.expire_all()
+	assert db.get(models.AlertOutbox, entry.id).status == crud.OUTBOX_SENT
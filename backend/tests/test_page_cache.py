@@ -0,0 +1,75 @@
+import base64
+import os
+import time
+
+import pytest
+
+from app.services.page_cache import CacheEntry, PageCache
+
+URL = "https://www.linkedin.com/jobs/view/3990000001/"
+
+
+def _entry(job_id, html=None, **fields):
+	# Random text barely compresses, so every entry takes about the same space on disk
+	html = html if html is not None else base64.b64encode(os.urandom(3000)).decode("ascii")
+	return CacheEntry(url=f"https://www.linkedin.com/jobs/view/{job_id}/", html=html, parsed={"criteria": []}, **fields)
+
+
+@pytest.fixture
+def cache(tmp_path):
+	return PageCache(str(tmp_path), max_bytes=10 ** 9, ttl=60)
+
+
+def test_entries_round_trip_under_the_canonical_url(cache):
+	entry = CacheEntry(URL, "<html>job</html>", {"criteria": ["Full-time"]}, etag='"abc"', last_modified="Mon, 02 Mar 2026 10:00:00 GMT")
+	cache.put(entry)
+	found = cache.get("https://de.linkedin.com/jobs/view/engineer-3990000001?trk=public_jobs")
+	assert found == entry
+	assert cache.get("https://www.linkedin.com/jobs/view/3990000002/") is None
+
+
+def test_ttl_expiry_and_touch(cache):
+	cache.put(_entry(3990000001, "<html/>", fetched_at=1000.0))
+	entry = cache.get(URL)
+	assert entry.fresh(60, now=1059.0)
+	assert not entry.fresh(60, now=1060.0)
+	# Stale entries are still returned so they can be revalidated
+	assert not cache.get(URL).fresh(cache.ttl)
+
+	cache.touch(entry)
+	assert cache.get(URL).fresh(cache.ttl)
+
+
+def _age(cache, job_id, seconds):
+	path = cache._path(f"https://www.linkedin.com/jobs/view/{job_id}/")
+	then = time.time() - seconds
+	os.utime(path, (then, then))
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_budget(tmp_path):
+	probe = PageCache(str(tmp_path / "probe"), max_bytes=10 ** 9, ttl=60)
+	probe.put(_entry(1))
+	entry_size = probe.size()
+
+	cache = PageCache(str(tmp_path / "cache"), max_bytes=int(entry_size * 3.5), ttl=60)
+	for job_id, age in ((3990000001, 30), (3990000002, 20), (3990000003, 10)):
+		cache.put(_entry(job_id))
+		_age(cache, job_id, age)
+	# Reading the oldest entry makes it the most recently used
+	assert cache.get(URL) is not None
+
+	cache.put(_entry(3990000004))
+
+	present = [job_id for job_id in range(3990000001, 3990000005) if cache.get(f"https://www.linkedin.com/jobs/view/{job_id}/")]
+	assert present == [3990000001, 3990000003, 3990000004]
+	assert cache.size() <= cache.max_bytes * 0.9
+	assert cache.size() == cache._scan_size()
+
+
+def test_unreadable_entries_are_dropped(cache):
+	cache.put(_entry(3990000001, "<html/>"))
+	path = cache._path(URL)
+	with open(path, "wb") as f:
+		f.write(b"not gzip")
+	assert cache.get(URL) is None
+	assert not os.path.exists(path)
@@ -0,0 +1,98 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, event, insert
+
+from app import crud, models
+from app.database import engine
+from app.schemas import JobFilter
+
+ROWS = 400
+
+
+@pytest.fixture(scope="module")
+def jobs():
+	start = datetime(2026, 1, 1)
+	rows = [
+		{
+			"id": i,
+			"title": f"Job {i % 37}",
+			"company": None if i % 5 == 0 else f"Company {i % 11}",
+			"location": None if i % 3 == 0 else f"City {i % 7}",
+			"posted_date": None if i % 4 == 0 else date(2026, 1, 1) + timedelta(days=i % 13),
+			"job_link": f"https://www.linkedin.com/jobs/view/{i}/",
+			"dedup_key": i,
+			# Duplicate timestamps exercise the id tie-break
+			"created_at": start + timedelta(minutes=i // 3),
+		}
+		for i in range(1, ROWS + 1)
+	]
+	with engine.begin() as conn:
+		conn.execute(delete(models.Job))
+		conn.execute(insert(models.Job), rows)
+	yield rows
+	with engine.begin() as conn:
+		conn.execute(delete(models.Job))
+
+
+def _expected(rows, order_by):
+	field = order_by.lstrip("-")
+	descending = order_by.startswith("-")
+	present = sorted((r for r in rows if r[field] is not None), key=lambda r: (r[field], r["id"]), reverse=descending)
+	nulls = sorted((r for r in rows if r[field] is None), key=lambda r: r["id"], reverse=descending)
+	return [r["id"] for r in present + nulls]
+
+
+@pytest.mark.parametrize("order_by", [
+	"-created_at", "created_at", "title", "-title", "company", "-company",
+	"location", "-location", "posted_date", "-posted_date", "id", "-id",
+])
+def test_cursor_pages_cover_every_row_once_in_order(db, jobs, order_by):
+	seen, cursor = [], None
+	while True:
+		page, cursor = crud.list_jobs_page(db, JobFilter(limit=7, order_by=order_by, cursor=cursor))
+		seen.extend(job.id for job in page)
+		if cursor is None:
+			break
+	assert seen == _expected(jobs, order_by)
+
+
+def test_offset_page_hands_over_to_cursor(db, jobs):
+	page, cursor = crud.list_jobs_page(db, JobFilter(limit=10, offset=300, order_by="company"))
+	rest, _ = crud.list_jobs_page(db, JobFilter(limit=ROWS, order_by="company", cursor=cursor))
+	assert [j.id for j in page + rest] == _expected(jobs, "company")[300:]
+
+
+def _plans(db, filters):
+	statements = []
+
+	def capture(conn, cursor, statement, parameters, context, executemany):
+		statements.append((statement, parameters))
+
+	event.listen(engine, "before_cursor_execute", capture)
+	try:
+		crud.list_jobs_page(db, filters)
+	finally:
+		event.remove(engine, "before_cursor_execute", capture)
+	with engine.connect() as conn:
+		return [
+			" | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params))
+			for sql, params in statements
+		]
+
+
+@pytest.mark.parametrize("order_by", ["-created_at", "created_at", "-title", "company", "-company", "-posted_date"])
+def test_cursor_page_seeks_the_index(db, jobs, order_by):
+	_, cursor = crud.list_jobs_page(db, JobFilter(limit=50, order_by=order_by))
+	for plan in _plans(db, JobFilter(limit=50, order_by=order_by, cursor=cursor)):
+		assert "SEARCH jobs USING" in plan, plan
+		assert "SCAN jobs" not in plan, plan
+		assert "TEMP B-TREE" not in plan, plan
+
+
+def test_cursor_page_among_nulls_seeks_the_index(db, jobs):
+	nulls = sum(r["company"] is None for r in jobs)
+	_, cursor = crud.list_jobs_page(db, JobFilter(limit=ROWS - nulls // 2, order_by="-company"))
+	plans = _plans(db, JobFilter(limit=10, order_by="-company", cursor=cursor))
+	assert len(plans) == 1
+	assert "SEARCH jobs USING INDEX ix_jobs_company_id" in plans[0], plans[0]
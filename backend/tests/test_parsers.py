@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from app.services.parsers import parse_job_cards, parse_job_details
+
+FIXTURES = Path(__file__).resolve().parent.parent / "bench" / "fixtures"
+
+
+def _card(href=None, title="Backend Engineer", company="Acme", location="Remote", posted="2026-03-02"):
+	link = f'<a class="base-card__full-link" href="{href}">{title}</a>' if href is not None else ""
+	time = f'<time datetime="{posted}T00:00:00Z">1 day ago</time>' if posted else ""
+	return (
+		f'<div class="base-card">{link}'
+		f'<h3 class="base-search-card__title">\n  {title}\n</h3>'
+		f'<h4 class="base-search-card__subtitle"><a>{company}</a></h4>'
+		f'<span class="job-search-card__location">{location}</span>{time}</div>'
+	)
+
+
+def _page(*cards):
+	return "<html><body><ul>" + "".join(f"<li>{c}</li>" for c in cards) + "</ul></body></html>"
+
+
+def test_search_page_fixture():
+	cards = parse_job_cards((FIXTURES / "search_page.html").read_text())
+	assert len(cards) == 25
+	assert cards[0] == {
+		"title": "Site Reliability Engineer",
+		"company": "Initech",
+		"location": "Austin, TX",
+		"job_link": "https://www.linkedin.com/jobs/view/3900000001/",
+		"posted_date": "2024-05-01",
+	}
+	assert len({c["job_link"] for c in cards}) == 25
+
+
+def test_cards_without_link_are_skipped():
+	cards = parse_job_cards(_page(_card(), _card(href=""), _card(href="/jobs/view/3900000042/")))
+	assert [c["job_link"] for c in cards] == ["https://www.linkedin.com/jobs/view/3900000042/"]
+
+
+def test_relative_and_tracking_links_are_canonicalised():
+	cards = parse_job_cards(_page(
+		_card(href="/jobs/view/backend-engineer-at-acme-3912345678/?refId=abc&trackingId=xyz"),
+		_card(href="https://de.linkedin.com/jobs/view/3987654321?position=3&pageNum=0"),
+		_card(href="https://careers.example.com/jobs/9?utm_source=linkedin&team=core"),
+	))
+	assert [c["job_link"] for c in cards] == [
+		"https://www.linkedin.com/jobs/view/3912345678/",
+		"https://www.linkedin.com/jobs/view/3987654321/",
+		"https://careers.example.com/jobs/9?team=core",
+	]
+
+
+def test_card_text_and_missing_fields():
+	[card] = parse_job_cards(_page(
+		'<div class="base-card"><a class="base-card__full-link" href="/jobs/view/3900000007/"></a>'
+		'<h3 class="base-search-card__title"> Data   <b>Engineer</b> </h3></div>'
+	))
+	assert card == {
+		"title": "Data Engineer",
+		"company": None,
+		"location": None,
+		"job_link": "https://www.linkedin.com/jobs/view/3900000007/",
+		"posted_date": None,
+	}
+
+
+def test_empty_or_unparseable_pages():
+	assert parse_job_cards(None) == []
+	assert parse_job_cards("   ") == []
+	assert parse_job_details("") == {}
+
+
+def test_detail_page_fixture():
+	details = parse_job_details((FIXTURES / "detail_page.html").read_text())
+	assert details["criteria"] == [
+		"Seniority level Mid-Senior level",
+		"Employment type Full-time",
+		"Job function Engineering and Information Technology",
+		"Industries Software Development",
+	]
+	assert details["employment_type"] == "Full-time"
+	assert details["description_html"].startswith('<div class="description__text')
+	assert details["description_text"].startswith("We are looking for")
+
+
+def test_detail_page_without_criteria_or_description():
+	details = parse_job_details(
+		'<html><body><div class="show-more-less-html__markup"><p>Contract role.</p></div></body></html>'
+	)
+	assert details["criteria"] == []
+	assert details["description_text"] == "Contract role."
+	assert details["employment_type"] == "Contract"
+
+	details = parse_job_details("<html><body><h1>Sign in</h1></body></html>")
+	assert details == {"description_html": None, "description_text": None, "criteria": []}
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import response_cache
+from app.main import app
+from app.suggest_index import suggestions
+
+client = TestClient(app)
+
+
+class DictRedis:
+	def __init__(self):
+		self.data = {}
+
+	def get(self, key):
+		return self.data.get(key)
+
+	def set(self, key, value, ex=None):
+		self.data[key] = value
+
+
+@pytest.fixture
+def shared():
+	redis = DictRedis()
+	response_cache.set_backend(response_cache.RedisBackend(redis))
+	yield redis
+	response_cache.set_backend(None)
+
+
+def _job(company):
+	return SimpleNamespace(title="Engineer", company=company, location="Remote", keywords="engineer")
+
+
+def test_suggestions_follow_this_process_index_and_stay_local(shared):
+	suggestions.rebuild()
+	before = client.get("/api/suggest/companies", params={"q": "zyxcorp"})
+	assert before.status_code == 200 and before.json() == []
+
+	# Indexed here (e.g. by this process's ingest) without any data version bump
+	suggestions.add_jobs([_job("Zyxcorp Labs")])
+	after = client.get("/api/suggest/companies", params={"q": "zyxcorp"})
+	assert after.json() == ["Zyxcorp Labs"]
+	assert after.headers["ETag"] != before.headers["ETag"]
+
+	assert shared.data == {}
+	assert len(response_cache.get_local_backend()) == 2
+	suggestions.rebuild()
+
+
+def test_other_endpoints_use_the_shared_backend(shared):
+	assert client.get("/api/jobs").status_code == 200
+	assert len(shared.data) == 1
@@ -0,0 +1,36 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, scheduler
+from app.config import settings
+from app.main import app
+from app.services import scrape_queue
+
+
+@pytest.fixture
+def search(db):
+	saved = crud.create_saved_search(db, name="Role test", keywords="python", location="Remote", interval_minutes=60)
+	yield saved
+	crud.delete_saved_search(db, saved.id)
+
+
+@pytest.fixture
+def api_only(monkeypatch):
+	monkeypatch.setattr(settings, "app_role", "api-only")
+	# Fail loudly if anything reaches the scrape queue
+	monkeypatch.setattr(scrape_queue, "get_scrape_queue", lambda: pytest.fail("scrape queue used"))
+
+
+def test_run_saved_search_needs_scraper_role(search, api_only):
+	assert scheduler.run_saved_search(search.id) is None
+
+
+def test_run_endpoint_is_unavailable_without_scraper_role(search, api_only):
+	response = TestClient(app).post(f"/api/saved-searches/{search.id}/run")
+	assert response.status_code == 503
+
+
+def test_scheduler_does_not_start_without_scraper_role(monkeypatch):
+	monkeypatch.setattr(settings, "app_role", "scheduler")
+	assert scheduler.start_scheduler() is None
+	assert scheduler.scheduler is None and scheduler.elector is None
@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud
+from app.services import linkedin_scraper_advanced, scrape_queue
+from app.services.scrape_queue import KIND_ADVANCED, KIND_BASIC, ScrapeQueue
+
+
+def test_advanced_run_ignores_queue_params(db, monkeypatch):
+	seen = {}
+
+	def fake_scrape(**kwargs):
+		seen.update(kwargs)
+		return {"found": 0, "created": 0, "files": {}}
+
+	monkeypatch.setattr(linkedin_scraper_advanced, "run_advanced_scrape", fake_scrape)
+	params = {"max_pages": 2, "enrich": False, "backend": "http", "incremental": True, "saved_search_ids": [7]}
+	run = crud.create_scrape_run(db, KIND_ADVANCED, "python", "Remote", params)
+
+	scrape_queue._run_advanced(db, run, lambda: False)
+
+	assert seen["config"].max_pages == 2
+	assert seen["config"].backend == "http"
+	assert seen["enrich"] is False
+
+
+@pytest.fixture
+def blocked_queue(monkeypatch):
+	"""A queue whose runs block until released, so submissions overlap."""
+	release = threading.Event()
+	started = threading.Semaphore(0)
+
+	def runner(db, run, should_stop):
+		started.release()
+		release.wait(5)
+		return {"found": 0, "created": 0}
+
+	monkeypatch.setitem(scrape_queue.RUNNERS, KIND_BASIC, runner)
+	monkeypatch.setitem(scrape_queue.RUNNERS, KIND_ADVANCED, runner)
+	queue = ScrapeQueue(max_workers=4)
+	yield queue, started
+	release.set()
+	queue.shutdown(wait=True)
+
+
+def test_runs_with_different_results_are_not_coalesced(blocked_queue):
+	queue, _ = blocked_queue
+	first, _ = queue.submit(KIND_ADVANCED, "python", "Remote", {"enrich": False})
+	second, created = queue.submit(KIND_ADVANCED, "Python ", "remote", {"enrich": True})
+	assert created and second != first
+	other_backend, created = queue.submit(KIND_ADVANCED, "python", "Remote", {"enrich": False, "backend": "http"})
+	assert created and other_backend != first
+	same, created = queue.submit(KIND_ADVANCED, "python", "Remote", {"enrich": False, "max_pages": 3})
+	assert not created and same == first
+
+
+def test_running_run_is_shared_only_when_deep_enough(blocked_queue):
+	queue, started = blocked_queue
+	first, _ = queue.submit(KIND_BASIC, "go", "Berlin", {"max_pages": 5})
+	assert started.acquire(timeout=5)
+	shallower, created = queue.submit(KIND_BASIC, "go", "Berlin", {"max_pages": 3})
+	assert not created and shallower == first
+	deeper, created = queue.submit(KIND_BASIC, "go", "Berlin", {"max_pages": 8})
+	assert created and deeper != first
+
+
+def test_recovery_fails_only_runs_whose_owner_stopped(db, monkeypatch):
+	release = threading.Event()
+	started = threading.Semaphore(0)
+
+	def runner(db, run, should_stop):
+		started.release()
+		release.wait(5)
+		return {"found": 0, "created": 0}
+
+	monkeypatch.setitem(scrape_queue.RUNNERS, KIND_BASIC, runner)
+	# Two live workers of one deployment, each running a scrape
+	first, second = ScrapeQueue(max_workers=1, lease_seconds=60), ScrapeQueue(max_workers=1, lease_seconds=60)
+	try:
+		run_a, _ = first.submit(KIND_BASIC, "rust", "Oslo")
+		run_b, _ = second.submit(KIND_BASIC, "rust", "Lima")
+		assert started.acquire(timeout=5) and started.acquire(timeout=5)
+		orphan = crud.create_scrape_run(db, KIND_BASIC, "rust", "Kyiv", holder="gone:1:dead", lease_seconds=-1).id
+		legacy = crud.create_scrape_run(db, KIND_BASIC, "rust", "Rome").id
+
+		# Another worker starting up (earlier tests may also have left runs behind)
+		assert first.heartbeat() >= 2
+		db.expire_all()
+		assert crud.get_scrape_run(db, run_a).status == "running"
+		assert crud.get_scrape_run(db, run_b).status == "running"
+		assert crud.get_scrape_run(db, orphan).status == "failed"
+		assert crud.get_scrape_run(db, legacy).status == "failed"
+
+		# The second worker dies: its lease is no longer renewed and runs out
+		second._stop.set()
+		crud.update_scrape_run(db, run_b, lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+		assert first.heartbeat() == 1
+		db.expire_all()
+		assert crud.get_scrape_run(db, run_a).status == "running"
+		assert crud.get_scrape_run(db, run_b).status == "failed"
+	finally:
+		release.set()
+		first.shutdown(wait=True)
+		second.shutdown(wait=True)
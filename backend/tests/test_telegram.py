@@ -0,0 +1,83 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.telegram import MAX_MESSAGE_LENGTH, TelegramSender, group_messages, job_text
+from bench.fakes import FakeTelegramServer
+
+
+@pytest.fixture
+def sender_for():
+	senders = []
+
+	def make(server, chat_rate=100.0, global_rate=100.0, max_retries=3):
+		sender = TelegramSender("TOKEN", server.base_url, chat_rate, global_rate, max_retries)
+		senders.append(sender)
+		return sender
+
+	yield make
+	for sender in senders:
+		sender.close()
+
+
+def test_chat_rate_stays_within_flood_limit(sender_for):
+	with FakeTelegramServer(chat_interval=0.05) as server:
+		sender = sender_for(server, chat_rate=10.0)
+		results = sender.send_many("42", [f"message {i}" for i in range(6)], timeout=30)
+	assert all(ok for ok, _ in results)
+	assert server.throttled == 0
+	times = [t for t, _, _ in server.sent]
+	assert len(times) == 6
+	assert times[-1] - times[0] >= 0.45
+
+
+def test_429_is_retried_after_retry_after(sender_for):
+	with FakeTelegramServer(throttle_first=2, retry_after=0.3) as server:
+		sender = sender_for(server)
+		start = time.monotonic()
+		results = sender.send_many("42", ["a", "b"], timeout=30)
+		elapsed = time.monotonic() - start
+	assert all(ok for ok, _ in results)
+	assert server.throttled == 2
+	assert len(server.sent) == 2
+	assert elapsed >= 0.3
+
+
+def test_server_errors_are_retried_and_give_up_after_max_retries(sender_for):
+	with FakeTelegramServer(fail_first=1) as server:
+		[(ok, _)] = sender_for(server).send_many("42", ["hello"], timeout=30)
+	assert ok and server.failed == 1
+	with FakeTelegramServer(fail_first=10) as server:
+		[(ok, detail)] = sender_for(server, max_retries=1).send_many("42", ["hello"], timeout=30)
+	assert not ok and server.failed == 2 and "Internal Server Error" in detail
+
+
+def test_send_many_returns_at_timeout(sender_for):
+	with FakeTelegramServer() as server:
+		# One message a second: the first goes out, the rest are still waiting at the deadline
+		sender = sender_for(server, chat_rate=1.0, global_rate=1.0)
+		start = time.monotonic()
+		results = sender.send_many("42", ["a", "b", "c"], timeout=0.5)
+		elapsed = time.monotonic() - start
+	assert elapsed < 0.9
+	assert results[0][0]
+	assert [ok for ok, _ in results[1:]] == [False, False]
+	assert "not sent within" in results[1][1]
+
+
+def test_long_job_text_is_cut_before_escaping(sender_for):
+	job = SimpleNamespace(
+		title="R&D <lead> " * 2000,
+		company="A&B",
+		location="Remote",
+		job_link="https://www.linkedin.com/jobs/view/1/",
+	)
+	text = job_text(job)
+	assert len(text) <= MAX_MESSAGE_LENGTH
+	assert "R&amp;D &lt;lead&gt;" in text and text.count("<b>") == 1
+	[(message, indexes)] = group_messages([text], max_items=10)
+	with FakeTelegramServer() as server:
+		[(ok, detail)] = sender_for(server).send_many("42", [message], timeout=30)
+	assert ok, detail
+	assert server.rejected == 0
@@ -35,11 +35,25 @@ export const api = {
 		const q = new URLSearchParams(params)
 		return http(`/alerts?${q.toString()}`)
 	},
+	scrapeRun(id) {
+		return http(`/scrape/runs/${id}`)
+	},
+	cancelScrapeRun(id) {
+		return http(`/scrape/runs/${id}`, { method: 'DELETE' })
+	},
+	// Scrapes run in the background; poll the run until it leaves queued/running
+	async waitForRun(run, intervalMs = 2000) {
+		while (run && (run.status === 'queued' || run.status === 'running')) {
+			await new Promise(r => setTimeout(r, intervalMs))
+			run = await this.scrapeRun(run.id)
+		}
+		return run
+	},
 	scrape({ keywords, location, max_pages = 10 }) {
 		const q = new URLSearchParams({ keywords, location, max_pages })
 		return http(`/scrape?${q.toString()}`, { method: 'POST' })
 	},
-	advancedScrape({ keywords, location, max_pages = 10, enrich = true, headless = true, delay_min = 2, delay_max = 5 }) {
+	advancedScrape({ keywords, location, max_pages = 10, enrich = true, headless = true, delay_min = 0, delay_max = 0 }) {
 		const q = new URLSearchParams({ keywords, location, max_pages, enrich, headless, delay_min, delay_max })
 		return http(`/scrape/advanced?${q.toString()}`, { method: 'POST' })
 	}
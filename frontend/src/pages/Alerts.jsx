@@ -6,7 +6,7 @@ export default function Alerts() {
 	const [logs, setLogs] = useState([])
 
 	useEffect(() => {
-		api.alerts({ limit: 200, offset: 0 }).then(setLogs)
+		api.alerts({ limit: 200 }).then(page => setLogs(page.items))
 	}, [])
 
 	return (
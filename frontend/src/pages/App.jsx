@@ -26,8 +26,9 @@ export default function App() {
 	async function runScrape() {
 		setScraping(true)
 		try {
-			await api.scrape({ keywords: keyword || 'Software Engineer', location: filters.location || 'Remote', max_pages: maxPages })
-			await api.jobs({ keyword, ...filters, limit: 50, offset: 0 }).then(setJobs)
+			const run = await api.scrape({ keywords: keyword || 'Software Engineer', location: filters.location || 'Remote', max_pages: maxPages })
+			await api.waitForRun(run)
+			await api.jobs({ keyword, ...filters, limit: 50 }).then(page => setJobs(page.items))
 		} finally {
 			setScraping(false)
 		}
@@ -45,8 +46,9 @@ export default function App() {
 					<Button variant="outline" onClick={async ()=>{
 						setScraping(true)
 						try {
-							const res = await api.advancedScrape({ keywords: keyword || 'Software Engineer', location: filters.location || 'Remote', max_pages: maxPages, enrich: true })
-							await api.jobs({ keyword, ...filters, limit: 50, offset: 0 }).then(setJobs)
+							const run = await api.waitForRun(await api.advancedScrape({ keywords: keyword || 'Software Engineer', location: filters.location || 'Remote', max_pages: maxPages, enrich: true }))
+							await api.jobs({ keyword, ...filters, limit: 50 }).then(page => setJobs(page.items))
+							const res = run?.result
 							if (res?.files) {
 								const links = Object.values(res.files).filter(Boolean)
 								if (links.length) {